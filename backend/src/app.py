@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Dict
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
+from .config import get_settings
 from .models import ErrorResponse, QueryAnswer, QueryRequest
+from .services.deadline import Deadline, DeadlineExceeded, RequestCancelled, RequestCounters
 from .services.query_service import QueryService
 
 
@@ -17,6 +23,13 @@ LOG_DIR = Path("logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "backend.log"
 
+LOGGER = logging.getLogger(__name__)
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+# Per-stage wall times of an answered request, e.g. "embed;dur=12.3, retrieve;dur=40.1".
+SERVER_TIMING_HEADER = "Server-Timing"
+# Non-standard status (nginx) for "client closed request"; nobody is left to read it.
+CLIENT_CLOSED_REQUEST = 499
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(name)s - %(message)s",
@@ -32,6 +45,7 @@ logging.basicConfig(
 async def lifespan(app: FastAPI):
     service = QueryService()
     app.state.query_service = service
+    app.state.request_counters = RequestCounters()
     yield
     service.close()
 
@@ -67,13 +81,98 @@ def health_check() -> dict:
     return {"status": "ok"}
 
 
-@app.post("/ask", response_model=QueryAnswer, responses={400: {"model": ErrorResponse}})
-def handle_query(payload: QueryRequest) -> QueryAnswer:
+@app.get("/stats")
+def stats() -> dict:
+    sessions = app.state.query_service.sessions
+    return {
+        "requests": app.state.request_counters.snapshot(),
+        "sessions": sessions.stats() if sessions is not None else None,
+    }
+
+
+@app.get("/sessions/{session_id}")
+def session_stats(session_id: str) -> dict:
+    """Follow-up counts and upstream calls avoided for one live session."""
+
+    sessions = app.state.query_service.sessions
+    session = sessions.get(session_id) if sessions is not None else None
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return session.snapshot()
+
+
+def _request_deadline(request: Request) -> Deadline:
+    """Deadline from ``X-Request-Timeout`` (seconds), clamped to the configured maximum.
+
+    Missing, unparsable and non-finite values ("nan", "inf") fall back to the default.
+    """
+
+    settings = get_settings().requests
+    seconds = settings.timeout_seconds
+    header = request.headers.get(REQUEST_TIMEOUT_HEADER)
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = math.nan
+        if math.isfinite(requested):
+            seconds = requested
+        else:
+            LOGGER.warning("Ignoring invalid %s header %r", REQUEST_TIMEOUT_HEADER, header)
+    return Deadline(min(max(seconds, 0.1), settings.max_timeout_seconds))
+
+
+@app.post(
+    "/ask",
+    response_model=QueryAnswer,
+    responses={400: {"model": ErrorResponse}, 504: {"model": ErrorResponse}},
+)
+async def handle_query(payload: QueryRequest, request: Request, response: Response) -> QueryAnswer:
+    service: QueryService = app.state.query_service
+    counters: RequestCounters = app.state.request_counters
+    deadline = _request_deadline(request)
+    stages: Dict[str, float] = {}
+    counters.incr("started")
+    work = asyncio.ensure_future(
+        run_in_threadpool(service.handle, payload, deadline=deadline, stages=stages)
+    )
+    # Once the client is gone nobody reads the result; retrieve it so it is not reported.
+    work.add_done_callback(lambda task: task.cancelled() or task.exception())
+    poll = get_settings().requests.disconnect_poll_seconds
     try:
-        service: QueryService = app.state.query_service
-        return service.handle(payload)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        while not work.done():
+            await asyncio.wait({work}, timeout=poll)
+            if not work.done() and await request.is_disconnected():
+                # The worker thread stops at its next deadline check or streamed chunk.
+                deadline.cancel()
+                counters.incr("cancelled")
+                LOGGER.info(
+                    "Client disconnected; cancelled request after %.2fs",
+                    deadline.seconds - deadline.remaining(),
+                )
+                raise HTTPException(CLIENT_CLOSED_REQUEST, detail="Client closed request")
+        answer = work.result()
+    except HTTPException:
+        raise
+    except RequestCancelled as exc:
+        counters.incr("cancelled")
+        raise HTTPException(CLIENT_CLOSED_REQUEST, detail=str(exc)) from exc
+    except Exception as exc:
+        # Upstream timeouts surface as their own exception types once the deadline is spent.
+        if isinstance(exc, DeadlineExceeded) or deadline.remaining() <= 0:
+            counters.incr("expired")
+            LOGGER.warning("Request expired after %gs: %s", deadline.seconds, exc)
+            detail = f"Request exceeded its {deadline.seconds:g}s deadline"
+            raise HTTPException(status_code=504, detail=detail) from exc
+        counters.incr("failed")
+        if isinstance(exc, ValueError):
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        raise
+    counters.incr("completed")
+    response.headers[SERVER_TIMING_HEADER] = ", ".join(
+        f"{stage};dur={elapsed}" for stage, elapsed in stages.items()
+    )
+    return answer
 
 
 __all__ = ["app"]
@@ -0,0 +1,439 @@
+"""Replay recorded questions against the backend under one or more configurations.
+
+The question stream comes from the ``query_log`` lines ``QueryService`` writes to
+``logs/backend.log`` (question, arrival time and per-stage timings). Each configuration
+gets a fresh ``QueryService`` wired to local stand-ins for Pinecone, Mongo and the chat
+API (see :mod:`.standins`), and the stream is replayed open-loop: requests are sent at
+their recorded offsets divided by ``--speed`` whether or not earlier ones finished, and
+latency is measured from the scheduled send time, so queueing shows up in the numbers.
+
+Configurations are ``name:key=value,...`` with keys ``cache`` (on/off), ``retriever``
+(sharded/flat), ``top_k``, ``model`` (strong chat model), ``fast_model``, ``routing``
+(on/off), ``shadow`` (shadow-compare rate), ``bank`` (question bank on/off; the synthetic
+corpus comes with one templated question per chunk), ``sessions`` (follow-up reuse on/off;
+logged session ids are sent along) and ``timeout`` (request deadline in seconds).
+The report puts the recorded latency and every configuration side by side, breaks
+latency down by stage and diffs each configuration's answers against the first one.
+
+Usage (from the repository root)::
+
+    python -m backend.src.benchmarks.replay logs/backend.log \\
+        --config base: --config "nocache:cache=off" --config "k3:top_k=3,routing=off" \\
+        [--speed 1|10|0] [--target service|app] [--corpus output/runs/<v>/chunks.jsonl]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config import AppSettings, get_settings
+from ..models import QueryRequest
+from ..services.deadline import Deadline, RequestCounters
+from ..services.embeddings import LocalHashEmbeddingProvider
+from ..services.query_service import QUERY_LOG_PREFIX, QueryService
+from ..services.retriever import RetrieverService
+from .standins import StandInLLM, build_corpus, load_chunks, synthetic_bank, synthetic_chunks
+
+LOGGER = logging.getLogger(__name__)
+
+REPLAY_VERSION = "replay"
+_PERCENTILES = (50, 90, 99)
+_CONFIG_KEYS = {
+    "cache",
+    "retriever",
+    "top_k",
+    "model",
+    "fast_model",
+    "routing",
+    "shadow",
+    "bank",
+    "sessions",
+    "timeout",
+}
+
+
+def read_query_log(paths: Iterable[Path], limit: Optional[int] = None) -> List[dict]:
+    """``query_log`` entries from backend logs, oldest first, with ``offset`` in seconds."""
+
+    entries = []
+    for path in paths:
+        with path.open("r", encoding="utf-8", errors="replace") as fp:
+            for line in fp:
+                _, found, payload = line.partition(QUERY_LOG_PREFIX)
+                if not found:
+                    continue
+                try:
+                    entry = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("question"):
+                    entries.append(entry)
+    entries.sort(key=lambda entry: entry["ts"])
+    entries = entries[:limit] if limit else entries
+    if entries:
+        start = entries[0]["ts"]
+        for entry in entries:
+            entry["offset"] = entry["ts"] - start
+    return entries
+
+
+def parse_config(spec: str) -> Tuple[str, Dict[str, str]]:
+    name, _, options = spec.partition(":")
+    overrides = {}
+    for option in filter(None, (part.strip() for part in options.split(","))):
+        key, sep, value = option.partition("=")
+        if not sep or key not in _CONFIG_KEYS:
+            raise ValueError(f"Bad option '{option}' in --config {spec!r}; keys: {_CONFIG_KEYS}")
+        overrides[key] = value
+    return name or "default", overrides
+
+
+def configure(base: AppSettings, overrides: Dict[str, str]) -> Tuple[AppSettings, bool]:
+    """Settings for one replay configuration and whether the corpus is sharded."""
+
+    corpus, openai, routing, bank = base.corpus, base.openai, base.routing, base.question_bank
+    sessions = base.sessions
+    if "cache" in overrides:
+        size = 0 if overrides["cache"] == "off" else max(corpus.chunk_cache_size, 1)
+        corpus = replace(corpus, chunk_cache_size=size)
+    if "top_k" in overrides:
+        corpus = replace(corpus, top_k=int(overrides["top_k"]))
+    if "model" in overrides:
+        openai = replace(openai, chat_model=overrides["model"])
+    if "fast_model" in overrides:
+        routing = replace(routing, fast_model=overrides["fast_model"])
+    if "routing" in overrides:
+        routing = replace(routing, enabled=overrides["routing"] == "on")
+    routing = replace(routing, shadow_rate=float(overrides.get("shadow", 0)))
+    if "bank" in overrides:
+        bank = replace(bank, enabled=overrides["bank"] == "on")
+    if "sessions" in overrides:
+        sessions = replace(sessions, enabled=overrides["sessions"] == "on")
+    settings = replace(
+        base,
+        corpus=corpus,
+        openai=openai,
+        routing=routing,
+        question_bank=bank,
+        sessions=sessions,
+        embedding=replace(base.embedding, provider="local"),
+    )
+    return settings, overrides.get("retriever", "sharded") == "sharded"
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """``embed;dur=12.3, retrieve;dur=40.1`` -> ``{"embed": 12.3, "retrieve": 40.1}``."""
+
+    stages: Dict[str, float] = {}
+    for metric in header.split(","):
+        name, *params = (part.strip() for part in metric.split(";"))
+        for param in params:
+            key, _, value = param.partition("=")
+            if name and key == "dur":
+                stages[name] = float(value)
+    return stages
+
+
+def _sender(
+    service: QueryService, target: str, timeout: Optional[float] = None
+) -> Callable[[str, Optional[str]], Tuple[dict, Dict[str, float]]]:
+    """A function sending one question; it returns the answer and that request's stage times.
+
+    Stage times come from ``QueryService.handle`` directly, or from the app's
+    ``Server-Timing`` header, never from the shared query log.
+    """
+
+    if target == "service":
+
+        def _handle(question: str, session: Optional[str] = None) -> Tuple[dict, Dict]:
+            deadline = Deadline(timeout) if timeout else None
+            request = QueryRequest(query=question, session_id=session)
+            stages: Dict[str, float] = {}
+            answer = service.handle(request, deadline=deadline, stages=stages)
+            return answer.model_dump(), stages
+
+        return _handle
+
+    from fastapi.testclient import TestClient
+
+    from ..app import REQUEST_TIMEOUT_HEADER, SERVER_TIMING_HEADER, app
+
+    app.state.query_service = service
+    app.state.request_counters = RequestCounters()
+    client = TestClient(app)
+
+    def _post(question: str, session: Optional[str] = None) -> Tuple[dict, Dict]:
+        headers = {REQUEST_TIMEOUT_HEADER: str(timeout)} if timeout else {}
+        payload = {"query": question, "session_id": session}
+        response = client.post("/ask", json=payload, headers=headers)
+        response.raise_for_status()
+        return response.json(), parse_server_timing(response.headers.get(SERVER_TIMING_HEADER, ""))
+
+    return _post
+
+
+def replay(
+    entries: List[dict],
+    send: Callable[[str, Optional[str]], Tuple[dict, Dict[str, float]]],
+    *,
+    speed: float,
+    concurrency: int,
+) -> Tuple[List[dict], float]:
+    """Send every question at its scheduled time; return per-request results and wall time."""
+
+    results: List[dict] = [{} for _ in entries]
+
+    def _run(position: int, scheduled: float) -> None:
+        question = entries[position]["question"]
+        result: dict = {"stages_ms": {}}
+        try:
+            response, result["stages_ms"] = send(question, entries[position].get("session"))
+            result.update(
+                answer=response.get("answer"),
+                citations=response.get("citations"),
+                model=response.get("model"),
+                method=response.get("method"),
+            )
+        except Exception as exc:  # noqa: BLE001
+            result["error"] = f"{type(exc).__name__}: {exc}"
+        result["latency_ms"] = (time.perf_counter() - scheduled) * 1000
+        results[position] = result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        for position, entry in enumerate(entries):
+            scheduled = started + (entry["offset"] / speed if speed > 0 else 0.0)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(_run, position, scheduled)
+    return results, time.perf_counter() - started
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return round(ordered[rank], 2)
+
+
+def _distribution(values: List[float]) -> dict:
+    summary = {f"p{pct}": _percentile(values, pct) for pct in _PERCENTILES}
+    summary["max"] = round(max(values), 2) if values else None
+    summary["mean"] = round(sum(values) / len(values), 2) if values else None
+    return summary
+
+
+def summarize(results: List[dict], wall_seconds: Optional[float] = None) -> dict:
+    latencies = [result["latency_ms"] for result in results if "latency_ms" in result]
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        for stage, elapsed in result.get("stages_ms", {}).items():
+            stages[stage].append(elapsed)
+    summary = {
+        "requests": len(results),
+        "errors": sum(1 for result in results if "error" in result),
+        "latency_ms": _distribution(latencies),
+        "stages_ms": {stage: _distribution(values) for stage, values in sorted(stages.items())},
+    }
+    if wall_seconds:
+        summary["throughput_rps"] = round(len(results) / wall_seconds, 2)
+    return summary
+
+
+def diff_answers(
+    entries: List[dict], baseline: List[dict], candidate: List[dict], examples: int
+) -> dict:
+    changed = {"answer": 0, "citation": 0, "model": 0}
+    samples = []
+    for entry, before, after in zip(entries, baseline, candidate):
+        fields = [
+            field
+            for field, key in (("answer", "answer"), ("citation", "citations"), ("model", "model"))
+            if before.get(key) != after.get(key)
+        ]
+        for field in fields:
+            changed[field] += 1
+        if fields and len(samples) < examples:
+            samples.append(
+                {
+                    "question": entry["question"],
+                    "changed": fields,
+                    "baseline": {key: before.get(key) for key in ("answer", "citations", "model")},
+                    "candidate": {key: after.get(key) for key in ("answer", "citations", "model")},
+                }
+            )
+    return {"requests": len(entries), "changed": changed, "examples": samples}
+
+
+def _print_report(report: dict) -> None:
+    columns = ["recorded", *report["configs"]]
+    summaries = {"recorded": report["recorded"], **report["summaries"]}
+    width = max(12, *(len(column) + 2 for column in columns))
+    print(f"\n{len(report['questions'])} questions, speed {report['speed']}x")
+    print("latency (ms)".ljust(18) + "".join(column.rjust(width) for column in columns))
+    rows = [("total", key) for key in ("p50", "p90", "p99", "max", "mean")]
+    stages = sorted({stage for summary in summaries.values() for stage in summary["stages_ms"]})
+    rows += [(stage, "p50") for stage in stages if stage != "total"]
+    rows += [(stage, "p90") for stage in stages if stage != "total"]
+    for stage, key in rows:
+        cells = []
+        for column in columns:
+            summary = summaries[column]
+            if stage == "total" and column != "recorded":
+                value = summary["latency_ms"].get(key)
+            else:
+                value = summary["stages_ms"].get(stage, {}).get(key)
+            cells.append("-" if value is None else f"{value:.1f}")
+        print(f"{stage} {key}".ljust(18) + "".join(cell.rjust(width) for cell in cells))
+    errors = "".join(str(summaries[column].get("errors", "-")).rjust(width) for column in columns)
+    print("errors".ljust(18) + errors)
+    queries = "".join(
+        str(summaries[column].get("index_queries", "-")).rjust(width) for column in columns
+    )
+    print("index queries".ljust(18) + queries)
+    for column in columns[1:]:
+        sessions = summaries[column].get("sessions")
+        if sessions and sessions["follow_ups"]:
+            print(
+                f"{column}: {sessions['reused']} of {sessions['follow_ups']} follow-ups reused "
+                f"session chunks, avoiding {sessions['calls_avoided']}"
+            )
+    for name, diff in report["diffs"].items():
+        changed = ", ".join(f"{count} {field}" for field, count in diff["changed"].items())
+        print(f"\n{name} vs {columns[1]}: changed {changed} of {diff['requests']}")
+        for sample in diff["examples"]:
+            print(f"  Q: {sample['question']} ({', '.join(sample['changed'])})")
+            print(f"     {columns[1]}: {sample['baseline']['answer']}")
+            print(f"     {name}: {sample['candidate']['answer']}")
+
+
+def _latencies(spec: str) -> Dict[str, float]:
+    pairs = (item.partition("=") for item in spec.split(",") if item.strip())
+    return {model.strip(): float(value) for model, _, value in pairs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("logs", nargs="+", type=Path, help="backend log files with query_log lines")
+    parser.add_argument(
+        "--config",
+        action="append",
+        default=[],
+        help="name:key=value,... (repeatable; the first is the diff baseline)",
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale; 0 sends at once")
+    parser.add_argument("--limit", type=int, help="replay only the first N questions")
+    parser.add_argument("--target", choices=["service", "app"], default="service")
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    parser.add_argument("--corpus", type=Path, help="chunks.jsonl from a pipeline run checkpoint")
+    parser.add_argument("--index-latency-ms", type=float, default=30.0)
+    parser.add_argument("--mongo-latency-ms", type=float, default=4.0)
+    parser.add_argument(
+        "--llm-latency-ms",
+        default="gpt-4o=800,gpt-4o-mini=300",
+        help="per-model chat latency, model=ms,...",
+    )
+    parser.add_argument("--diff-examples", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the full report as JSON")
+    args = parser.parse_args()
+
+    # Keep the replay's own query_log lines out of the backend log it may be reading.
+    logging.basicConfig(
+        level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s - %(message)s"
+    )
+    if args.target == "app":
+        from .. import app as _app  # noqa: F401  (its logging setup is replaced below)
+
+        logging.basicConfig(level=logging.WARNING, force=True)
+    entries = read_query_log(args.logs, args.limit)
+    if not entries:
+        parser.error(f"no {QUERY_LOG_PREFIX.strip()} lines found in {args.logs}")
+    chunks = load_chunks(args.corpus) if args.corpus else synthetic_chunks()
+    bank = [] if args.corpus else synthetic_bank(chunks)
+    configs = [parse_config(spec) for spec in args.config or ["default:"]]
+    llm_latency = _latencies(args.llm_latency_ms)
+
+    report: dict = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "logs": [str(path) for path in args.logs],
+        "questions": [entry["question"] for entry in entries],
+        "speed": args.speed,
+        "target": args.target,
+        "corpus": str(args.corpus) if args.corpus else "synthetic",
+        "recorded": summarize(entries),
+        "configs": {},
+        "summaries": {},
+        "diffs": {},
+    }
+    runs: Dict[str, List[dict]] = {}
+    for name, overrides in configs:
+        settings, sharded = configure(get_settings(), overrides)
+        embedder = LocalHashEmbeddingProvider(settings.embedding.local_dimensions)
+        index, database = build_corpus(
+            chunks,
+            version=REPLAY_VERSION,
+            sharded=sharded,
+            embedder=embedder,
+            index_latency_ms=args.index_latency_ms,
+            mongo_latency_ms=args.mongo_latency_ms,
+            collections={
+                "chunks": settings.mongo.chunks_collection,
+                "versions": settings.mongo.versions_collection,
+                "questions": settings.mongo.questions_collection,
+            },
+            bank=bank,
+        )
+        llm = StandInLLM(
+            chat_model=settings.openai.chat_model,
+            dimensions=embedder.dimensions,
+            latency_ms=llm_latency,
+            default_latency_ms=max(llm_latency.values(), default=0.0),
+        )
+        retriever = RetrieverService(settings, index=index, database=database)
+        service = QueryService(llm=llm, retriever=retriever, settings=settings)
+        LOGGER.warning("Replaying %s questions with %s %s", len(entries), name, overrides)
+        try:
+            results, wall = replay(
+                entries,
+                _sender(service, args.target, float(overrides.get("timeout", 0)) or None),
+                speed=args.speed,
+                concurrency=args.concurrency,
+            )
+        finally:
+            service.close()
+        runs[name] = results
+        report["configs"][name] = {**overrides, "sharded": sharded}
+        report["summaries"][name] = {
+            **summarize(results, wall),
+            "index_queries": index.queries,
+            "llm_calls": dict(llm.calls),
+            "sessions": service.sessions.stats() if service.sessions is not None else None,
+        }
+
+    baseline = configs[0][0]
+    for name, results in runs.items():
+        if name != baseline:
+            report["diffs"][name] = diff_answers(
+                entries, runs[baseline], results, args.diff_examples
+            )
+    report["results"] = runs
+    _print_report(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""Local stand-ins for Pinecone, Mongo and the OpenAI chat API used by offline replays.
+
+Each stand-in sleeps for a fixed, configurable latency per call, so a replay measures the
+backend's own overhead plus a stable model of the upstream services, and gives the same
+answers on every run. Questions and chunks are embedded with the local hashed provider.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..services.deadline import Deadline
+from ..services.embeddings import LocalHashEmbeddingProvider
+from ..services.retriever import ACTIVE_POINTER_ID
+
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?%?")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it its me my of on or "
+    "the to was what when where which who why will with you your fund scheme".split()
+)
+_SCHEME_SUFFIX = re.compile(r"(\s+(direct|regular|plan|growth|idcw))+$", re.IGNORECASE)
+
+# Built-in corpus used when no chunk file is given: (scheme, amc, category).
+SCHEMES = [
+    ("HDFC ELSS Tax Saver Fund Direct Plan Growth", "hdfc", "ELSS"),
+    ("HDFC Flexi Cap Fund Direct Plan Growth", "hdfc", "Flexi Cap"),
+    ("HDFC Large and Mid Cap Fund Direct Growth", "hdfc", "Large & Mid Cap"),
+    ("HDFC Small Cap Fund Direct Growth", "hdfc", "Small Cap"),
+    ("HDFC Multi Cap Fund Direct Growth", "hdfc", "Multi Cap"),
+    ("HDFC Mid Cap Fund Direct Growth", "hdfc", "Mid Cap"),
+]
+_MANAGERS = ["Roshi Jain", "Chirag Setalvad", "Gopal Agrawal", "Dhruv Muchhal", "Rahul Baijal"]
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower().replace("&", "and")).strip("-")
+
+
+def synthetic_chunks() -> List[dict]:
+    """A small deterministic corpus of scheme facts, one chunk per section."""
+
+    chunks = []
+    for scheme, amc, category in SCHEMES:
+        rnd = random.Random(scheme)
+        url = f"https://groww.in/mutual-funds/{_slug(scheme)}"
+        lock_in = " Lock-in period 3 years." if category == "ELSS" else ""
+        sections = {
+            "Exit load": (
+                "Exit load Nil." + lock_in
+                if category == "ELSS"
+                else f"Exit load of 1% if redeemed within {rnd.choice([1, 1, 2])} year."
+            ),
+            "Expense ratio": f"Expense ratio 0.{rnd.randint(55, 95)}% inclusive of GST.",
+            "Minimum investments": (
+                f"Minimum SIP investment is Rs {rnd.choice([100, 500])}. "
+                f"Minimum lumpsum investment is Rs {rnd.choice([100, 1000, 5000])}."
+            ),
+            "Fund management": (
+                f"{rnd.choice(_MANAGERS)} manages the fund since {rnd.randint(2013, 2023)}."
+            ),
+            "Risk": f"Riskometer: {rnd.choice(['Very High', 'High', 'Moderately High'])} risk.",
+            "Benchmark": f"Benchmark: NIFTY {category} {rnd.choice([150, 250, 500])} TRI.",
+        }
+        for position, (section, content) in enumerate(sections.items()):
+            chunks.append(
+                {
+                    "chunk_id": f"{url}#{position}",
+                    "scheme": scheme,
+                    "category": category,
+                    "url": url,
+                    "section": section,
+                    "content": content,
+                    "last_verified": "2025-11-15",
+                    "metadata": {"amc": amc, "shard": f"{amc}.{_slug(category)}"},
+                }
+            )
+    return chunks
+
+
+def load_chunks(path: Path) -> List[dict]:
+    """Chunks from a pipeline run checkpoint (``output/runs/<version>/chunks.jsonl``)."""
+
+    chunks = []
+    with path.open("r", encoding="utf-8") as fp:
+        for line in fp:
+            if line.strip():
+                chunks.append(json.loads(line))
+    for position, chunk in enumerate(chunks):
+        chunk.setdefault("chunk_id", f"{chunk['url']}#{position}")
+        metadata = chunk.setdefault("metadata", {})
+        metadata.setdefault("amc", "hdfc" if "hdfc" in chunk["scheme"].lower() else "groww")
+        metadata.setdefault("shard", f"{metadata['amc']}.{_slug(chunk['category'])}")
+    return chunks
+
+
+def synthetic_bank(chunks: Iterable[dict]) -> List[dict]:
+    """Question bank entries like the pipeline's template generator writes, one per chunk."""
+
+    entries = []
+    for chunk in chunks:
+        scheme = _SCHEME_SUFFIX.sub("", chunk["scheme"])
+        entries.append(
+            {
+                "entry_id": f"{chunk['chunk_id']}#q1",
+                "question": f"What is the {chunk['section'].lower()} of {scheme}?",
+                "answer": " ".join(_SENTENCE.split(chunk["content"])[:3]),
+                "chunk_id": chunk["chunk_id"],
+                "scheme": chunk["scheme"],
+                "category": chunk["category"],
+                "url": chunk["url"],
+                "section": chunk["section"],
+                "last_verified": chunk["last_verified"],
+            }
+        )
+    return entries
+
+
+def shard_catalog(chunks: Iterable[dict], version: str) -> List[dict]:
+    """A routing catalog built from the chunks themselves (the pipeline uses its registry)."""
+
+    shards: Dict[str, dict] = {}
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        entry = shards.setdefault(
+            metadata["shard"],
+            {
+                "shard": metadata["shard"],
+                "namespace": f"{version}.{metadata['shard']}",
+                "amc": metadata["amc"],
+                "category": chunk["category"],
+                "amc_terms": [metadata["amc"]],
+                "category_terms": [chunk["category"].lower()],
+                "scheme_terms": set(),
+            },
+        )
+        scheme = chunk["scheme"].lower()
+        entry["scheme_terms"].update({scheme, _SCHEME_SUFFIX.sub("", scheme)})
+    return [
+        {**entry, "scheme_terms": sorted(entry["scheme_terms"])}
+        for _, entry in sorted(shards.items())
+    ]
+
+
+def _sleep_ms(milliseconds: float, deadline: Optional[Deadline] = None) -> None:
+    """Sleep like an upstream call would, giving up early like a timed-out or cancelled one."""
+
+    finish = time.monotonic() + milliseconds / 1000
+    while True:
+        if deadline is not None:
+            deadline.check("stand-in call")
+        left = finish - time.monotonic()
+        if left <= 0:
+            return
+        time.sleep(min(left, 0.05) if deadline is not None else left)
+
+
+def _sleep_within(milliseconds: float, timeout: Optional[float]) -> None:
+    if timeout is not None and milliseconds / 1000 > timeout:
+        time.sleep(timeout)
+        raise TimeoutError(f"Stand-in call timed out after {timeout:.3f}s")
+    _sleep_ms(milliseconds)
+
+
+class InMemoryIndex:
+    """Exact cosine search per namespace with the Pinecone ``query`` response shape."""
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency_ms = latency_ms
+        self._ids: Dict[str, List[str]] = defaultdict(list)
+        self._vectors: Dict[str, np.ndarray] = {}
+        self.queries = 0
+
+    def upsert(self, namespace: str, ids: Sequence[str], vectors: Sequence[List[float]]) -> None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        existing = self._vectors.get(namespace)
+        self._vectors[namespace] = matrix if existing is None else np.vstack([existing, matrix])
+        self._ids[namespace].extend(ids)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        include_metadata: bool = True,
+        namespace: Optional[str] = None,
+        _request_timeout: Optional[float] = None,
+    ) -> dict:
+        self.queries += 1
+        _sleep_within(self.latency_ms, _request_timeout)
+        matrix = self._vectors.get(namespace or "")
+        if matrix is None:
+            return {"matches": []}
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        ids = self._ids[namespace or ""]
+        return {"matches": [{"id": ids[i], "score": float(scores[i])} for i in best]}
+
+
+class InMemoryCollection:
+    """The ``find_one`` / ``find`` subset of a Mongo collection the retriever uses."""
+
+    def __init__(self, documents: Iterable[dict], latency_ms: float = 0.0) -> None:
+        self.latency_ms = latency_ms
+        self._documents = list(documents)
+        self._by_id = {doc.get("_id"): doc for doc in self._documents if "_id" in doc}
+        self._by_chunk = {
+            (doc.get("corpus_version"), doc.get("chunk_id")): doc for doc in self._documents
+        }
+        self.reads = 0
+
+    def find_one(self, query: dict) -> Optional[dict]:
+        self.reads += 1
+        _sleep_ms(self.latency_ms)
+        doc = self._by_id.get(query.get("_id"))
+        return dict(doc) if doc else None
+
+    def find(self, query: dict, max_time_ms: Optional[int] = None) -> List[dict]:
+        self.reads += 1
+        _sleep_within(self.latency_ms, max_time_ms / 1000 if max_time_ms else None)
+        version = query.get("corpus_version")
+        if "chunk_id" not in query:
+            return [dict(doc) for doc in self._documents if doc.get("corpus_version") == version]
+        wanted = query.get("chunk_id", {}).get("$in", [])
+        return [
+            dict(self._by_chunk[(version, chunk_id)])
+            for chunk_id in wanted
+            if (version, chunk_id) in self._by_chunk
+        ]
+
+
+class InMemoryDatabase(dict):
+    """Collections by name, like ``MongoClient()[db_name]``."""
+
+
+def build_corpus(
+    chunks: List[dict],
+    *,
+    version: str,
+    sharded: bool,
+    embedder: LocalHashEmbeddingProvider,
+    index_latency_ms: float = 0.0,
+    mongo_latency_ms: float = 0.0,
+    collections: Optional[Dict[str, str]] = None,
+    bank: Sequence[dict] = (),
+) -> Tuple[InMemoryIndex, InMemoryDatabase]:
+    """Index ``chunks`` as the active corpus version, in shard namespaces or one namespace.
+
+    ``bank`` entries (see :func:`synthetic_bank`) are stored with their question embeddings.
+    """
+
+    index = InMemoryIndex(index_latency_ms)
+    vectors = embedder.embed([chunk["content"] for chunk in chunks])
+    by_namespace: Dict[str, List[int]] = defaultdict(list)
+    for position, chunk in enumerate(chunks):
+        shard = chunk["metadata"]["shard"]
+        by_namespace[f"{version}.{shard}" if sharded else version].append(position)
+    for namespace, positions in by_namespace.items():
+        index.upsert(
+            namespace,
+            [chunks[i]["chunk_id"] for i in positions],
+            [vectors[i] for i in positions],
+        )
+    record = {
+        "_id": version,
+        "status": "active",
+        "embedding_model": embedder.name,
+        "embedding_dimensions": embedder.dimensions,
+    }
+    if sharded:
+        record["shards"] = shard_catalog(chunks, version)
+    names = collections or {}
+    questions = embedder.embed([entry["question"] for entry in bank]) if bank else []
+    database = InMemoryDatabase(
+        {
+            names.get("chunks", "chunks"): InMemoryCollection(
+                [{**chunk, "corpus_version": version} for chunk in chunks], mongo_latency_ms
+            ),
+            names.get("versions", "corpus_versions"): InMemoryCollection(
+                [record, {"_id": ACTIVE_POINTER_ID, "version": version}], mongo_latency_ms
+            ),
+            names.get("questions", "question_bank"): InMemoryCollection(
+                [
+                    {
+                        **entry,
+                        "corpus_version": version,
+                        "embedding": np.asarray(vector, dtype=np.float32).tobytes(),
+                    }
+                    for entry, vector in zip(bank, questions)
+                ],
+                mongo_latency_ms,
+            ),
+        }
+    )
+    return index, database
+
+
+class StandInLLM:
+    """Local embeddings plus an extractive "answer": the context sentence that best matches.
+
+    Every model gives the same answer for the same contexts; models differ only in their
+    configured latency, so answer diffs between replay configurations come from retrieval.
+    """
+
+    def __init__(
+        self,
+        *,
+        chat_model: str,
+        dimensions: int,
+        latency_ms: Dict[str, float],
+        default_latency_ms: float = 0.0,
+    ) -> None:
+        self.chat_model = chat_model
+        self._embedder = LocalHashEmbeddingProvider(dimensions)
+        self._latency_ms = latency_ms
+        self._default_latency_ms = default_latency_ms
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    def embed(self, text: str, *, deadline: Optional[Deadline] = None) -> List[float]:
+        return self._embedder.embed([text])[0]
+
+    def answer(
+        self,
+        question: str,
+        contexts: Iterable[str],
+        *,
+        model: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        model = model or self.chat_model
+        self.calls[model] += 1
+        _sleep_ms(self._latency_ms.get(model, self._default_latency_ms), deadline)
+        wanted = {word for word in _WORD.findall(question.lower()) if word not in _STOPWORDS}
+        best, best_overlap = "", 0
+        for context in contexts:
+            section, _, body = context.partition(": ")
+            # Section titles count double, as a reader would scan the headings first.
+            heading = 2 * len(wanted & set(_WORD.findall(section.lower())))
+            for sentence in _SENTENCE.split(body):
+                overlap = heading + len(wanted & set(_WORD.findall(sentence.lower())))
+                if overlap > best_overlap:
+                    best, best_overlap = sentence.strip(), overlap
+        if not best:
+            return "I couldn't find that in the provided context. [CITATION]"
+        return f"{best} [CITATION]"
@@ -25,6 +25,8 @@ class MongoSettings:
     uri: str = _env("MONGODB_URI", "mongodb://localhost:27017")
     db_name: str = _env("MONGODB_DB", "mutual_fund_faq")
     chunks_collection: str = _env("MONGODB_COLLECTION_CHUNKS", "chunks")
+    versions_collection: str = _env("MONGODB_COLLECTION_VERSIONS", "corpus_versions")
+    questions_collection: str = _env("MONGODB_COLLECTION_QUESTIONS", "question_bank")
 
 
 @dataclass(frozen=True)
@@ -38,6 +40,15 @@ class OpenAISettings:
     api_key: str = _env("OPENAI_API_KEY", "")
     chat_model: str = _env("OPENAI_CHAT_MODEL", "gpt-4o")
     embed_model: str = _env("OPENAI_EMBED_MODEL", "text-embedding-3-small")
+    # Unset: the model's native size, and no ``dimensions`` parameter is sent.
+    embed_dimensions: Optional[int] = int(_env("OPENAI_EMBED_DIMENSIONS", "") or 0) or None
+
+
+@dataclass(frozen=True)
+class EmbeddingSettings:
+    # Must match the data pipeline's EMBED_PROVIDER: "openai" or "local" (no network).
+    provider: str = _env("EMBED_PROVIDER", "openai")
+    local_dimensions: int = int(_env("LOCAL_EMBED_DIMENSIONS", "512"))
 
 
 @dataclass(frozen=True)
@@ -48,12 +59,70 @@ class AdviceSettings:
     )
 
 
+@dataclass(frozen=True)
+class CorpusSettings:
+    # How often the retriever re-reads the active corpus version pointer.
+    version_poll_seconds: float = float(_env("CORPUS_VERSION_POLL_SECONDS", "30"))
+    chunk_cache_size: int = int(_env("CHUNK_CACHE_SIZE", "2048"))
+    top_k: int = int(_env("RETRIEVER_TOP_K", "5"))
+    # Parallel Pinecone queries when a question spans several corpus shards.
+    shard_query_workers: int = int(_env("SHARD_QUERY_WORKERS", "8"))
+
+
+@dataclass(frozen=True)
+class RequestSettings:
+    # Deadline for one /ask request; clients may ask for less (or more, up to the maximum)
+    # with the X-Request-Timeout header, in seconds.
+    timeout_seconds: float = float(_env("REQUEST_TIMEOUT_SECONDS", "25"))
+    max_timeout_seconds: float = float(_env("REQUEST_TIMEOUT_MAX_SECONDS", "60"))
+    # How often the API checks whether the client is still connected.
+    disconnect_poll_seconds: float = float(_env("DISCONNECT_POLL_SECONDS", "0.2"))
+
+
+@dataclass(frozen=True)
+class RoutingSettings:
+    # Confident single-fact lookups are answered by the fast model, the rest by chat_model.
+    enabled: bool = _env("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    fast_model: str = _env("OPENAI_FAST_CHAT_MODEL", "gpt-4o-mini")
+    min_score: float = float(_env("ROUTING_MIN_SCORE", "0.5"))
+    min_gap: float = float(_env("ROUTING_MIN_GAP", "0.03"))
+    max_question_words: int = int(_env("ROUTING_MAX_QUESTION_WORDS", "20"))
+    # Share of fast answers also answered by chat_model in the background for comparison.
+    shadow_rate: float = float(_env("ROUTING_SHADOW_RATE", "0"))
+    # Shadow compares queued or running at once; samples beyond this are dropped.
+    shadow_max_pending: int = int(_env("ROUTING_SHADOW_MAX_PENDING", "4"))
+
+
+@dataclass(frozen=True)
+class QuestionBankSettings:
+    # Questions this close (cosine) to a precomputed one get its stored answer, skipping RAG.
+    enabled: bool = _env("QUESTION_BANK_ENABLED", "true").lower() == "true"
+    min_score: float = float(_env("QUESTION_BANK_MIN_SCORE", "0.9"))
+
+
+@dataclass(frozen=True)
+class SessionSettings:
+    # Follow-ups in a session (requests with a session_id) reuse its last scheme's chunks.
+    enabled: bool = _env("SESSIONS_ENABLED", "true").lower() == "true"
+    ttl_seconds: float = float(_env("SESSION_TTL_SECONDS", "1800"))
+    max_sessions: int = int(_env("SESSION_MAX_SESSIONS", "10000"))
+    max_chunks: int = int(_env("SESSION_MAX_CHUNKS", "20"))
+    # Share of a follow-up's words a cached chunk must contain to answer without retrieval.
+    min_overlap: float = float(_env("SESSION_MIN_OVERLAP", "0.5"))
+
+
 @dataclass(frozen=True)
 class AppSettings:
     mongo: MongoSettings = MongoSettings()
     pinecone: PineconeSettings = PineconeSettings()
     openai: OpenAISettings = OpenAISettings()
+    embedding: EmbeddingSettings = EmbeddingSettings()
     advice: AdviceSettings = AdviceSettings()
+    corpus: CorpusSettings = CorpusSettings()
+    routing: RoutingSettings = RoutingSettings()
+    question_bank: QuestionBankSettings = QuestionBankSettings()
+    sessions: SessionSettings = SessionSettings()
+    requests: RequestSettings = RequestSettings()
     disclaimer: str = _env("DISCLAIMER_TEXT", "Facts-only. No investment advice.")
 
 
@@ -15,6 +15,9 @@ class QueryType(str, Enum):
 
 class QueryRequest(BaseModel):
     query: str = Field(..., min_length=3, max_length=500)
+    session_id: Optional[str] = Field(
+        None, max_length=64, description="Groups follow-up questions of one conversation"
+    )
 
 
 class Citation(BaseModel):
@@ -29,7 +32,9 @@ class QueryAnswer(BaseModel):
     is_factual: bool = True
     confidence: float = 1.0
     method: str = Field("rag", description="How the answer was generated")
+    model: Optional[str] = Field(None, description="Chat model that wrote the answer")
     last_updated: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
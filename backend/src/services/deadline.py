@@ -0,0 +1,69 @@
+"""Per-request deadlines and cancellation shared by the API layer and upstream calls.
+
+A :class:`Deadline` travels with one ``/ask`` request. Each upstream call asks it for the
+time left and uses that as its timeout. The API layer cancels it when the client goes
+away, and the chat completion, which streams, stops at the next chunk. Abandoned and
+expired requests therefore release their worker and stop spending tokens.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict
+
+
+class RequestCancelled(Exception):
+    """The client disconnected; the answer would never be delivered."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request ran out of time before ``stage`` finished."""
+
+
+class Deadline:
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self, stage: str) -> float:
+        """Seconds left for ``stage``; raises if the request was cancelled or has expired."""
+
+        if self._cancelled.is_set():
+            raise RequestCancelled(f"Client disconnected before {stage}")
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Request deadline of {self.seconds:g}s exceeded at {stage}")
+        return remaining
+
+
+class RequestCounters:
+    """Thread-safe counts of how ``/ask`` requests ended."""
+
+    KEYS = ("started", "completed", "failed", "cancelled", "expired")
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = dict.fromkeys(self.KEYS, 0)
+        self._lock = threading.Lock()
+
+    def incr(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._counts)
+        finished = sum(counts[key] for key in self.KEYS[1:])
+        counts["in_flight"] = counts["started"] - finished
+        return counts
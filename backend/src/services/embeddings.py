@@ -0,0 +1,142 @@
+"""Embedding providers shared by the data pipeline and the backend.
+
+This module is kept byte-for-byte identical in ``data-pipeline/src/embedding_providers.py``
+and ``backend/src/services/embeddings.py``: corpus chunks and user questions must be
+embedded by the same code, and the two services are deployed separately.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+LOCAL_MODEL = "local-hash-v1"
+# Output sizes of OpenAI embedding models when no ``dimensions`` is requested.
+OPENAI_NATIVE_DIMENSIONS: Dict[str, int] = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.%][a-z0-9]+)*%?")
+# Function words that would otherwise dominate the unweighted hashed counts.
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it its me my of on or "
+    "the to was what when where which who why will with you your".split()
+)
+_TRIGRAM_WEIGHT = 0.5
+
+
+class EmbeddingProvider(Protocol):
+    """Turns a batch of texts into equally sized float vectors."""
+
+    name: str
+    dimensions: int
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]: ...
+
+
+class OpenAIEmbeddingProvider:
+    """OpenAI embeddings API; the client is built on first use.
+
+    ``dimensions`` is only sent when it is set: older models such as
+    ``text-embedding-ada-002`` reject the parameter, and without it every model returns
+    its native size.
+    """
+
+    def __init__(
+        self, client_factory: Callable[[], Any], *, model: str, dimensions: Optional[int] = None
+    ) -> None:
+        self._client_factory = client_factory
+        self._client: Any = None
+        self._requested_dimensions = dimensions
+        self.name = model
+        self.dimensions = dimensions or OPENAI_NATIVE_DIMENSIONS.get(model, 1536)
+
+    def with_client(self, client_factory: Callable[[], Any]) -> "OpenAIEmbeddingProvider":
+        """The same model and dimensions, sent through another client."""
+
+        return OpenAIEmbeddingProvider(
+            client_factory, model=self.name, dimensions=self._requested_dimensions
+        )
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if self._client is None:
+            self._client = self._client_factory()
+        options = {}
+        if self._requested_dimensions:
+            options["dimensions"] = self._requested_dimensions
+        response = self._client.embeddings.create(model=self.name, input=list(texts), **options)
+        return [datum.embedding for datum in response.data]
+
+
+class LocalHashEmbeddingProvider:
+    """CPU-only embeddings from signed feature hashing; no model files or network.
+
+    Features are lower-cased word unigrams and bigrams (stopwords dropped) plus in-word
+    character trigrams at half weight. Each feature's CRC32 picks a bucket and a sign,
+    counts are damped with ``log1p`` and rows are L2-normalised, so cosine similarity
+    behaves like a TF-weighted bag-of-words match. A batch is one NumPy scatter-add.
+    """
+
+    def __init__(self, dimensions: int = 512) -> None:
+        self.name = LOCAL_MODEL
+        self.dimensions = dimensions
+
+    @staticmethod
+    def _features(text: str) -> List[Tuple[str, float]]:
+        words = [word for word in _TOKEN.findall(text.lower()) if word not in _STOPWORDS]
+        features = [(word, 1.0) for word in words]
+        features.extend((f"{left} {right}", 1.0) for left, right in zip(words, words[1:]))
+        features.extend(
+            (f"#{word[idx : idx + 3]}", _TRIGRAM_WEIGHT)
+            for word in words
+            if len(word) > 3
+            for idx in range(len(word) - 2)
+        )
+        return features
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        rows: List[int] = []
+        cols: List[int] = []
+        values: List[float] = []
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append((digest >> 1) % self.dimensions)
+                values.append(weight if digest & 1 else -weight)
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        index = (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp))
+        np.add.at(matrix, index, np.asarray(values, dtype=np.float32))
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+
+def create_provider(
+    kind: str,
+    *,
+    openai_client_factory: Callable[[], Any],
+    openai_model: str,
+    openai_dimensions: Optional[int],
+    local_dimensions: int,
+) -> EmbeddingProvider:
+    """Build the provider named by ``EMBED_PROVIDER`` ("openai" or "local")."""
+
+    kind = kind.lower()
+    if kind == "openai":
+        return OpenAIEmbeddingProvider(
+            openai_client_factory, model=openai_model, dimensions=openai_dimensions
+        )
+    if kind == "local":
+        return LocalHashEmbeddingProvider(local_dimensions)
+    raise ValueError(f"Unknown embedding provider '{kind}'")
@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable, List
+from typing import Any, Callable, Iterable, List, Optional
 
 from openai import OpenAI
 
-from ..config import get_settings
+from ..config import AppSettings, get_settings
+from .deadline import Deadline
+from .embeddings import EmbeddingProvider, OpenAIEmbeddingProvider, create_provider
 
 LOGGER = logging.getLogger(__name__)
 
@@ -22,32 +24,95 @@ Rules:
 """.strip()
 
 
+def build_embedding_provider(
+    client_factory: Optional[Callable[[], Any]] = None,
+    settings: Optional[AppSettings] = None,
+) -> EmbeddingProvider:
+    """Provider configured by ``EMBED_PROVIDER``; OpenAI clients are only built on first use."""
+
+    settings = settings or get_settings()
+    return create_provider(
+        settings.embedding.provider,
+        openai_client_factory=client_factory or (lambda: OpenAI(api_key=settings.openai.api_key)),
+        openai_model=settings.openai.embed_model,
+        openai_dimensions=settings.openai.embed_dimensions,
+        local_dimensions=settings.embedding.local_dimensions,
+    )
+
+
 class OpenAIClient:
+    """Chat completions and query embeddings.
+
+    The OpenAI client is built on first use, so with ``EMBED_PROVIDER=local`` the service
+    starts and embeds questions without ``OPENAI_API_KEY``; only chat calls need it.
+    """
+
     def __init__(self) -> None:
         self._settings = get_settings()
+        self._openai: Optional[OpenAI] = None
+        self._embedder = build_embedding_provider(self._client, self._settings)
+        self.chat_model = self._settings.openai.chat_model
         if not self._settings.openai.api_key:
-            raise ValueError("OPENAI_API_KEY is required")
-        self._client = OpenAI(api_key=self._settings.openai.api_key)
-        self._embed_model = self._settings.openai.embed_model
-        self._chat_model = self._settings.openai.chat_model
+            LOGGER.warning("OPENAI_API_KEY is not set; chat completions will fail")
+
+    def _client(self) -> OpenAI:
+        if self._openai is None:
+            if not self._settings.openai.api_key:
+                raise ValueError("OPENAI_API_KEY is required")
+            self._openai = OpenAI(api_key=self._settings.openai.api_key)
+        return self._openai
 
-    def embed(self, text: str) -> List[float]:
-        response = self._client.embeddings.create(model=self._embed_model, input=text)
-        return response.data[0].embedding
+    def _client_for(self, deadline: Deadline, stage: str) -> OpenAI:
+        # The deadline bounds the whole call, so retries would only overrun it.
+        return self._client().with_options(timeout=deadline.check(stage), max_retries=0)
 
-    def answer(self, question: str, contexts: Iterable[str]) -> str:
+    def embed(self, text: str, *, deadline: Optional[Deadline] = None) -> List[float]:
+        embedder = self._embedder
+        if deadline is not None and isinstance(embedder, OpenAIEmbeddingProvider):
+            embedder = embedder.with_client(lambda: self._client_for(deadline, "embed"))
+        return embedder.embed([text])[0]
+
+    def answer(
+        self,
+        question: str,
+        contexts: Iterable[str],
+        *,
+        model: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
         context_blob = "\n\n".join(contexts)
         user_prompt = f"Context:\n{context_blob}\n\nQuestion: {question}\nAnswer:"
-        completion = self._client.chat.completions.create(
-            model=self._chat_model,
-            messages=[
+        request = {
+            "model": model or self.chat_model,
+            "messages": [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
-            temperature=0.2,
-            max_tokens=300,
-        )
-        text = completion.choices[0].message.content.strip()
+            "temperature": 0.2,
+            "max_tokens": 300,
+        }
+        if deadline is None:
+            completion = self._client().chat.completions.create(**request)
+            text = completion.choices[0].message.content.strip()
+        else:
+            text = self._stream(request, deadline)
         if "[CITATION]" not in text:
             text = f"{text} [CITATION]"
         return text
+
+    def _stream(self, request: dict, deadline: Deadline) -> str:
+        """Stream the completion so a cancelled or expired request stops generating tokens."""
+
+        stream = self._client_for(deadline, "generate").chat.completions.create(
+            **request, stream=True
+        )
+        parts = []
+        try:
+            for event in stream:
+                deadline.check("generate")
+                if event.choices and event.choices[0].delta.content:
+                    parts.append(event.choices[0].delta.content)
+        finally:
+            # Closing the connection is what makes the API stop generating.
+            stream.close()
+        return "".join(parts).strip()
@@ -0,0 +1,171 @@
+"""Chooses between the fast and the strong chat model for each answer.
+
+A question goes to the fast model when retrieval is confident (high top score and a clear
+gap to the runner-up) and the question is a simple single-fact lookup. Everything else,
+and any fast answer that comes back empty-handed, goes to the strong model. In shadow mode
+a sample of fast answers is also answered by the strong model off the request path, and
+the agreement rate is logged. At most ``ROUTING_SHADOW_MAX_PENDING`` compares wait or run
+at once; samples beyond that are dropped and counted rather than queued.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence
+
+from ..config import RoutingSettings
+
+LOGGER = logging.getLogger(__name__)
+
+# Attributes a one-sentence answer can state straight from a scheme page.
+LOOKUP_TERMS = (
+    "exit load",
+    "expense ratio",
+    "lock in",
+    "nav",
+    "minimum sip",
+    "minimum investment",
+    "lumpsum",
+    "benchmark",
+    "fund manager",
+    "riskometer",
+    "risk",
+    "aum",
+    "fund size",
+    "launch date",
+    "category",
+    "statement",
+)
+# Markers of comparisons, explanations or multi-part questions.
+COMPLEX_TERMS = re.compile(
+    r"\b(compare|comparison|difference|differ|versus|vs|why|explain|how does|how do|"
+    r"pros|cons|impact|calculate|which is)\b"
+)
+_NOT_FOUND = re.compile(r"couldn.?t find|could not find|not (?:available|mentioned) in", re.I)
+_WORD = re.compile(r"[a-z0-9.%]+")
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    tier: str
+    confidence: float
+    reasons: List[str] = field(default_factory=list)
+
+
+def is_not_found(answer: str) -> bool:
+    return bool(_NOT_FOUND.search(answer))
+
+
+def _agreement(first: str, second: str) -> bool:
+    """Answers agree when they state the same numbers and mostly the same words."""
+
+    first_words = set(_WORD.findall(first.lower()))
+    second_words = set(_WORD.findall(second.lower()))
+    numbers = {word for word in first_words | second_words if any(c.isdigit() for c in word)}
+    if numbers and (numbers & first_words) != (numbers & second_words):
+        return False
+    union = first_words | second_words
+    return not union or len(first_words & second_words) / len(union) >= 0.4
+
+
+class ModelRouter:
+    def __init__(self, settings: RoutingSettings, *, strong_model: str) -> None:
+        self._settings = settings
+        self.strong_model = strong_model
+        self.fast_model = settings.fast_model
+        self._shadow_pool = (
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="shadow")
+            if settings.shadow_rate > 0
+            else None
+        )
+        self._shadow_slots = threading.BoundedSemaphore(max(1, settings.shadow_max_pending))
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {
+            "fast": 0,
+            "strong": 0,
+            "escalated": 0,
+            "shadow": 0,
+            "shadow_agree": 0,
+            "shadow_dropped": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def choose(self, question: str, matches: Sequence[dict]) -> RouteDecision:
+        scores = [float(match.get("score") or 0.0) for match in matches]
+        top = scores[0] if scores else 0.0
+        gap = top - scores[1] if len(scores) > 1 else top
+        if not self._settings.enabled or not self.fast_model:
+            return RouteDecision(self.strong_model, "strong", top, ["routing disabled"])
+
+        normalized = " ".join(_WORD.findall(question.lower().replace("-", " ")))
+        reasons = []
+        if top < self._settings.min_score:
+            reasons.append(f"top score {top:.2f} < {self._settings.min_score}")
+        if gap < self._settings.min_gap:
+            reasons.append(f"score gap {gap:.2f} < {self._settings.min_gap}")
+        if len(normalized.split()) > self._settings.max_question_words:
+            reasons.append("long question")
+        if COMPLEX_TERMS.search(normalized):
+            reasons.append("comparison or explanation")
+        if not any(f" {term} " in f" {normalized} " for term in LOOKUP_TERMS):
+            reasons.append("not a single-fact lookup")
+        tier = "strong" if reasons else "fast"
+        self._count(tier)
+        model = self.strong_model if reasons else self.fast_model
+        LOGGER.debug("Routing to %s (%s): %s", model, tier, "; ".join(reasons) or "lookup")
+        return RouteDecision(model, tier, top, reasons)
+
+    def escalate(self, decision: RouteDecision, reason: str) -> RouteDecision:
+        self._count("escalated")
+        return RouteDecision(self.strong_model, "strong", decision.confidence, [reason])
+
+    def shadow(self, fast_answer: str, answer_strong: Callable[[], str]) -> None:
+        """Answer with the strong model in the background and record whether it agrees."""
+
+        if self._shadow_pool is None or random.random() >= self._settings.shadow_rate:
+            return
+        # The pool's queue is unbounded; under load, drop samples instead of piling up calls.
+        if not self._shadow_slots.acquire(blocking=False):
+            self._count("shadow_dropped")
+            return
+
+        def _compare() -> None:
+            try:
+                strong_answer = answer_strong()
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.warning("Shadow answer failed: %s", exc)
+                return
+            finally:
+                self._shadow_slots.release()
+            agreed = _agreement(fast_answer, strong_answer)
+            with self._lock:
+                self.counts["shadow"] += 1
+                self.counts["shadow_agree"] += int(agreed)
+                total, agree = self.counts["shadow"], self.counts["shadow_agree"]
+            if not agreed:
+                LOGGER.info("Shadow mismatch: fast=%r strong=%r", fast_answer, strong_answer)
+            LOGGER.info(
+                "Shadow compare: %s/%s fast answers agree with %s (%.0f%%)",
+                agree,
+                total,
+                self.strong_model,
+                100 * agree / total,
+            )
+
+        try:
+            self._shadow_pool.submit(_compare)
+        except RuntimeError:  # the pool was shut down
+            self._shadow_slots.release()
+
+    def close(self) -> None:
+        if self._shadow_pool is not None:
+            self._shadow_pool.shutdown(wait=False)
@@ -2,20 +2,55 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from datetime import datetime, timezone
+import json
+import logging
 import re
+import time
 
-from typing import Optional
+from typing import Dict, Iterator, Optional
 
-from ..config import get_settings
+from ..config import AppSettings, get_settings
 from ..models import Citation, QueryAnswer, QueryRequest, QueryType
 from .advice_guard import AdviceGuard
 from .citation import build_citation
+from .deadline import Deadline
 from .llm import OpenAIClient
+from .model_router import ModelRouter, is_not_found
+from .question_bank import BankMatch
 from .retriever import RetrieverService
+from .sessions import Session, SessionStore
 
 
+LOGGER = logging.getLogger(__name__)
+
 GENERIC_SCHEME_TERMS = {"direct", "plan", "growth", "regular", "scheme"}
+# Prefix of the per-request log line; the replay tool (benchmarks/replay.py) parses it.
+QUERY_LOG_PREFIX = "query_log "
+
+
+class _StageTimer:
+    """Wall time per request stage, in milliseconds."""
+
+    def __init__(self, stages: Optional[Dict[str, float]] = None) -> None:
+        self.stages: Dict[str, float] = {} if stages is None else stages
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stages[name] = round(self.stages.get(name, 0.0) + elapsed, 3)
+
+
+def _check(deadline: Optional[Deadline], stage: str) -> None:
+    """Stop before starting ``stage`` if the request was cancelled or is out of time."""
+
+    if deadline is not None:
+        deadline.check(stage)
 
 
 class QueryService:
@@ -25,11 +60,21 @@ class QueryService:
         guard: Optional[AdviceGuard] = None,
         llm: Optional[OpenAIClient] = None,
         retriever: Optional[RetrieverService] = None,
+        router: Optional[ModelRouter] = None,
+        sessions: Optional[SessionStore] = None,
+        settings: Optional[AppSettings] = None,
     ) -> None:
-        self._settings = get_settings()
+        self._settings = settings or get_settings()
         self._guard = guard or AdviceGuard.default()
         self._llm = llm or OpenAIClient()
-        self._retriever = retriever or RetrieverService()
+        self._retriever = retriever or RetrieverService(self._settings)
+        self._router = router or ModelRouter(
+            self._settings.routing,
+            strong_model=getattr(self._llm, "chat_model", self._settings.openai.chat_model),
+        )
+        if sessions is None and self._settings.sessions.enabled:
+            sessions = SessionStore(self._settings.sessions)
+        self.sessions = sessions
 
     def _advice_response(self) -> QueryAnswer:
         return QueryAnswer(
@@ -51,13 +96,101 @@ class QueryService:
             method="no_result",
         )
 
-    def handle(self, payload: QueryRequest) -> QueryAnswer:
+    def _bank_response(self, match: BankMatch) -> QueryAnswer:
+        citation = build_citation(match.entry)
+        return QueryAnswer(
+            answer=match.entry["answer"],
+            citations=[citation.url],
+            confidence=round(match.score, 3),
+            method="question_bank",
+            last_updated=citation.last_verified,
+        )
+
+    def handle(
+        self,
+        payload: QueryRequest,
+        *,
+        deadline: Optional[Deadline] = None,
+        stages: Optional[Dict[str, float]] = None,
+    ) -> QueryAnswer:
+        """Answer ``payload``; upstream calls are bounded by ``deadline`` when one is given.
+
+        ``stages``, when given, is filled with the request's wall time per stage in
+        milliseconds, as logged in its ``query_log`` line. Raises ``DeadlineExceeded`` or
+        ``RequestCancelled`` (see :mod:`.deadline`) when the deadline runs out or the
+        request is cancelled.
+        """
+
         question = payload.query.strip()
-        if self._guard.classify(question):
+        received_at = time.time()
+        timer = _StageTimer(stages)
+        response: Optional[QueryAnswer] = None
+        try:
+            with timer.stage("total"):
+                response = self._answer(question, timer, deadline, payload.session_id)
+            response.session_id = payload.session_id
+        finally:
+            entry = {
+                "ts": round(received_at, 3),
+                "question": question,
+                "session": payload.session_id,
+                # "aborted": cancelled, expired or failed before an answer was ready.
+                "method": response.method if response else "aborted",
+                "model": response.model if response else None,
+                "stages_ms": timer.stages,
+            }
+            LOGGER.info("%s%s", QUERY_LOG_PREFIX, json.dumps(entry, ensure_ascii=False))
+        return response
+
+    def _answer(
+        self,
+        question: str,
+        timer: _StageTimer,
+        deadline: Optional[Deadline],
+        session_id: Optional[str] = None,
+    ) -> QueryAnswer:
+        with timer.stage("guard"):
+            refused = self._guard.classify(question)
+        if refused:
             return self._advice_response()
 
-        embedding = self._llm.embed(question)
-        matches = self._retriever.query(embedding)
+        session: Optional[Session] = None
+        follow_up = False
+        matches = []
+        if session_id and self.sessions is not None:
+            with timer.stage("session"):
+                session = self.sessions.begin(session_id)
+                follow_up = self.sessions.is_follow_up(
+                    session, question, self._retriever.scheme_vocabulary
+                )
+                if follow_up:
+                    matches = self.sessions.rerank(
+                        session, question, self._retriever.corpus_version
+                    )
+                    self.sessions.record_follow_up(session, reused=bool(matches))
+        reused = bool(matches)
+        if not reused:
+            # A follow-up names no scheme; search with the session's so it lands on that one.
+            search_text = f"{session.scheme} {question}" if follow_up else question
+            _check(deadline, "embed")
+            with timer.stage("embed"):
+                embedding = self._llm.embed(search_text, deadline=deadline)
+            with timer.stage("bank"):
+                banked = self._retriever.match_question(embedding, search_text)
+            if banked is not None:
+                if session is not None:
+                    self.sessions.remember(
+                        session, banked.entry["scheme"], [], self._retriever.corpus_version
+                    )
+                return self._bank_response(banked)
+            _check(deadline, "retrieve")
+            with timer.stage("retrieve"):
+                matches = self._retriever.query(
+                    embedding,
+                    top_k=self._settings.corpus.top_k,
+                    question=search_text,
+                    deadline=deadline,
+                )
         if not matches:
             return self._no_result_response()
 
@@ -66,21 +199,46 @@ class QueryService:
             prefix = match.get("section") or "Section"
             contexts.append(f"{prefix}: {match.get('content', '')}")
 
-        answer = self._llm.answer(question, contexts)
+        decision = self._router.choose(question, matches)
+        _check(deadline, "generate")
+        with timer.stage("generate"):
+            answer = self._llm.answer(
+                question, contexts, model=decision.model, deadline=deadline
+            )
+            if decision.tier == "fast" and is_not_found(answer):
+                # The fast model missed a fact retrieval found; let the strong model try.
+                decision = self._router.escalate(decision, "fast model found no answer")
+                answer = self._llm.answer(
+                    question, contexts, model=decision.model, deadline=deadline
+                )
+        if decision.tier == "fast":
+            self._router.shadow(
+                answer,
+                lambda: self._llm.answer(question, contexts, model=self._router.strong_model),
+            )
+
         ordered_citations = [build_citation(match) for match in matches]
         best_citation = self._select_best_citation(matches, ordered_citations, question)
         primary_url = best_citation.url
+        if session is not None and not reused:
+            best_match = matches[ordered_citations.index(best_citation)]
+            self.sessions.remember(
+                session, best_match.get("scheme"), matches, self._retriever.corpus_version
+            )
         clean_answer = answer.replace("[CITATION]", "").strip()
         last_updated = best_citation.last_verified
 
         return QueryAnswer(
             answer=clean_answer,
             citations=[primary_url],
-            method="rag",
+            confidence=round(decision.confidence, 3),
+            method="session_reuse" if reused else "rag",
+            model=decision.model,
             last_updated=last_updated,
         )
 
     def close(self) -> None:
+        self._router.close()
         self._retriever.close()
 
     @staticmethod
@@ -0,0 +1,85 @@
+"""Nearest-neighbour lookup in the question bank the data pipeline precomputes per version.
+
+Each entry is a likely question about one chunk, its embedding and a grounded answer of
+at most three sentences. A question that lands close enough to an entry is answered from
+the bank, skipping retrieval and the chat completion. Paraphrases that differ only in the
+scheme they name embed almost identically, so a match must also name exactly the
+entry's scheme: the question's scheme words have to pick out that scheme and no other.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Plan/option words shared by every scheme name; they never tell two schemes apart.
+_PLAN_WORDS = frozenset({"direct", "plan", "growth", "regular", "scheme", "idcw", "option"})
+
+
+def _words(text: str) -> Set[str]:
+    return set(_NON_WORD.sub(" ", text.lower().replace("&", " and ")).split())
+
+
+def scheme_words(scheme: str) -> Set[str]:
+    """The words of a scheme name that can tell it apart from other schemes."""
+
+    return _words(scheme) - _PLAN_WORDS
+
+
+@dataclass(frozen=True)
+class BankMatch:
+    entry: dict
+    score: float
+
+
+class QuestionBank:
+    def __init__(self, entries: Iterable[dict], *, min_score: float) -> None:
+        self.min_score = min_score
+        self._entries: List[dict] = []
+        rows: List[np.ndarray] = []
+        for entry in entries:
+            vector = np.frombuffer(bytes(entry["embedding"]), dtype=np.float32)
+            rows.append(vector / (np.linalg.norm(vector) or 1.0))
+            self._entries.append({key: value for key, value in entry.items() if key != "embedding"})
+        self._matrix = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+        self._schemes: Dict[str, FrozenSet[str]] = {
+            entry["scheme"]: frozenset(scheme_words(entry["scheme"]))
+            for entry in self._entries
+        }
+        self._vocabulary = frozenset().union(*self._schemes.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def vocabulary(self) -> FrozenSet[str]:
+        """Every word that names part of a scheme in the bank."""
+
+        return self._vocabulary
+
+    def _named_scheme(self, question: str) -> Optional[str]:
+        """The one scheme whose name contains every scheme word of ``question``, if any."""
+
+        named = _words(question) & self._vocabulary
+        if not named:
+            return None
+        candidates = [scheme for scheme, words in self._schemes.items() if named <= words]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def match(self, embedding: Sequence[float], question: str) -> Optional[BankMatch]:
+        if not self._entries:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = self._matrix @ (query / (np.linalg.norm(query) or 1.0))
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.min_score:
+            return None
+        entry = self._entries[best]
+        if self._named_scheme(question) != entry["scheme"]:
+            return None
+        return BankMatch(entry=dict(entry), score=score)
@@ -3,42 +3,254 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Sequence
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, FrozenSet, List, Optional, Sequence
 
 from pinecone import Pinecone
 from pymongo import MongoClient
 
-from ..config import get_settings
+from ..config import AppSettings, get_settings
+from .deadline import Deadline
+from .llm import build_embedding_provider
+from .question_bank import BankMatch, QuestionBank, scheme_words
+from .shard_router import ShardRouter
 
 LOGGER = logging.getLogger(__name__)
 
+# Must match the pointer document written by the data pipeline's MongoStore.
+ACTIVE_POINTER_ID = "active"
+
 
 class RetrieverService:
-    def __init__(self) -> None:
-        settings = get_settings()
-        if not settings.pinecone.api_key:
-            raise ValueError("PINECONE_API_KEY is required")
-        self._pinecone = Pinecone(api_key=settings.pinecone.api_key)
-        self._index = self._pinecone.Index(settings.pinecone.index_name)
-        self._mongo = MongoClient(settings.mongo.uri)
-        self._chunks = self._mongo[settings.mongo.db_name][settings.mongo.chunks_collection]
+    def __init__(
+        self,
+        settings: Optional[AppSettings] = None,
+        *,
+        index: Optional[Any] = None,
+        database: Optional[Any] = None,
+    ) -> None:
+        """``index`` and ``database`` replace the Pinecone index and Mongo database (replays)."""
+
+        settings = settings or get_settings()
+        if index is None:
+            if not settings.pinecone.api_key:
+                raise ValueError("PINECONE_API_KEY is required")
+            index = Pinecone(api_key=settings.pinecone.api_key).Index(settings.pinecone.index_name)
+        self._index = index
+        self._mongo = MongoClient(settings.mongo.uri) if database is None else None
+        db = self._mongo[settings.mongo.db_name] if database is None else database
+        self._chunks = db[settings.mongo.chunks_collection]
+        self._versions = db[settings.mongo.versions_collection]
+        self._questions = db[settings.mongo.questions_collection]
+        self._bank_settings = settings.question_bank
+        self._poll_seconds = settings.corpus.version_poll_seconds
+        self._cache_size = settings.corpus.chunk_cache_size
+        # Chunks are immutable within a corpus version, so they are cached per version.
+        self._chunk_cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._version_checked_at = float("-inf")
+        # Serialises pointer polls and version loads; readers never wait on it once a
+        # version is loaded.
+        self._refresh_lock = threading.Lock()
+        # Guards swapping in a loaded version and writes to the chunk cache.
+        self._version_lock = threading.Lock()
+        embedder = build_embedding_provider(settings=settings)
+        self._embedding = (embedder.name, embedder.dimensions)
+        self._embedding_error: Optional[str] = None
+        self._router: Optional[ShardRouter] = None
+        self._bank: Optional[QuestionBank] = None
+        self._scheme_vocabulary: FrozenSet[str] = frozenset()
+        self._shard_pool = ThreadPoolExecutor(
+            max_workers=settings.corpus.shard_query_workers, thread_name_prefix="shard-query"
+        )
 
     def close(self) -> None:
-        self._mongo.close()
+        self._shard_pool.shutdown(wait=False)
+        if self._mongo is not None:
+            self._mongo.close()
+
+    @property
+    def corpus_version(self) -> Optional[str]:
+        return self._refresh_version()
+
+    def _refresh_version(self) -> Optional[str]:
+        """The active corpus version, re-read from Mongo every ``version_poll_seconds``.
+
+        One thread polls the pointer and loads a new version's catalog and question bank;
+        meanwhile other requests keep using the current version. Only before the first
+        version is loaded do they wait for it.
+        """
+
+        now = time.monotonic()
+        if now - self._version_checked_at < self._poll_seconds:
+            return self._version
+        first_load = self._version_checked_at == float("-inf")
+        if not self._refresh_lock.acquire(blocking=first_load):
+            return self._version
+        try:
+            if now - self._version_checked_at < self._poll_seconds:
+                return self._version
+            pointer = self._versions.find_one({"_id": ACTIVE_POINTER_ID})
+            version = pointer.get("version") if pointer else None
+            if version != self._version:
+                LOGGER.info("Corpus version changed: %s -> %s", self._version, version)
+                self._load_version(version)
+            # Set last: lock-free readers must not see a fresh check before the version.
+            self._version_checked_at = now
+        finally:
+            self._refresh_lock.release()
+        return self._version
+
+    def _load_version(self, version: Optional[str]) -> None:
+        """Build ``version``'s router and question bank, then swap them in together."""
+
+        record = self._versions.find_one({"_id": version}) if version else None
+        embedding_error = self._check_embedding(version, record)
+        shards = (record or {}).get("shards")
+        router = ShardRouter(shards) if shards else None
+        bank = self._load_bank(version) if not embedding_error else None
+        vocabulary = frozenset(
+            word
+            for shard in shards or []
+            for term in shard.get("scheme_terms", [])
+            for word in scheme_words(term)
+        ).union(bank.vocabulary if bank is not None else ())
+        with self._version_lock:
+            self._version = version
+            self._chunk_cache.clear()
+            self._embedding_error = embedding_error
+            self._router = router
+            self._bank = bank
+            self._scheme_vocabulary = vocabulary
 
-    def fetch_chunks(self, ids: Sequence[str]) -> List[dict]:
+    def _check_embedding(self, version: Optional[str], record: Optional[dict]) -> Optional[str]:
+        """Compare the version's recorded embedding with ours; return an error if they differ."""
+
+        if not record or not record.get("embedding_model"):
+            return None
+        recorded = (record.get("embedding_model"), record.get("embedding_dimensions"))
+        if recorded == self._embedding:
+            return None
+        error = (
+            f"Corpus version {version} was embedded with {recorded[0]} ({recorded[1]} dims) "
+            f"but queries use {self._embedding[0]} ({self._embedding[1]} dims); "
+            "set EMBED_PROVIDER to match the data pipeline"
+        )
+        LOGGER.error(error)
+        return error
+
+    @property
+    def scheme_vocabulary(self) -> FrozenSet[str]:
+        """Words of the scheme names in the active version's shard catalog and question bank."""
+
+        self._refresh_version()
+        return self._scheme_vocabulary
+
+    def _load_bank(self, version: Optional[str]) -> Optional[QuestionBank]:
+        if not version or not self._bank_settings.enabled:
+            return None
+        bank = QuestionBank(
+            self._questions.find({"corpus_version": version}),
+            min_score=self._bank_settings.min_score,
+        )
+        LOGGER.info("Loaded %s question bank entries for corpus version %s", len(bank), version)
+        return bank if len(bank) else None
+
+    def match_question(self, embedding: List[float], question: str) -> Optional[BankMatch]:
+        """The precomputed bank entry answering ``question``, if one is close enough."""
+
+        self._refresh_version()
+        if self._embedding_error:
+            raise RuntimeError(self._embedding_error)
+        bank = self._bank
+        return bank.match(embedding, question) if bank is not None and embedding else None
+
+    def fetch_chunks(
+        self,
+        ids: Sequence[str],
+        version: Optional[str] = None,
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> List[dict]:
         if not ids:
             return []
-        docs = list(self._chunks.find({"chunk_id": {"$in": list(ids)}}))
-        return docs
+        found: List[dict] = []
+        missing: List[str] = []
+        for chunk_id in ids:
+            # One lookup per id: another thread may evict it between a check and a read.
+            doc = self._chunk_cache.get(chunk_id)
+            if doc is None:
+                missing.append(chunk_id)
+            else:
+                found.append(doc)
+        if missing:
+            query: dict = {"chunk_id": {"$in": missing}}
+            if version:
+                query["corpus_version"] = version
+            options = {}
+            if deadline is not None:
+                options["max_time_ms"] = max(1, int(deadline.check("fetch chunks") * 1000))
+            docs = list(self._chunks.find(query, **options))
+            with self._version_lock:
+                if version == self._version:
+                    for doc in docs:
+                        self._chunk_cache[doc.get("chunk_id")] = doc
+                    while len(self._chunk_cache) > self._cache_size:
+                        self._chunk_cache.popitem(last=False)
+            found.extend(docs)
+        return [dict(doc) for doc in found]
+
+    def _search(
+        self,
+        embedding: List[float],
+        top_k: int,
+        namespace: Optional[str],
+        deadline: Optional[Deadline] = None,
+    ) -> List[dict]:
+        kwargs: dict = {"namespace": namespace} if namespace else {}
+        if deadline is not None:
+            kwargs["_request_timeout"] = deadline.check("vector search")
+        response = self._index.query(
+            vector=embedding, top_k=top_k, include_metadata=True, **kwargs
+        )
+        return response.get("matches", [])
 
-    def query(self, embedding: List[float], top_k: int = 5) -> List[dict]:
+    def query(
+        self,
+        embedding: List[float],
+        top_k: int = 5,
+        question: Optional[str] = None,
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> List[dict]:
         if not embedding:
             return []
-        response = self._index.query(vector=embedding, top_k=top_k, include_metadata=True)
-        matches = response.get("matches", [])
+        version = self._refresh_version()
+        if self._embedding_error:
+            raise RuntimeError(self._embedding_error)
+        router = self._router
+        if router is None:
+            namespaces: List[Optional[str]] = [version]
+        else:
+            # Sharded versions: search only the shards the question is about, in parallel.
+            namespaces = list(router.route(question) if question else router.namespaces)
+        if len(namespaces) == 1:
+            matches = self._search(embedding, top_k, namespaces[0], deadline)
+        else:
+            results = self._shard_pool.map(
+                lambda namespace: self._search(embedding, top_k, namespace, deadline),
+                namespaces,
+            )
+            matches = sorted(
+                (match for result in results for match in result),
+                key=lambda match: match.get("score", 0),
+                reverse=True,
+            )[:top_k]
         chunk_ids = [match["id"] for match in matches if match.get("score", 0) > 0]
-        documents = self.fetch_chunks(chunk_ids)
+        documents = self.fetch_chunks(chunk_ids, version, deadline=deadline)
         chunk_map = {doc.get("chunk_id"): doc for doc in documents}
         ordered = []
         for match in matches:
@@ -47,5 +259,10 @@ class RetrieverService:
                 doc = chunk_map[chunk_id]
                 doc["score"] = match.get("score")
                 ordered.append(doc)
-        LOGGER.info("Retriever returned %s chunks", len(ordered))
+        LOGGER.info(
+            "Retriever returned %s chunks from %s shard(s) (corpus version %s)",
+            len(ordered),
+            len(namespaces),
+            version,
+        )
         return ordered
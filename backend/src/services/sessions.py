@@ -0,0 +1,187 @@
+"""Per-session memory of the last scheme discussed and the chunks retrieved for it.
+
+Clients that send a ``session_id`` get follow-up handling. A question that names no
+scheme other than the session's one ("and what's its exit load?") is first matched
+against the session's cached chunks by word overlap. When a cached chunk covers enough of
+the question, the answer is generated from the cached chunks and the embedding, vector
+search and Mongo fetch are skipped. Otherwise the question is retrieved as usual, with the
+session's scheme name added so it lands on the right scheme, and the new chunks of that
+scheme join the session's set. Sessions expire after ``SESSION_TTL_SECONDS`` of inactivity
+and the least recently used ones are evicted beyond ``SESSION_MAX_SESSIONS``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..config import SessionSettings
+from .question_bank import scheme_words
+
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_STOPWORDS = frozenset(
+    "a about an and are as at be by can do does for from how i if in is it its it's me my of "
+    "on or s so tell than that the then this to was what what's whats when where which who "
+    "why will with you your also same one".split()
+)
+# Upstream calls a reused follow-up does not make: query embedding, vector search, chunk fetch.
+REUSED_CALLS = ("embed", "vector_search", "chunk_fetch")
+
+
+def _content_words(text: str) -> Set[str]:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+@dataclass
+class Session:
+    scheme: Optional[str] = None
+    version: Optional[str] = None
+    chunks: "OrderedDict[str, dict]" = field(default_factory=OrderedDict)
+    questions: int = 0
+    follow_ups: int = 0
+    reused: int = 0
+    calls_avoided: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(REUSED_CALLS, 0))
+    touched_at: float = field(default_factory=time.monotonic)
+
+    def snapshot(self) -> dict:
+        return {
+            "scheme": self.scheme,
+            "chunks": len(self.chunks),
+            "questions": self.questions,
+            "follow_ups": self.follow_ups,
+            "reused": self.reused,
+            "calls_avoided": dict(self.calls_avoided),
+        }
+
+
+class SessionStore:
+    def __init__(self, settings: SessionSettings) -> None:
+        self.settings = settings
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Scheme words seen in retrieved chunks, so a question naming another scheme is
+        # recognised even when the corpus version has no shard catalog or question bank.
+        self._known_words: Set[str] = set()
+        self._expired = 0
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            expired = now - oldest.touched_at >= self.settings.ttl_seconds
+            if not expired and len(self._sessions) <= self.settings.max_sessions:
+                return
+            del self._sessions[session_id]
+            self._expired += 1
+
+    def begin(self, session_id: str) -> Session:
+        """The live session for ``session_id`` (a new one if it expired), for a new question."""
+
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None or now - session.touched_at >= self.settings.ttl_seconds:
+                session = Session()
+            session.touched_at = now
+            session.questions += 1
+            self._sessions[session_id] = session
+            self._evict(now)
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None or time.monotonic() - session.touched_at >= self.settings.ttl_seconds:
+            return None
+        return session
+
+    def is_follow_up(
+        self, session: Session, question: str, vocabulary: Iterable[str] = ()
+    ) -> bool:
+        """Whether ``question`` names no scheme other than the session's one."""
+
+        if session.scheme is None:
+            return False
+        with self._lock:
+            known = self._known_words.union(vocabulary)
+        named = _content_words(question) & known
+        return named <= scheme_words(session.scheme)
+
+    def rerank(self, session: Session, question: str, version: Optional[str]) -> List[dict]:
+        """Cached chunks covering at least ``min_overlap`` of the question's words, best first.
+
+        That share is set as ``overlap`` and decides the order; ``score`` stays the chunk's
+        retrieval score, so the model router judges a reused answer as it did the original.
+        """
+
+        with self._lock:
+            if session.version != version:
+                session.chunks.clear()
+                return []
+            chunks = list(session.chunks.values())
+        wanted = _content_words(question) - scheme_words(session.scheme or "")
+        if not wanted:
+            return []
+        scored = []
+        for chunk in chunks:
+            words = _content_words(f"{chunk.get('section', '')} {chunk.get('content', '')}")
+            overlap = len(wanted & words) / len(wanted)
+            if overlap >= self.settings.min_overlap:
+                scored.append({**chunk, "overlap": round(overlap, 3)})
+        scored.sort(
+            key=lambda chunk: (chunk["overlap"], chunk.get("score") or 0.0), reverse=True
+        )
+        return scored
+
+    def record_follow_up(self, session: Session, *, reused: bool) -> None:
+        with self._lock:
+            session.follow_ups += 1
+            if reused:
+                session.reused += 1
+                for call in REUSED_CALLS:
+                    session.calls_avoided[call] += 1
+
+    def remember(
+        self,
+        session: Session,
+        scheme: Optional[str],
+        matches: List[dict],
+        version: Optional[str],
+    ) -> None:
+        """Make ``scheme`` the session's scheme and cache the matches that belong to it."""
+
+        with self._lock:
+            for match in matches:
+                self._known_words |= scheme_words(match.get("scheme") or "")
+            if scheme is None:
+                return
+            if scheme != session.scheme or version != session.version:
+                session.chunks.clear()
+            session.scheme, session.version = scheme, version
+            for match in matches:
+                if match.get("scheme") == scheme and match.get("chunk_id"):
+                    session.chunks.pop(match["chunk_id"], None)
+                    session.chunks[match["chunk_id"]] = match
+            while len(session.chunks) > self.settings.max_chunks:
+                session.chunks.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict(time.monotonic())
+            sessions = list(self._sessions.values())
+            expired = self._expired
+        avoided = dict.fromkeys(REUSED_CALLS, 0)
+        for session in sessions:
+            for call, count in session.calls_avoided.items():
+                avoided[call] += count
+        return {
+            "active": len(sessions),
+            "expired": expired,
+            "questions": sum(session.questions for session in sessions),
+            "follow_ups": sum(session.follow_ups for session in sessions),
+            "reused": sum(session.reused for session in sessions),
+            "calls_avoided": avoided,
+        }
@@ -0,0 +1,66 @@
+"""Routes questions to the corpus shards (Pinecone namespaces) they are about.
+
+The data pipeline stores a shard catalog on each corpus version record: one entry per
+``<amc>.<category>`` shard with its namespace and the AMC, category and scheme terms that
+identify it. Terms are indexed by phrase, so routing a question costs a few dictionary
+lookups per word no matter how many shards the catalog holds.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Set
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower().replace("&", " and ")).split())
+
+
+class ShardRouter:
+    def __init__(self, catalog: Iterable[dict]) -> None:
+        self._namespaces: List[str] = []
+        self._index: Dict[str, Dict[str, Set[int]]] = {"scheme": {}, "amc": {}, "category": {}}
+        self._max_words = 1
+        for position, entry in enumerate(catalog):
+            self._namespaces.append(entry["namespace"])
+            for kind in self._index:
+                for term in entry.get(f"{kind}_terms", []):
+                    phrase = _normalize(term)
+                    if not phrase:
+                        continue
+                    self._index[kind].setdefault(phrase, set()).add(position)
+                    self._max_words = max(self._max_words, len(phrase.split()))
+
+    @property
+    def namespaces(self) -> List[str]:
+        return list(self._namespaces)
+
+    def _hits(self, kind: str, phrases: Set[str]) -> Set[int]:
+        index = self._index[kind]
+        return {position for phrase in phrases if phrase in index for position in index[phrase]}
+
+    def route(self, question: str) -> List[str]:
+        """Namespaces to search for ``question``; every shard when nothing narrows it down.
+
+        A named scheme selects its shard. Otherwise AMC and category mentions each narrow
+        the candidates, and a category that matches none of the named AMC's shards is ignored.
+        """
+
+        words = _normalize(question).split()
+        phrases = {
+            " ".join(words[start : start + size])
+            for size in range(1, self._max_words + 1)
+            for start in range(len(words) - size + 1)
+        }
+        selected = self._hits("scheme", phrases)
+        if not selected:
+            selected = set(range(len(self._namespaces)))
+            amcs = self._hits("amc", phrases)
+            if amcs:
+                selected &= amcs
+            categories = self._hits("category", phrases)
+            if selected & categories:
+                selected &= categories
+        return [self._namespaces[position] for position in sorted(selected)]
@@ -0,0 +1,92 @@
+"""Tests for request handling in the FastAPI app."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from starlette.requests import Request
+
+from backend.src.app import (
+    CLIENT_CLOSED_REQUEST,
+    REQUEST_TIMEOUT_HEADER,
+    _request_deadline,
+    app,
+)
+from backend.src.config import get_settings
+from backend.src.services.deadline import RequestCounters
+
+
+def _deadline_seconds(header=None):  # noqa: ANN001, ANN202
+    headers = [] if header is None else [(REQUEST_TIMEOUT_HEADER.lower().encode(), header.encode())]
+    return _request_deadline(Request({"type": "http", "headers": headers})).seconds
+
+
+@pytest.mark.parametrize("header", [None, "", "soon", "nan", "NaN", "inf", "-inf"])
+def test_missing_invalid_and_non_finite_timeouts_use_the_default(header):
+    assert _deadline_seconds(header) == get_settings().requests.timeout_seconds
+
+
+def test_timeout_header_is_clamped():
+    settings = get_settings().requests
+    assert _deadline_seconds("3.5") == 3.5
+    assert _deadline_seconds("0") == 0.1
+    assert _deadline_seconds("1e9") == settings.max_timeout_seconds
+
+
+class _BlockingService:
+    """Stands in for QueryService: works until its request's deadline is cancelled."""
+
+    def __init__(self) -> None:
+        self.deadline = None
+        self.stopped = threading.Event()
+
+    def handle(self, payload, *, deadline, stages):  # noqa: ANN001, ANN201
+        self.deadline = deadline
+        try:
+            while True:
+                deadline.check("generate")
+                time.sleep(0.01)
+        finally:
+            self.stopped.set()
+
+
+def test_client_disconnect_cancels_the_worker_and_returns_499():
+    service = _BlockingService()
+    app.state.query_service = service
+    app.state.request_counters = RequestCounters()
+    body = json.dumps({"query": "What is the exit load?"}).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def _receive():  # noqa: ANN202
+        # The body first; after that the client is gone.
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def _send(message):  # noqa: ANN001, ANN202
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/ask",
+        "raw_path": b"/ask",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(app(scope, _receive, _send))
+
+    assert sent[0]["type"] == "http.response.start"
+    assert sent[0]["status"] == CLIENT_CLOSED_REQUEST
+    assert service.stopped.wait(5)
+    assert service.deadline.cancelled
+    counts = app.state.request_counters.snapshot()
+    assert (counts["started"], counts["cancelled"], counts["in_flight"]) == (1, 1, 0)
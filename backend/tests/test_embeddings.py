@@ -0,0 +1,64 @@
+"""Tests that query embeddings match the data pipeline's corpus embeddings."""
+
+from __future__ import annotations
+
+import dataclasses
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.config import get_settings
+from backend.src.services import embeddings, llm
+
+PIPELINE_COPY = Path(__file__).resolve().parents[2] / "data-pipeline/src/embedding_providers.py"
+TEXTS = ["What is the exit load of HDFC Small Cap Fund?", "Expense ratio 0.67% (direct)", ""]
+
+
+def _pipeline_module():  # noqa: ANN202
+    spec = importlib.util.spec_from_file_location("pipeline_embedding_providers", PIPELINE_COPY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_backend_and_pipeline_share_identical_embedding_code():
+    # The services deploy separately, so the module is copied; it must not drift.
+    assert Path(embeddings.__file__).read_bytes() == PIPELINE_COPY.read_bytes()
+
+
+def test_backend_and_pipeline_produce_the_same_vectors():
+    pipeline = _pipeline_module()
+    for dimensions in (64, 512):
+        backend_vectors = embeddings.LocalHashEmbeddingProvider(dimensions).embed(TEXTS)
+        pipeline_vectors = pipeline.LocalHashEmbeddingProvider(dimensions).embed(TEXTS)
+        assert backend_vectors == pipeline_vectors
+
+    requests = []
+
+    def _client():  # noqa: ANN202
+        def create(**kwargs):  # noqa: ANN003, ANN202
+            requests.append(kwargs)
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0]) for _ in TEXTS])
+
+        return SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+    for module in (embeddings, pipeline):
+        module.OpenAIEmbeddingProvider(_client, model="text-embedding-3-small").embed(TEXTS)
+    assert requests[0] == requests[1]
+
+
+def test_local_embeddings_need_no_openai_key(monkeypatch):
+    settings = get_settings()
+    offline = dataclasses.replace(
+        settings,
+        openai=dataclasses.replace(settings.openai, api_key=""),
+        embedding=dataclasses.replace(settings.embedding, provider="local"),
+    )
+    monkeypatch.setattr(llm, "get_settings", lambda: offline)
+
+    client = llm.OpenAIClient()
+    assert len(client.embed("exit load")) == offline.embedding.local_dimensions
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        client.answer("exit load?", ["Exit load is 1%."])
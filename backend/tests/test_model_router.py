@@ -0,0 +1,44 @@
+"""Tests for the bounded background shadow compares of ModelRouter."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import replace
+
+from backend.src.config import get_settings
+from backend.src.services.model_router import ModelRouter
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:  # noqa: ANN001
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_shadow_samples_beyond_the_pending_limit_are_dropped_and_counted():
+    settings = replace(get_settings().routing, shadow_rate=1.0, shadow_max_pending=2)
+    router = ModelRouter(settings, strong_model="strong-model")
+    release = threading.Event()
+    calls = []
+
+    def _strong_answer() -> str:
+        calls.append(1)
+        release.wait(5)
+        return "Exit load of 1% within 1 year."
+
+    for _ in range(5):
+        router.shadow("Exit load of 1% within 1 year.", _strong_answer)
+    assert router.counts["shadow_dropped"] == 3
+
+    release.set()
+    assert _wait_for(lambda: router.counts["shadow"] == 2)
+    # Finished compares free their slots for new samples.
+    router.shadow("Exit load of 1% within 1 year.", _strong_answer)
+    assert _wait_for(lambda: router.counts["shadow"] == 3)
+    assert len(calls) == 3
+    assert router.counts["shadow_agree"] == 3 and router.counts["shadow_dropped"] == 3
+    router.close()
@@ -7,25 +7,36 @@ import os
 import pytest
 
 from backend.src.models import QueryRequest, QueryType
+from backend.src.services.deadline import Deadline, DeadlineExceeded, RequestCancelled
 from backend.src.services.query_service import QueryService
 
 
 class DummyGemini:
-    def embed(self, text: str):  # noqa: ANN001, D401
+    def embed(self, text: str, deadline=None):  # noqa: ANN001, D401
         """Return a deterministic fake embedding."""
 
         return [0.1, 0.2, 0.3]
 
-    def answer(self, question: str, contexts):  # noqa: ANN001
-        return "Stub answer [CITATION]"
+    def __init__(self, replies=None):  # noqa: ANN001
+        self.chat_model = "strong-model"
+        self.models = []
+        self._replies = replies or {}
+
+    def answer(self, question: str, contexts, model=None, deadline=None):  # noqa: ANN001
+        self.models.append(model)
+        return self._replies.get(model, "Stub answer [CITATION]")
 
 
 class DummyRetriever:
-    def __init__(self, matches):  # noqa: ANN001
+    def __init__(self, matches, banked=None):  # noqa: ANN001
         self._matches = matches
+        self._banked = banked
         self.received_embedding = None
 
-    def query(self, embedding, top_k: int = 5):  # noqa: ANN001
+    def match_question(self, embedding, question):  # noqa: ANN001
+        return self._banked
+
+    def query(self, embedding, top_k: int = 5, question=None, deadline=None):  # noqa: ANN001
         self.received_embedding = embedding
         return self._matches
 
@@ -49,6 +60,54 @@ def test_no_result_returns_fallback_message():
     assert response.citation.url.startswith("https://groww.in/")
 
 
+ROUTING_MATCHES = [
+    {
+        "chunk_id": "hdfc-elss#0",
+        "scheme": "HDFC ELSS Tax Saver Fund Direct Plan Growth",
+        "url": "https://groww.in/mutual-funds/hdfc-elss-tax-saver-fund-direct-plan-growth",
+        "section": "Exit Load",
+        "content": "Exit load is Nil.",
+        "score": 0.82,
+        "last_verified": "2025-11-15",
+    },
+    {
+        "chunk_id": "hdfc-elss#1",
+        "scheme": "HDFC ELSS Tax Saver Fund Direct Plan Growth",
+        "url": "https://groww.in/mutual-funds/hdfc-elss-tax-saver-fund-direct-plan-growth",
+        "section": "Expense Ratio",
+        "content": "Expense ratio is 0.68%.",
+        "score": 0.61,
+        "last_verified": "2025-11-15",
+    },
+]
+
+
+def test_confident_lookup_uses_fast_model_and_comparison_uses_strong():
+    llm = DummyGemini()
+    service = QueryService(llm=llm, retriever=DummyRetriever(ROUTING_MATCHES))
+    fast_model = service._router.fast_model
+
+    response = service.handle(QueryRequest(query="What is the exit load of HDFC ELSS?"))
+    assert response.model == fast_model
+    assert response.confidence == pytest.approx(0.82)
+
+    response = service.handle(QueryRequest(query="Compare the exit load and expense ratio"))
+    assert response.model == "strong-model"
+
+
+def test_fast_not_found_answer_escalates_to_strong_model():
+    service = QueryService(llm=DummyGemini(), retriever=DummyRetriever(ROUTING_MATCHES))
+    fast_model = service._router.fast_model
+    llm = DummyGemini({fast_model: "I couldn't find that in the context. [CITATION]"})
+    service = QueryService(llm=llm, retriever=DummyRetriever(ROUTING_MATCHES))
+
+    response = service.handle(QueryRequest(query="What is the exit load of HDFC ELSS?"))
+
+    assert llm.models == [fast_model, "strong-model"]
+    assert response.model == "strong-model"
+    assert response.answer == "Stub answer"
+
+
 @pytest.mark.integration
 def test_openai_generates_answer_with_real_model():
     if not os.getenv("OPENAI_API_KEY"):
@@ -81,3 +140,18 @@ def test_openai_generates_answer_with_real_model():
     assert "exit" in answer_lower or "nil" in answer_lower
     assert response.citation.url == matches[0]["url"]
     assert matches[0]["url"] in response.answer
+
+
+def test_cancelled_deadline_stops_before_upstream_calls():
+    llm = DummyGemini()
+    service = QueryService(llm=llm, retriever=DummyRetriever(ROUTING_MATCHES))
+    request = QueryRequest(query="What is the exit load of HDFC ELSS?")
+    deadline = Deadline(5)
+    deadline.cancel()
+
+    with pytest.raises(RequestCancelled):
+        service.handle(request, deadline=deadline)
+    assert llm.models == []
+
+    with pytest.raises(DeadlineExceeded):
+        service.handle(request, deadline=Deadline(0))
@@ -0,0 +1,88 @@
+"""Tests for answering from the precomputed question bank."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from backend.src.models import QueryRequest
+from backend.src.services.query_service import QueryService
+from backend.src.services.question_bank import QuestionBank
+
+SMALL_CAP = "HDFC Small Cap Fund Direct Growth"
+MID_CAP = "HDFC Mid Cap Fund Direct Growth"
+
+
+def _entry(scheme: str, question: str, vector) -> dict:  # noqa: ANN001
+    return {
+        "entry_id": f"{scheme}#q1",
+        "question": question,
+        "answer": "Exit load of 1% if redeemed within 1 year.",
+        "scheme": scheme,
+        "url": "https://groww.in/mutual-funds/" + scheme.lower().replace(" ", "-"),
+        "last_verified": "2025-11-15",
+        "embedding": np.asarray(vector, dtype=np.float32).tobytes(),
+    }
+
+
+class RecordingLLM:
+    chat_model = "strong-model"
+
+    def __init__(self):  # noqa: D401
+        self.answered = 0
+
+    def embed(self, text: str, deadline=None):  # noqa: ANN001
+        return [1.0, 0.0, 0.0]
+
+    def answer(self, question: str, contexts, model=None, deadline=None):  # noqa: ANN001
+        self.answered += 1
+        return "Generated [CITATION]"
+
+
+class BankRetriever:
+    def __init__(self, bank: QuestionBank):
+        self._bank = bank
+        self.queried = 0
+
+    def match_question(self, embedding, question):  # noqa: ANN001
+        return self._bank.match(embedding, question)
+
+    def query(self, embedding, top_k: int = 5, question=None, deadline=None):  # noqa: ANN001
+        self.queried += 1
+        return []
+
+    def close(self):  # noqa: D401
+        """No-op for tests."""
+
+
+BANK = [
+    _entry(SMALL_CAP, "What is the exit load of HDFC Small Cap Fund?", [1.0, 0.0, 0.0]),
+    _entry(MID_CAP, "What is the exit load of HDFC Mid Cap Fund?", [0.0, 1.0, 0.0]),
+]
+
+
+def test_bank_requires_close_match_naming_the_same_scheme():
+    bank = QuestionBank(BANK, min_score=0.9)
+
+    hit = bank.match([0.98, 0.1, 0.0], "exit load for HDFC small cap?")
+    assert hit is not None and hit.entry["scheme"] == SMALL_CAP
+    assert "embedding" not in hit.entry
+    # Close in embedding space, but about another scheme (or no single scheme).
+    assert bank.match([0.98, 0.1, 0.0], "exit load for HDFC mid cap?") is None
+    assert bank.match([0.98, 0.1, 0.0], "exit load for HDFC cap funds?") is None
+    assert bank.match([0.6, 0.6, 0.5], "exit load for HDFC small cap?") is None
+
+
+def test_bank_hit_skips_retrieval_and_generation():
+    llm = RecordingLLM()
+    retriever = BankRetriever(QuestionBank(BANK, min_score=0.9))
+    service = QueryService(llm=llm, retriever=retriever)
+    response = service.handle(QueryRequest(query="HDFC Small Cap exit load"))
+
+    assert response.method == "question_bank"
+    assert response.answer == BANK[0]["answer"]
+    assert response.citations == [BANK[0]["url"]]
+    assert "2025-11-15" in response.last_updated
+    assert llm.answered == 0 and retriever.queried == 0
+
+    response = service.handle(QueryRequest(query="What is the exit load of HDFC Mid Cap?"))
+    assert response.method == "no_result" and retriever.queried == 1
@@ -0,0 +1,87 @@
+"""Tests for the offline query-log replay tool."""
+
+from __future__ import annotations
+
+import logging
+
+from backend.src.benchmarks.replay import (
+    _sender,
+    configure,
+    diff_answers,
+    parse_server_timing,
+    read_query_log,
+    replay,
+)
+from backend.src.benchmarks.standins import StandInLLM, build_corpus, synthetic_chunks
+from backend.src.config import get_settings
+from backend.src.models import QueryRequest
+from backend.src.services.embeddings import LocalHashEmbeddingProvider
+from backend.src.services.query_service import QueryService
+from backend.src.services.retriever import RetrieverService
+
+
+def _service(overrides):  # noqa: ANN001
+    settings, sharded = configure(get_settings(), overrides)
+    embedder = LocalHashEmbeddingProvider(settings.embedding.local_dimensions)
+    index, database = build_corpus(
+        synthetic_chunks(), version="replay", sharded=sharded, embedder=embedder
+    )
+    llm = StandInLLM(
+        chat_model=settings.openai.chat_model, dimensions=embedder.dimensions, latency_ms={}
+    )
+    retriever = RetrieverService(settings, index=index, database=database)
+    return QueryService(llm=llm, retriever=retriever, settings=settings)
+
+
+def test_query_log_round_trip_and_replay(tmp_path, caplog):
+    questions = [
+        "What is the exit load of HDFC Small Cap Fund?",
+        "Who manages HDFC Flexi Cap Fund?",
+    ]
+    service = _service({})
+    with caplog.at_level(logging.INFO, logger="backend.src.services.query_service"):
+        for question in questions:
+            service.handle(QueryRequest(query=question))
+    log = tmp_path / "backend.log"
+    log.write_text("\n".join(record.getMessage() for record in caplog.records), encoding="utf-8")
+
+    entries = read_query_log([log])
+    assert [entry["question"] for entry in entries] == questions
+    assert entries[0]["offset"] == 0
+    assert {"guard", "embed", "retrieve", "generate", "total"} <= set(entries[0]["stages_ms"])
+
+    runs = []
+    for overrides in ({}, {"cache": "off", "top_k": "3"}):
+        candidate = _service(overrides)
+        results, _ = replay(entries, _sender(candidate, "service"), speed=0, concurrency=4)
+        candidate.close()
+        runs.append(results)
+
+    assert all("error" not in result and result["stages_ms"] for result in runs[0])
+    assert "Exit load" in runs[0][0]["answer"]
+    assert diff_answers(entries, runs[0], runs[1], examples=1)["changed"]["answer"] == 0
+
+
+def test_identical_questions_in_flight_keep_their_own_stage_timings():
+    service = _service({})
+    question = "What is the exit load of HDFC Small Cap Fund?"
+    entries = [{"question": question, "offset": 0.0} for _ in range(8)]
+    results, _ = replay(entries, _sender(service, "service"), speed=0, concurrency=8)
+    service.close()
+
+    for result in results:
+        stages = result["stages_ms"]
+        assert stages["total"] <= result["latency_ms"]
+        assert sum(ms for stage, ms in stages.items() if stage != "total") <= stages["total"]
+
+
+def test_app_target_reads_stage_timings_from_server_timing():
+    assert parse_server_timing("embed;dur=1.5, retrieve;desc=x;dur=40, miss") == {
+        "embed": 1.5,
+        "retrieve": 40.0,
+    }
+    service = _service({})
+    response, stages = _sender(service, "app")("Who manages HDFC Flexi Cap Fund?")
+    service.close()
+    assert response["answer"]
+    assert {"guard", "embed", "retrieve", "generate", "total"} <= set(stages)
@@ -0,0 +1,72 @@
+"""Tests for corpus version switching and the chunk cache in RetrieverService."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from backend.src.benchmarks.replay import configure
+from backend.src.benchmarks.standins import build_corpus, synthetic_bank, synthetic_chunks
+from backend.src.config import get_settings
+from backend.src.services.embeddings import LocalHashEmbeddingProvider
+from backend.src.services.retriever import RetrieverService
+
+
+def _retriever(cache_size: int = 2048):  # noqa: ANN202
+    settings, sharded = configure(get_settings(), {"bank": "on"})
+    settings = replace(settings, corpus=replace(settings.corpus, chunk_cache_size=cache_size))
+    embedder = LocalHashEmbeddingProvider(settings.embedding.local_dimensions)
+    chunks = synthetic_chunks()
+    index, database = build_corpus(
+        chunks, version="v1", sharded=sharded, embedder=embedder, bank=synthetic_bank(chunks)
+    )
+    return RetrieverService(settings, index=index, database=database), database, chunks
+
+
+def test_new_version_loads_without_blocking_requests_on_the_current_one():
+    retriever, database, chunks = _retriever()
+    assert retriever.corpus_version == "v1"
+    versions = database["corpus_versions"]
+    versions._by_id["v2"] = {**versions._by_id["v1"], "_id": "v2"}
+    versions._by_id["active"]["version"] = "v2"
+
+    questions = database["question_bank"]
+    loading, release = threading.Event(), threading.Event()
+    find = questions.find
+
+    def _slow_find(query, **options):  # noqa: ANN001, ANN202
+        loading.set()
+        release.wait(10)
+        return find(query, **options)
+
+    questions.find = _slow_find
+    retriever._version_checked_at -= 10**6  # the poll interval has passed
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        switch = pool.submit(lambda: retriever.corpus_version)
+        assert loading.wait(10)
+        # The bank of v2 is still loading; this request is served from v1 without waiting.
+        assert retriever.corpus_version == "v1"
+        assert retriever.fetch_chunks([chunks[0]["chunk_id"]], "v1")
+        assert not switch.done()
+        release.set()
+        assert switch.result(10) == "v2"
+    assert retriever.corpus_version == "v2"
+    retriever.close()
+
+
+def test_fetch_chunks_returns_cached_and_fetched_chunks_past_the_cache_size():
+    retriever, database, chunks = _retriever(cache_size=1)
+    ids = [chunk["chunk_id"] for chunk in chunks[:3]]
+    version = retriever.corpus_version
+
+    first = retriever.fetch_chunks(ids, version)
+    reads = database["chunks"].reads
+    second = retriever.fetch_chunks(ids, version)
+
+    assert sorted(doc["chunk_id"] for doc in first) == sorted(ids)
+    assert sorted(doc["chunk_id"] for doc in second) == sorted(ids)
+    # Only the most recently cached chunk is served without a read.
+    assert database["chunks"].reads == reads + 1
+    assert len(retriever._chunk_cache) == 1
+    retriever.close()
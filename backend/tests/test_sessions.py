@@ -0,0 +1,81 @@
+"""Tests for session-scoped reuse of retrieved chunks by follow-up questions."""
+
+from __future__ import annotations
+
+from backend.src.benchmarks.replay import configure
+from backend.src.benchmarks.standins import StandInLLM, build_corpus, synthetic_chunks
+from backend.src.config import get_settings
+from backend.src.models import QueryRequest
+from backend.src.services.embeddings import LocalHashEmbeddingProvider
+from backend.src.services.query_service import QueryService
+from backend.src.services.retriever import RetrieverService
+
+
+def _service():  # noqa: ANN202
+    settings, sharded = configure(get_settings(), {"bank": "off", "sessions": "on"})
+    embedder = LocalHashEmbeddingProvider(settings.embedding.local_dimensions)
+    index, database = build_corpus(
+        synthetic_chunks(), version="v1", sharded=sharded, embedder=embedder
+    )
+    llm = StandInLLM(
+        chat_model=settings.openai.chat_model, dimensions=embedder.dimensions, latency_ms={}
+    )
+    retriever = RetrieverService(settings, index=index, database=database)
+    return QueryService(llm=llm, retriever=retriever, settings=settings), index
+
+
+def _ask(service: QueryService, question: str, session_id: str = "s1"):  # noqa: ANN202
+    return service.handle(QueryRequest(query=question, session_id=session_id))
+
+
+def test_follow_up_reranks_session_chunks_without_retrieval():
+    service, index = _service()
+    first = _ask(service, "What is the expense ratio and exit load of HDFC Small Cap Fund?")
+    assert first.method == "rag" and first.session_id == "s1"
+    queries = index.queries
+
+    follow_up = _ask(service, "and what's its exit load?")
+    assert follow_up.method == "session_reuse"
+    assert follow_up.answer.startswith("Exit load")
+    assert follow_up.citations == first.citations
+    assert index.queries == queries
+
+    snapshot = service.sessions.get("s1").snapshot()
+    assert snapshot["scheme"] == "HDFC Small Cap Fund Direct Growth"
+    assert snapshot["reused"] == 1
+    assert snapshot["calls_avoided"] == {"embed": 1, "vector_search": 1, "chunk_fetch": 1}
+    service.close()
+
+
+def test_question_naming_another_scheme_is_retrieved_and_sessions_are_separate():
+    service, index = _service()
+    _ask(service, "What is the exit load of HDFC Small Cap Fund?")
+    queries = index.queries
+
+    other = _ask(service, "What is the exit load of HDFC ELSS Tax Saver Fund?")
+    assert other.method == "rag" and index.queries > queries
+    assert "elss" in other.citations[0]
+    assert service.sessions.get("s1").scheme.startswith("HDFC ELSS")
+
+    fresh = _ask(service, "and what's its exit load?", session_id="s2")
+    assert fresh.method == "rag"
+    assert service.sessions.stats()["reused"] == 0
+    service.close()
+
+
+def test_reused_follow_up_is_routed_on_its_retrieval_score():
+    service, _ = _service()
+    _ask(service, "What is the expense ratio and exit load of HDFC Small Cap Fund?")
+    session = service.sessions.get("s1")
+    for chunk in session.chunks.values():
+        chunk["score"] = 0.2  # weak retrieval, though the words will match fully
+
+    reranked = service.sessions.rerank(session, "and what's its exit load?", session.version)
+    assert reranked[0]["overlap"] == 1.0 and reranked[0]["score"] == 0.2
+
+    follow_up = _ask(service, "and what's its exit load?")
+    assert follow_up.method == "session_reuse"
+    assert follow_up.model == service._router.strong_model
+    assert follow_up.confidence == 0.2
+    assert service._router.counts["fast"] == 0
+    service.close()
@@ -0,0 +1,54 @@
+"""Tests for routing questions to corpus shards."""
+
+from __future__ import annotations
+
+from backend.src.services.shard_router import ShardRouter
+
+CATALOG = [
+    {
+        "namespace": "v1.groww.help-center",
+        "amc_terms": ["groww"],
+        "category_terms": ["help center", "capital gains", "statement"],
+        "scheme_terms": ["capital gains statement"],
+    },
+    {
+        "namespace": "v1.hdfc.elss",
+        "amc_terms": ["hdfc"],
+        "category_terms": ["elss", "tax saver"],
+        "scheme_terms": ["hdfc elss tax saver fund direct plan growth", "hdfc elss"],
+    },
+    {
+        "namespace": "v1.hdfc.small-cap",
+        "amc_terms": ["hdfc"],
+        "category_terms": ["small cap"],
+        "scheme_terms": ["hdfc small cap fund direct growth", "hdfc small cap"],
+    },
+    {
+        "namespace": "v1.sbi.small-cap",
+        "amc_terms": ["sbi"],
+        "category_terms": ["small cap"],
+        "scheme_terms": ["sbi small cap fund"],
+    },
+]
+
+
+def test_named_scheme_routes_to_its_shard():
+    router = ShardRouter(CATALOG)
+
+    assert router.route("What is the exit load of HDFC Small Cap?") == ["v1.hdfc.small-cap"]
+
+
+def test_amc_and_category_mentions_narrow_the_shards():
+    router = ShardRouter(CATALOG)
+
+    assert router.route("Which HDFC funds have a lock-in?") == ["v1.hdfc.elss", "v1.hdfc.small-cap"]
+    assert router.route("expense ratio of small-cap funds") == [
+        "v1.hdfc.small-cap",
+        "v1.sbi.small-cap",
+    ]
+
+
+def test_unroutable_question_searches_every_shard():
+    router = ShardRouter(CATALOG)
+
+    assert router.route("What is NAV?") == router.namespaces
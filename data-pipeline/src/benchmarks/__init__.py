@@ -0,0 +1 @@
+"""Offline benchmarks for the data pipeline (run with ``python -m src.benchmarks.<name>``)."""
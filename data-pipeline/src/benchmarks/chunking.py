@@ -0,0 +1,156 @@
+"""Compare the legacy 700-word chunker with the structure-aware token chunker.
+
+Reports chunk counts, embedding tokens spent and lexical retrieval quality for the
+questions in ``docs/sample_qna.md``. Retrieval uses TF-IDF cosine so the benchmark runs
+offline; it is a proxy for the embedding retriever, not a replacement.
+
+Usage::
+
+    python -m src.benchmarks.chunking [--raw output/snapshots] [--top-k 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+from ..doc_processing import build_chunks, chunk_text
+from ..models import Chunk, SchemePage, ScrapedDocument
+from ..scraper import build_document
+from ..snapshot import load_raw_pages
+from ..tokens import get_tokenizer
+from .fixtures import synthetic_pages
+
+SAMPLE_QNA = Path(__file__).resolve().parents[3] / "docs" / "sample_qna.md"
+_QNA_PATTERN = re.compile(
+    r"\*\*Q:\*\*\s*(?P<question>.+?)\s*\n"
+    r"\s*\*\*A:\*\*\s*(?P<answer>.+?)\s*\*\(Source:\s*(?P<url>\S+?),",
+)
+_WORD = re.compile(r"[a-z0-9%.]+")
+_STOPWORDS = {
+    "the", "is", "a", "an", "of", "for", "on", "in", "to", "and", "if", "each", "you",
+    "your", "i", "do", "how", "what", "who", "my", "it", "this", "go", "need", "hdfc",
+    "fund", "direct", "plan", "growth", "groww", "carries", "visit", "manages",
+}
+
+
+@dataclass
+class QnA:
+    question: str
+    answer: str
+    url: str
+
+
+def load_sample_qna(path: Path = SAMPLE_QNA) -> List[QnA]:
+    text = path.read_text(encoding="utf-8")
+    return [QnA(**match.groupdict()) for match in _QNA_PATTERN.finditer(text)]
+
+
+def _terms(text: str) -> List[str]:
+    return [word.strip(".") for word in _WORD.findall(text.lower()) if word.strip(".")]
+
+
+class TfidfIndex:
+    def __init__(self, chunks: Sequence[Chunk]) -> None:
+        self._chunks = list(chunks)
+        docs = [Counter(_terms(f"{c.section} {c.content}")) for c in self._chunks]
+        df = Counter(term for doc in docs for term in doc)
+        self._idf = {term: math.log(len(docs) / count) + 1.0 for term, count in df.items()}
+        self._vectors = [self._weigh(doc) for doc in docs]
+
+    def _weigh(self, counts: Counter) -> Dict[str, float]:
+        weights = {t: (1 + math.log(n)) * self._idf.get(t, 0.0) for t, n in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {t: w / norm for t, w in weights.items()}
+
+    def search(self, query: str, top_k: int) -> List[Chunk]:
+        q = self._weigh(Counter(_terms(query)))
+        scored = [
+            (sum(w * vec.get(t, 0.0) for t, w in q.items()), idx)
+            for idx, vec in enumerate(self._vectors)
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self._chunks[idx] for _, idx in scored[:top_k]]
+
+
+def _legacy_chunks(doc: ScrapedDocument) -> List[Chunk]:
+    return [
+        Chunk(
+            scheme=doc.scheme,
+            category=doc.category,
+            url=doc.url,
+            section=f"Section {idx}",
+            content=segment,
+            last_verified=doc.last_verified,
+        )
+        for idx, segment in enumerate(chunk_text(doc.text), start=1)
+    ]
+
+
+def evaluate(
+    name: str,
+    docs: Sequence[ScrapedDocument],
+    chunker: Callable[[ScrapedDocument], List[Chunk]],
+    qna: Sequence[QnA],
+    top_k: int,
+) -> dict:
+    tokenizer = get_tokenizer()
+    chunks = [chunk for doc in docs for chunk in chunker(doc)]
+    index = TfidfIndex(chunks)
+    hits = 0
+    top1_hits = 0
+    recall = 0.0
+    context_tokens = 0
+    for item in qna:
+        results = index.search(item.question, top_k)
+        hits += any(chunk.url == item.url for chunk in results)
+        top1_hits += bool(results) and results[0].url == item.url
+        key_terms = set(_terms(item.answer)) - _STOPWORDS
+        found = set(_terms(" ".join(c.content for c in results if c.url == item.url)))
+        recall += len(key_terms & found) / len(key_terms) if key_terms else 0.0
+        # The backend sends the top 3 matches to the chat model.
+        context_tokens += sum(tokenizer.count(c.content) for c in results[:3])
+    total = len(qna) or 1
+    return {
+        "chunker": name,
+        "chunks": len(chunks),
+        "embedding_tokens": sum(tokenizer.count(c.content) for c in chunks),
+        "distinct_sections": len({c.section for c in chunks}),
+        f"url_hit@{top_k}": round(hits / total, 3),
+        "url_hit@1": round(top1_hits / total, 3),
+        f"answer_term_recall@{top_k}": round(recall / total, 3),
+        "avg_prompt_context_tokens": round(context_tokens / total, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw", type=Path, help="page snapshot dir/manifest or raw_documents.json")
+    parser.add_argument("--synthetic", type=int, default=6, help="pages to generate without --raw")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = load_raw_pages(args.raw) if args.raw else None
+    raw = raw or synthetic_pages(args.synthetic)
+    docs = [
+        build_document(SchemePage(d["scheme"], d["category"], d["url"]), d["html"]) for d in raw
+    ]
+    qna = load_sample_qna()
+    rows = [
+        evaluate("legacy-700-words", docs, _legacy_chunks, qna, args.top_k),
+        evaluate("sections+tokens", docs, build_chunks, qna, args.top_k),
+    ]
+    tokens_exact = get_tokenizer().exact
+    print(f"pages={len(docs)} questions={len(qna)} exact_tokens={tokens_exact}")
+    for row in rows:
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Crawl a local fixture site to measure frontier throughput and resume behaviour.
+
+The site serves Groww-like scheme and blog pages that link to each other (with query
+strings, fragments and trailing slashes to exercise URL normalization), a robots.txt that
+disallows part of it, and a fixed per-request latency standing in for network time.
+
+Usage::
+
+    python -m src.benchmarks.crawl [--pages 300] [--latency-ms 50] [--workers 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from ..crawl import Crawler
+from ..models import SchemePage
+from ..snapshot import SnapshotWriter
+from .fixtures import synthetic_page
+
+_ROBOTS = "User-agent: *\nDisallow: /mutual-funds/closed-\n"
+
+
+class FixtureSite:
+    """Threaded HTTP server for ``pages`` linked fund pages plus a blog page per 10 funds."""
+
+    def __init__(self, pages: int, latency: float) -> None:
+        self.pages = pages
+        self.latency = latency
+        self.hits: Counter = Counter()
+        site = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                site.hits[self.path] += 1
+                body = site.render(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                time.sleep(site.latency)
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:  # noqa: ANN002
+                return
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def render(self, path: str) -> Optional[str]:
+        if path == "/robots.txt":
+            return _ROBOTS
+        kind, _, slug = path.strip("/").partition("/")
+        if kind not in {"mutual-funds", "blog"} or not slug.split("-")[-1].isdigit():
+            return None
+        idx = int(slug.split("-")[-1])
+        if idx >= self.pages:
+            return None
+        entry = {"scheme": f"Fixture {slug}", "category": kind, "url": self.base + path}
+        html = synthetic_page(entry, seed=idx, paragraphs=2)["html"]
+        links = [
+            f'<a href="/mutual-funds/fund-{(idx * 7 + k) % self.pages}?tab=overview">x</a>'
+            for k in range(1, 6)
+        ]
+        links.append(f'<a href="/mutual-funds/fund-{(idx + 1) % self.pages}/#returns">next</a>')
+        links.append(f'<a href="/blog/post-{idx // 10}">blog</a>')
+        links.append(f'<a href="/mutual-funds/closed-{idx}">closed</a>')
+        links.append('<a href="/login">login</a>')
+        return html.replace("</body>", "".join(links) + "</body>")
+
+    def close(self) -> None:
+        self._server.shutdown()
+
+
+def _crawl(site: FixtureSite, workdir: Path, *, workers: int, stop_after: int = 0) -> dict:
+    seed = SchemePage("Fixture fund-0", "Mutual Fund", f"{site.base}/mutual-funds/fund-0")
+    crawler = Crawler(
+        [seed],
+        max_depth=50,
+        max_pages=site.pages * 2,
+        workers=workers,
+        host_rps=0,
+        state_path=workdir / "crawl_state.sqlite3",
+        snapshot_root=workdir / "snapshots",
+    )
+    started = time.perf_counter()
+    count = 0
+    with SnapshotWriter(f"run-{time.time_ns()}", root=workdir / "snapshots") as writer:
+        for doc in crawler.crawl(f"crawl-{workers}"):
+            writer.write(doc)
+            count += 1
+            if stop_after and count >= stop_after:
+                break
+    elapsed = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "documents": count,
+        "fetched": crawler.fetched,
+        "failed": crawler.failed,
+        "blocked": crawler.blocked,
+        "seconds": round(elapsed, 2),
+        "pages_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    site = FixtureSite(args.pages, args.latency_ms / 1000)
+    rows = []
+    try:
+        for workers in (1, args.workers):
+            with tempfile.TemporaryDirectory() as tmp:
+                rows.append(_crawl(site, Path(tmp), workers=workers))
+        with tempfile.TemporaryDirectory() as tmp:
+            site.hits.clear()
+            first = _crawl(site, Path(tmp), workers=args.workers, stop_after=args.pages // 3)
+            resumed = _crawl(site, Path(tmp), workers=args.workers)
+            refetched = sum(1 for path, n in site.hits.items() if n > 1 and path != "/robots.txt")
+            rows.append({"interrupted": first, "resumed": resumed, "refetched_pages": refetched})
+    finally:
+        site.close()
+    print(f"pages={args.pages} latency_ms={args.latency_ms}")
+    for row in rows:
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
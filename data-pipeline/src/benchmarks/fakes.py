@@ -0,0 +1,151 @@
+"""In-process stand-ins for Mongo, Pinecone and the OpenAI embeddings API.
+
+They keep counts and ids rather than payloads, so memory measured around a benchmark run
+belongs to the pipeline and not to the stand-ins.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import BankEntry, Chunk, ScrapedDocument
+from ..storage import ACTIVE_POINTER_ID, WriteStats
+
+
+class InMemoryMongoStore:
+    """Implements the :class:`~src.storage.MongoStore` methods used by ``run_pipeline``."""
+
+    def __init__(self) -> None:
+        self.documents: Dict[str, Optional[str]] = {}
+        self.chunks: Counter = Counter()
+        self.questions: Counter = Counter()
+        self.versions: Dict[str, dict] = {}
+        self.writes = 0
+
+    def ensure_indexes(self) -> None:
+        return None
+
+    def upsert_documents(
+        self, documents: Iterable[ScrapedDocument], *, snapshot: Optional[str] = None
+    ) -> WriteStats:
+        stats = WriteStats()
+        for doc in documents:
+            self.documents[doc.url] = doc.content_hash
+            stats.operations += 1
+        self.writes += 1
+        return stats
+
+    def upsert_chunks(self, chunks: Iterable[Chunk], *, version: Optional[str] = None) -> List[str]:
+        ids = [chunk.chunk_id or f"{chunk.url}#{chunk.section}" for chunk in chunks]
+        self.chunks[version] += len(ids)
+        self.writes += 1
+        return ids
+
+    def upsert_questions(
+        self, entries: Iterable[Tuple[BankEntry, Sequence[float]]], *, version: str
+    ) -> WriteStats:
+        stats = WriteStats()
+        for _ in entries:
+            stats.operations += 1
+        self.questions[version] += stats.operations
+        self.writes += 1
+        return stats
+
+    def begin_version(self, version: str, **embedding: object) -> None:
+        record = self.versions.setdefault(
+            version, {"_id": version, "created_at": datetime.now(timezone.utc).isoformat()}
+        )
+        record.update(status="building", **embedding)
+
+    def active_version(self) -> Optional[str]:
+        pointer = self.versions.get(ACTIVE_POINTER_ID)
+        return pointer.get("version") if pointer else None
+
+    def set_shards(self, version: str, shards: List[dict]) -> None:
+        self.versions[version]["shards"] = shards
+
+    def activate_version(self, version: str) -> Optional[str]:
+        previous = self.active_version()
+        self.versions[ACTIVE_POINTER_ID] = {"_id": ACTIVE_POINTER_ID, "version": version}
+        self.versions[version]["status"] = "active"
+        if previous and previous != version:
+            self.versions[previous]["status"] = "retired"
+        return previous
+
+    def list_versions(self) -> List[dict]:
+        records = [r for key, r in self.versions.items() if key != ACTIVE_POINTER_ID]
+        return sorted(records, key=lambda r: r["created_at"], reverse=True)
+
+    def drop_version(self, version: str) -> int:
+        self.versions.pop(version, None)
+        self.questions.pop(version, None)
+        return self.chunks.pop(version, 0)
+
+    def close(self) -> None:
+        return None
+
+
+class InMemoryIndex:
+    """Pinecone index stand-in for :class:`~src.pinecone_loader.PineconeLoader`."""
+
+    def __init__(self) -> None:
+        self.vectors: Counter = Counter()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: List[dict], namespace: str = "") -> None:
+        with self._lock:
+            self.vectors[namespace] += len(vectors)
+            self.requests += 1
+
+    def delete(self, delete_all: bool = False, namespace: str = "") -> None:
+        with self._lock:
+            self.vectors.pop(namespace, None)
+
+    def describe_index_stats(self) -> dict:
+        with self._lock:
+            return {"namespaces": {ns: {"vector_count": n} for ns, n in self.vectors.items()}}
+
+
+@dataclass
+class _Datum:
+    embedding: List[float]
+
+
+@dataclass
+class _Response:
+    data: List[_Datum]
+
+
+class FakeEmbeddingsClient:
+    """Answers ``client.embeddings.create`` with deterministic vectors after ``latency``.
+
+    Vectors come from a small pool picked by content hash, so generating them costs little
+    next to the pipeline itself.
+    """
+
+    def __init__(self, dimensions: int, *, latency: float = 0.0, pool_size: int = 64) -> None:
+        rnd = random.Random(0)
+        self._pool = [[rnd.uniform(-1, 1) for _ in range(dimensions)] for _ in range(pool_size)]
+        self._latency = latency
+        self.requests = 0
+        self.inputs = 0
+        self.embeddings = self
+
+    def create(self, *, model: str, input: List[str], **_: object) -> _Response:  # noqa: A002
+        if self._latency:
+            time.sleep(self._latency)
+        self.requests += 1
+        self.inputs += len(input)
+        data = []
+        for text in input:
+            slot = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=4).digest(), "big")
+            data.append(_Datum(embedding=list(self._pool[slot % len(self._pool)])))
+        return _Response(data=data)
@@ -0,0 +1,122 @@
+"""Deterministic Groww-like HTML fixtures for offline benchmarks.
+
+Pages mirror the structure of the live scheme pages: a navigation bar, heading-delimited
+fact sections, a large ``__NEXT_DATA__`` JSON blob, "similar funds" links and a shared
+footer. The facts quoted in ``docs/sample_qna.md`` are planted on the matching pages so
+retrieval quality can be scored without network access.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import asdict
+from typing import Dict, List
+
+from ..registry import get_registry
+
+_NAV = "Home Stocks Mutual Funds F&O Upcoming IPOs Groww Digest Calculators Login/Register"
+_FOOTER = (
+    "Mutual fund investments are subject to market risks, read all scheme related documents "
+    "carefully. Groww Invest Tech Pvt. Ltd. (Formerly known as Nextbillion Technology Pvt. Ltd.) "
+    "SEBI Registration No. INZ000301838. AMFI Registration No. ARN-111686. Vaishnavi Tech "
+    "Park, South Tower, 3rd Floor, Sarjapur Main Road, Bellandur, Bengaluru 560103. "
+    "Contact Us Careers Press Blog Terms and Conditions Privacy Policy Disclosure Sitemap"
+)
+
+FACTS: Dict[str, Dict[str, str]] = {
+    "HDFC ELSS Tax Saver Fund Direct Plan Growth": {
+        "Exit load, stamp duty and tax": (
+            "Exit load Nil. Lock-in period 3 years: each investment carries a statutory "
+            "3-year lock-in under Section 80C."
+        ),
+        "Expense ratio": "Expense ratio 0.69% inclusive of GST.",
+    },
+    "HDFC Flexi Cap Fund Direct Plan Growth": {
+        "Exit load, stamp duty and tax": "Exit load of 1% if redeemed within 1 year.",
+        "Expense ratio": "Expense ratio 0.74% inclusive of GST.",
+        "Fund management": "Roshi Jain, fund manager since Jul 2022. Education CA, CFA, PGDM.",
+    },
+    "HDFC Large and Mid Cap Fund Direct Growth": {
+        "Exit load, stamp duty and tax": "Exit load of 1% if redeemed within 1 year.",
+        "Expense ratio": "Expense ratio 0.85% inclusive of GST.",
+    },
+    "HDFC Small Cap Fund Direct Growth": {
+        "Exit load, stamp duty and tax": (
+            "The exit load is 1% if redeemed within 1 year. Stamp duty on investment 0.005%."
+        ),
+        "Expense ratio": "Expense ratio 0.67% inclusive of GST.",
+    },
+    "HDFC Multi Cap Fund Direct Growth": {
+        "Exit load, stamp duty and tax": "Exit load of 1% if redeemed within 1 year.",
+        "Expense ratio": "Expense ratio 0.71% inclusive of GST.",
+    },
+    "Groww Capital Gains Statement Guide": {
+        "How to download the capital gains statement": (
+            "Go to Investments, then Statements, then Capital Gains, choose the financial "
+            "year you need and export the statement."
+        ),
+    },
+}
+
+_GENERIC_SECTIONS = [
+    "Fund details",
+    "Returns calculator",
+    "Holdings",
+    "Exit load, stamp duty and tax",
+    "Expense ratio",
+    "Fund management",
+    "Fund house",
+    "Investment objective",
+]
+
+
+def _words(rnd: random.Random, vocabulary: List[str], count: int) -> str:
+    return " ".join(rnd.choices(vocabulary, k=count))
+
+
+def synthetic_page(entry: dict, *, seed: int, paragraphs: int = 6) -> dict:
+    """Return a raw-document dict (scheme/category/url/html) for one page."""
+
+    rnd = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    facts = FACTS.get(entry["scheme"], {})
+    sections = list(dict.fromkeys(_GENERIC_SECTIONS + list(facts)))
+    body = []
+    for title in sections:
+        paras = [f"<p>{_words(rnd, vocabulary, 50)}</p>" for _ in range(paragraphs)]
+        if title in facts:
+            paras.insert(rnd.randint(0, len(paras)), f"<p>{facts[title]}</p>")
+        body.append(f"<section><h2>{title}</h2><div>{''.join(paras)}</div></section>")
+    similar = "".join(
+        f'<li><a href="https://groww.in/mutual-funds/similar-fund-{rnd.randint(0, 400)}">'
+        f"Similar fund {idx}</a> 3Y returns {rnd.randint(5, 30)}.{rnd.randint(0, 9)}%</li>"
+        for idx in range(12)
+    )
+    blob = json.dumps({"props": {"pageProps": [_words(rnd, vocabulary, 40) for _ in range(300)]}})
+    html = (
+        "<!DOCTYPE html><html><head><title>" + entry["scheme"] + "</title>"
+        "<style>.fund{color:#00d09c}</style></head><body>"
+        f"<nav>{_NAV}</nav><h1>{entry['scheme']}</h1>"
+        + "".join(body)
+        + f"<section><h2>Similar funds</h2><ul>{similar}</ul></section>"
+        + f"<footer>{_FOOTER}</footer>"
+        + f'<script id="__NEXT_DATA__" type="application/json">{blob}</script>'
+        "</body></html>"
+    )
+    return {**entry, "html": html}
+
+
+def synthetic_pages(count: int, *, paragraphs: int = 6) -> List[dict]:
+    """The seed scheme pages first, then numbered variants until ``count`` pages exist."""
+
+    seeds = [asdict(page) for page in get_registry().pages()]
+    pages = []
+    for idx in range(count):
+        seed = seeds[idx % len(seeds)]
+        entry = dict(seed)
+        if idx >= len(seeds):
+            entry["scheme"] = f"{seed['scheme']} #{idx}"
+            entry["url"] = f"{seed['url']}-{idx}"
+        pages.append(synthetic_page(entry, seed=idx, paragraphs=paragraphs))
+    return pages
@@ -0,0 +1,92 @@
+"""Compare the legacy multi-parse HTML path with the single lxml pass.
+
+Usage::
+
+    python -m src.benchmarks.html_parse --raw output/snapshots --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from bs4 import BeautifulSoup
+
+from ..html_extract import parse_page
+from ..models import SchemePage
+from ..registry import get_registry
+from ..scraper import build_document
+from ..snapshot import load_raw_pages
+from .fixtures import synthetic_pages
+
+_FUND_MANAGEMENT_PATTERN = get_registry().rules["fund_management_fallback"].pattern
+
+
+def _legacy_clean(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return "\n".join(
+        [line.strip() for line in soup.get_text(separator="\n").splitlines() if line.strip()]
+    )
+
+
+def _legacy_document(page: SchemePage, html: str) -> None:
+    """Scrape + chunk-time parsing as it worked before the shared lxml pass."""
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    text = "\n".join(
+        [line.strip() for line in soup.get_text(separator="\n").splitlines() if line.strip()]
+    )
+    [a["href"] for a in soup.find_all("a", href=True) if a["href"].startswith("https://groww.in/")]
+    if page.scheme == "HDFC Flexi Cap Fund Direct Plan Growth":
+        match = _FUND_MANAGEMENT_PATTERN.search(html)
+        if match and "Fund management" not in text:
+            BeautifulSoup(match.group(0), "html.parser").get_text(separator=" ")
+    _legacy_clean(html)  # normalize_text fallback parsed the page a second time
+
+
+def _time(fn: Callable[[], None], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw", type=Path, help="page snapshot dir/manifest or raw_documents.json")
+    parser.add_argument("--synthetic", type=int, default=30, help="pages to generate without --raw")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.raw:
+        docs = load_raw_pages(args.raw)
+    else:
+        docs = synthetic_pages(args.synthetic)
+    pages = [(SchemePage(d["scheme"], d["category"], d["url"]), d["html"]) for d in docs]
+    total_mb = sum(len(html) for _, html in pages) / 1e6
+
+    legacy = _time(lambda: [_legacy_document(page, html) for page, html in pages], args.repeat)
+    single = _time(lambda: [build_document(page, html) for page, html in pages], args.repeat)
+    # Sanity check: both paths agree on visible text.
+    for _, html in pages[:3]:
+        assert parse_page(html).text == _legacy_clean(html)
+
+    legacy_ms = statistics.median(legacy) * 1000
+    single_ms = statistics.median(single) * 1000
+    print(f"pages={len(pages)} html={total_mb:.1f} MB repeat={args.repeat}")
+    print(f"legacy (bs4 html.parser, 2-3 parses/page): {legacy_ms:9.1f} ms")
+    print(f"single pass (lxml):                        {single_ms:9.1f} ms")
+    print(f"speedup: {legacy_ms / single_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
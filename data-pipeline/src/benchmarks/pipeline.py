@@ -0,0 +1,363 @@
+"""End-to-end pipeline benchmark on recorded or synthetic pages with in-memory stand-ins.
+
+Each corpus size runs ``run_pipeline`` in a fresh subprocess, so peak RSS is measured per
+size, with pages served from fixtures, the local embedding provider (or a fake OpenAI
+client with ``--embedder fake``) and in-memory Mongo and Pinecone. Results (per-stage wall
+time and throughput, peak RSS and, optionally, cProfile and tracemalloc hot spots) are
+written to JSON; ``--baseline`` compares against an earlier result file and exits non-zero
+on a regression.
+
+Usage::
+
+    python -m src.benchmarks.pipeline --sizes 10,100,1000 [--fixtures output/snapshots]
+        [--profile cprofile|tracemalloc|both] [--baseline previous.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import logging
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config import CONFIG
+from ..crawl import Crawler
+from ..embedding import iter_embeddings
+from ..embedding_cache import EmbeddingCache
+from ..embedding_providers import (
+    EmbeddingProvider,
+    LocalHashEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+)
+from ..models import Chunk, EmbeddingRecord, SchemePage
+from ..pinecone_loader import PineconeLoader
+from ..pipeline import run_pipeline
+from ..registry import get_registry
+from ..snapshot import load_raw_pages
+from ..streaming import peak_rss_mb
+from .fakes import FakeEmbeddingsClient, InMemoryIndex, InMemoryMongoStore
+from .fixtures import synthetic_page
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+_TOP_N = 20
+
+
+def _corpus(
+    size: int, fixtures: Optional[Path]
+) -> Tuple[List[SchemePage], Callable[[str], str]]:
+    """Seed pages plus a ``url -> html`` function; HTML is produced on demand."""
+
+    recorded = load_raw_pages(fixtures) if fixtures else []
+    template = recorded or [asdict(page) for page in get_registry().pages()]
+    seeds: List[SchemePage] = []
+    sources: Dict[str, Callable[[], str]] = {}
+    for idx in range(size):
+        entry = dict(template[idx % len(template)])
+        if idx >= len(template):
+            entry["scheme"] = f"{entry['scheme']} #{idx}"
+            entry["url"] = f"{entry['url'].rstrip('/')}-{idx}"
+        seeds.append(SchemePage(entry["scheme"], entry["category"], entry["url"]))
+        if recorded:
+            # Recorded pages are replayed verbatim; copies beyond the first exercise dedup.
+            sources[entry["url"]] = lambda html=entry["html"]: html
+        else:
+            sources[entry["url"]] = lambda entry=entry, idx=idx: synthetic_page(
+                entry, seed=idx
+            )["html"]
+    return seeds, lambda url: sources[url]()
+
+
+def _profile_threads(profiles: List[cProfile.Profile]) -> Callable:
+    """``threading.setprofile`` hook that gives every new thread its own profiler."""
+
+    def _start(*_: object) -> None:
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+
+    return _start
+
+
+def _cprofile_rows(profiles: List[cProfile.Profile], dump: Optional[Path]) -> List[dict]:
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    if dump:
+        stats.dump_stats(str(dump))
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:_TOP_N]
+    return [
+        {
+            "function": f"{Path(file).name}:{line}({func})",
+            "calls": calls,
+            "self_seconds": round(tottime, 4),
+            "cumulative_seconds": round(cumtime, 4),
+        }
+        for (file, line, func), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+def _tracemalloc_rows() -> dict:
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>")]
+    )
+    return {
+        "traced_peak_mb": round(peak / 2**20, 1),
+        "traced_current_mb": round(current / 2**20, 1),
+        "retained_by_line": [
+            {
+                "location": f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "blocks": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:_TOP_N]
+        ],
+    }
+
+
+def run_once(
+    size: int,
+    *,
+    fixtures: Optional[Path] = None,
+    profile: str = "none",
+    embedder: str = "local",
+    embed_latency: float = 0.0,
+    profile_dump: Optional[Path] = None,
+) -> dict:
+    """Run the pipeline once over ``size`` pages and return its measurements."""
+
+    seeds, fetch = _corpus(size, fixtures)
+    store = InMemoryMongoStore()
+    index = InMemoryIndex()
+    provider: EmbeddingProvider = LocalHashEmbeddingProvider(CONFIG.embedding.local_dimensions)
+    if embedder == "fake":
+        provider = OpenAIEmbeddingProvider(
+            lambda: client, model="fake", dimensions=CONFIG.openai.embed_dimensions
+        )
+    client = FakeEmbeddingsClient(provider.dimensions, latency=embed_latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+
+        def _embed(chunks: Iterator[Chunk]) -> Iterator[EmbeddingRecord]:
+            # Opened here so the SQLite connection belongs to the embed stage's thread.
+            cache = EmbeddingCache(
+                workdir / "embedding_cache.sqlite3",
+                model=provider.name,
+                dimensions=provider.dimensions,
+            )
+            try:
+                yield from iter_embeddings(chunks, cache=cache, provider=provider)
+            finally:
+                cache.close()
+
+        crawler = Crawler(
+            seeds,
+            max_depth=0,
+            respect_robots=False,
+            host_rps=0,
+            state_path=workdir / "crawl_state.sqlite3",
+            snapshot_root=workdir / "snapshots",
+            fetch=fetch,
+        )
+        profiles: List[cProfile.Profile] = []
+        if profile in ("cprofile", "both"):
+            threading.setprofile(_profile_threads(profiles))
+            profiles.append(cProfile.Profile())
+            profiles[0].enable()
+        if profile in ("tracemalloc", "both"):
+            tracemalloc.start()
+        try:
+            run = run_pipeline(
+                workdir / "output",
+                store=store,
+                loader=PineconeLoader(index),
+                crawler=crawler,
+                provider=provider,
+                embedder=_embed,
+                snapshot_root=workdir / "snapshots",
+                sources_csv=workdir / "sources.csv",
+            )
+        finally:
+            if profiles:
+                profiles[0].disable()
+                threading.setprofile(None)
+
+    result = {
+        "pages": size,
+        "documents": run.documents,
+        "chunks_stored": sum(store.chunks.values()),
+        "vectors_upserted": sum(index.vectors.values()),
+        "embedder": provider.name,
+        "embedding_dimensions": provider.dimensions,
+        "seconds": round(run.seconds, 3),
+        "pages_per_second": round(run.documents / run.seconds, 2) if run.seconds else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": [
+            {
+                "name": stage.name,
+                "items_in": stage.items_in,
+                "items_out": stage.items_out,
+                "seconds": round(stage.seconds, 3),
+                "busy_seconds": round(stage.busy_seconds, 3),
+                "items_per_second": round(stage.throughput, 2),
+            }
+            for stage in run.stages
+        ],
+    }
+    if profiles:
+        result["cprofile_top_self_time"] = _cprofile_rows(profiles, profile_dump)
+    if tracemalloc.is_tracing():
+        result["tracemalloc"] = _tracemalloc_rows()
+        tracemalloc.stop()
+    return result
+
+
+def _run_in_subprocess(size: int, args: argparse.Namespace, output: Path) -> dict:
+    command = [
+        sys.executable,
+        "-m",
+        "src.benchmarks.pipeline",
+        "--single",
+        str(size),
+        "--profile",
+        args.profile,
+        "--embedder",
+        args.embedder,
+        "--embed-latency-ms",
+        str(args.embed_latency_ms),
+    ]
+    if args.fixtures:
+        command += ["--fixtures", str(args.fixtures.resolve())]
+    if args.profile in ("cprofile", "both"):
+        command += ["--profile-dump", str(output.with_name(f"{output.stem}-{size}.prof"))]
+    completed = subprocess.run(
+        command, cwd=PACKAGE_ROOT, check=True, stdout=subprocess.PIPE, text=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PACKAGE_ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Describe every metric that got worse than ``baseline`` by more than ``tolerance``."""
+
+    regressions = []
+    previous = {run["pages"]: run for run in baseline.get("runs", [])}
+    for run in current["runs"]:
+        old = previous.get(run["pages"])
+        if not old:
+            continue
+        checks = [("pages_per_second", -1), ("peak_rss_mb", 1), ("seconds", 1)]
+        for metric, direction in checks:
+            before, after = old.get(metric), run.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * direction
+            if change > tolerance:
+                regressions.append(
+                    f"{run['pages']} pages: {metric} {before} -> {after} ({change:+.0%} worse)"
+                )
+        old_stages = {stage["name"]: stage for stage in old.get("stages", [])}
+        for stage in run.get("stages", []):
+            before = old_stages.get(stage["name"], {}).get("busy_seconds")
+            after = stage.get("busy_seconds", 0.0)
+            # Sub-100ms stages are too noisy to compare.
+            if before and before > 0.1 and (after - before) / before > tolerance:
+                regressions.append(
+                    f"{run['pages']} pages: stage {stage['name']} busy {before}s -> {after}s"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated page counts")
+    parser.add_argument("--fixtures", type=Path, help="snapshot dir/manifest or raw JSON")
+    parser.add_argument(
+        "--profile", choices=["none", "cprofile", "tracemalloc", "both"], default="none"
+    )
+    parser.add_argument("--embedder", choices=["local", "fake"], default="local")
+    parser.add_argument(
+        "--embed-latency-ms", type=float, default=0.0, help="per-request delay for --embedder fake"
+    )
+    parser.add_argument("--output", type=Path, help="result JSON (default: output/benchmarks)")
+    parser.add_argument("--baseline", type=Path, help="earlier result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--profile-dump", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        logging.getLogger().setLevel(logging.WARNING)
+        result = run_once(
+            args.single,
+            fixtures=args.fixtures,
+            profile=args.profile,
+            embedder=args.embedder,
+            embed_latency=args.embed_latency_ms / 1000,
+            profile_dump=args.profile_dump,
+        )
+        print(json.dumps(result))
+        return
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = args.output or CONFIG.paths.output_dir / "benchmarks" / f"pipeline-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "created_at": stamp,
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "fixtures": str(args.fixtures) if args.fixtures else "synthetic",
+        "embedder": args.embedder,
+        "embed_latency_ms": args.embed_latency_ms,
+        "runs": [],
+    }
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        started = time.perf_counter()
+        run = _run_in_subprocess(size, args, output)
+        report["runs"].append(run)
+        stages = " ".join(f"{s['name']}={s['busy_seconds']}s" for s in run["stages"])
+        print(
+            f"{size:>6} pages: {run['seconds']:>8.2f}s {run['pages_per_second']:>8.1f} pages/s "
+            f"peak RSS {run['peak_rss_mb']:>7.1f} MiB | {stages} "
+            f"(wall {time.perf_counter() - started:.1f}s)"
+        )
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Per-run stage checkpoints so a failed pipeline run can be resumed instead of restarted.
+
+Layout under ``<output_dir>/runs/<version>/``::
+
+    manifest.json    run metadata and the status of each stage
+    chunks.jsonl     the chunk set, one chunk per line, appended as chunks are stored
+    embedded.jsonl   chunk ids of each embedded batch (vectors live in the embedding cache)
+    upserted.jsonl   chunk ids of each batch Pinecone acknowledged
+
+Scraped pages are checkpointed by the snapshot store and the crawl frontier, which the
+manifest points at through ``snapshot_id``. Appends are written through as they happen;
+a line cut short by a crash is ignored on read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import threading
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set
+
+from .models import Chunk
+
+LOGGER = logging.getLogger(__name__)
+
+STAGES = ("scrape", "chunk", "embed", "upsert", "questions")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _read_lines(path: Path) -> Iterator[dict]:
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as fp:
+        for line in fp:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                LOGGER.warning("Ignoring truncated checkpoint line in %s", path)
+
+
+class RunCheckpoint:
+    """Stage status and work units of one corpus version build.
+
+    Stages run on their own threads, so manifest updates are serialised by a lock.
+    """
+
+    def __init__(self, directory: Path, manifest: dict) -> None:
+        self.directory = directory
+        self.manifest = manifest
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, output_dir: Path, version: str, **metadata: object) -> "RunCheckpoint":
+        directory = output_dir / "runs" / version
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": version,
+            "status": "running",
+            "created_at": _now(),
+            **metadata,
+            "stages": {stage: {"status": "pending"} for stage in STAGES},
+        }
+        checkpoint = cls(directory, manifest)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, output_dir: Path, ref: str = "latest") -> "RunCheckpoint":
+        """Open run ``ref``, or with ``latest`` the newest run that has not completed."""
+
+        runs = output_dir / "runs"
+        if ref != "latest":
+            path = runs / ref / "manifest.json"
+            if not path.exists():
+                raise FileNotFoundError(f"No checkpointed run '{ref}' under {runs}")
+            return cls(path.parent, json.loads(path.read_text(encoding="utf-8")))
+        for path in sorted(runs.glob("*/manifest.json"), reverse=True):
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+            if manifest.get("status") != "complete":
+                return cls(path.parent, manifest)
+        raise FileNotFoundError(f"No unfinished run to resume under {runs}")
+
+    @staticmethod
+    def peek(output_dir: Path, version: str) -> Optional[dict]:
+        """The manifest of run ``version``, or None when it has no checkpoint."""
+
+        path = output_dir / "runs" / version / "manifest.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def remove(output_dir: Path, version: str) -> None:
+        shutil.rmtree(output_dir / "runs" / version, ignore_errors=True)
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def save(self) -> None:
+        with self._lock:
+            self.manifest["updated_at"] = _now()
+            path = self.directory / "manifest.json"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.manifest, indent=2), encoding="utf-8")
+            tmp.replace(path)
+
+    def _stage(self, stage: str) -> dict:
+        # Runs checkpointed before a stage existed have no entry for it yet.
+        return self.manifest["stages"].setdefault(stage, {"status": "pending"})
+
+    def done(self, stage: str) -> bool:
+        return self.manifest["stages"].get(stage, {}).get("status") == "done"
+
+    def start(self, stage: str) -> None:
+        with self._lock:
+            self.manifest["status"] = "running"
+            self._stage(stage).update(status="running", started_at=_now())
+        self.save()
+
+    def finish(self, stage: str, **details: object) -> None:
+        with self._lock:
+            self._stage(stage).update(status="done", finished_at=_now(), **details)
+        self.save()
+
+    def fail(self, error: BaseException) -> None:
+        with self._lock:
+            self.manifest.update(status="failed", error=f"{type(error).__name__}: {error}")
+            for state in self.manifest["stages"].values():
+                if state["status"] == "running":
+                    state["status"] = "interrupted"
+        self.save()
+
+    def complete(self) -> None:
+        with self._lock:
+            self.manifest.update(status="complete", completed_at=_now())
+            self.manifest.pop("error", None)
+        self.save()
+
+    # Chunk set -------------------------------------------------------------------------
+
+    def reset_chunks(self) -> None:
+        """Chunking is re-run as a whole (dedup needs every chunk), so drop a partial set."""
+
+        (self.directory / "chunks.jsonl").unlink(missing_ok=True)
+
+    def append_chunks(self, chunks: Iterable[Chunk]) -> None:
+        with (self.directory / "chunks.jsonl").open("a", encoding="utf-8") as fp:
+            for chunk in chunks:
+                fp.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+
+    def iter_chunks(self) -> Iterator[Chunk]:
+        for record in _read_lines(self.directory / "chunks.jsonl"):
+            yield Chunk(**record)
+
+    # Embedded and upserted batches -----------------------------------------------------
+
+    def _append_ids(self, name: str, ids: List[str]) -> None:
+        with (self.directory / name).open("a", encoding="utf-8") as fp:
+            fp.write(json.dumps({"ids": ids, "at": _now()}) + "\n")
+
+    def _ids(self, name: str) -> Set[str]:
+        return {chunk_id for line in _read_lines(self.directory / name) for chunk_id in line["ids"]}
+
+    def record_embedded(self, ids: List[str]) -> None:
+        self._append_ids("embedded.jsonl", ids)
+
+    def record_upserted(self, ids: List[str]) -> None:
+        self._append_ids("upserted.jsonl", ids)
+
+    def upserted_ids(self) -> Set[str]:
+        return self._ids("upserted.jsonl")
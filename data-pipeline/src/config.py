@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
@@ -28,6 +29,9 @@ class MongoSettings:
     db_name: str = _env("MONGODB_DB", "mutual_fund_faq")
     documents_collection: str = _env("MONGODB_COLLECTION_DOCUMENTS", "documents")
     chunks_collection: str = _env("MONGODB_COLLECTION_CHUNKS", "chunks")
+    versions_collection: str = _env("MONGODB_COLLECTION_VERSIONS", "corpus_versions")
+    questions_collection: str = _env("MONGODB_COLLECTION_QUESTIONS", "question_bank")
+    write_batch_size: int = int(_env("MONGODB_WRITE_BATCH_SIZE", "500"))
 
 
 @dataclass(frozen=True)
@@ -35,6 +39,10 @@ class PineconeSettings:
     api_key: str = _env("PINECONE_API_KEY", "")
     environment: str = _env("PINECONE_ENV", "")
     index_name: str = _env("PINECONE_INDEX", "groww-hdfc-faq")
+    upsert_batch_size: int = int(_env("PINECONE_UPSERT_BATCH_SIZE", "100"))
+    # Pinecone rejects upsert requests over 2 MB; leave headroom for the envelope.
+    upsert_max_bytes: int = int(_env("PINECONE_UPSERT_MAX_BYTES", "1800000"))
+    upsert_workers: int = int(_env("PINECONE_UPSERT_WORKERS", "4"))
 
 
 @dataclass(frozen=True)
@@ -42,11 +50,133 @@ class OpenAISettings:
     api_key: str = _env("OPENAI_API_KEY", "")
     embed_model: str = _env("OPENAI_EMBED_MODEL", "text-embedding-3-small")
     chat_model: str = _env("OPENAI_CHAT_MODEL", "gpt-4o")
+    # Unset: the model's native size, and no ``dimensions`` parameter is sent.
+    embed_dimensions: Optional[int] = int(_env("OPENAI_EMBED_DIMENSIONS", "") or 0) or None
+
+
+@dataclass(frozen=True)
+class EmbeddingSettings:
+    # "openai" or "local" (hashed features, no network); the backend must use the same.
+    provider: str = _env("EMBED_PROVIDER", "openai")
+    local_dimensions: int = int(_env("LOCAL_EMBED_DIMENSIONS", "512"))
+    # Requests are packed up to this many estimated tokens / inputs each.
+    batch_tokens: int = int(_env("EMBED_BATCH_TOKENS", "8000"))
+    batch_size: int = int(_env("EMBED_BATCH_SIZE", "256"))
+    workers: int = int(_env("EMBED_WORKERS", "4"))
+    # Account limits for the embedding model; 0 disables a limit.
+    requests_per_minute: int = int(_env("EMBED_RPM", "3000"))
+    tokens_per_minute: int = int(_env("EMBED_TPM", "1000000"))
+    max_retries: int = int(_env("EMBED_MAX_RETRIES", "6"))
 
 
 @dataclass(frozen=True)
 class PipelinePaths:
     output_dir: Path = Path(_env("DATA_OUTPUT_DIR", "./data-pipeline/output")).resolve()
+    embedding_cache: Path = Path(
+        _env("EMBED_CACHE_PATH", "./data-pipeline/output/embedding_cache.sqlite3")
+    ).resolve()
+    question_cache: Path = Path(
+        _env("QUESTION_BANK_CACHE_PATH", "./data-pipeline/output/question_cache.sqlite3")
+    ).resolve()
+
+
+@dataclass(frozen=True)
+class VersioningSettings:
+    # Number of corpus versions (including the active one) kept after a successful run.
+    keep_versions: int = int(_env("CORPUS_KEEP_VERSIONS", "2"))
+    # Unfinished ("building") versions are only collected once they are this old: without
+    # a local checkpoint another process may still be building them, and a failed run
+    # with one is kept that long for --resume.
+    stale_build_hours: float = float(_env("CORPUS_STALE_BUILD_HOURS", "6"))
+    resumable_build_hours: float = float(_env("CORPUS_RESUMABLE_BUILD_HOURS", "168"))
+    refresh_interval_minutes: float = float(_env("PIPELINE_REFRESH_MINUTES", "0"))
+
+
+@dataclass(frozen=True)
+class StreamingSettings:
+    # Max items buffered between two pipeline stages.
+    queue_size: int = int(_env("PIPELINE_QUEUE_SIZE", "8"))
+    # Stored chunks are handed to the embed stage once this many are pending, or once the
+    # oldest pending one has waited this long, so embedding starts while pages still arrive.
+    store_flush_chunks: int = int(_env("PIPELINE_STORE_FLUSH_CHUNKS", "64"))
+    store_flush_seconds: float = float(_env("PIPELINE_STORE_FLUSH_SECONDS", "2"))
+
+
+@dataclass(frozen=True)
+class ProcessingSettings:
+    # Normalization/chunking processes; 1 keeps everything in the main process.
+    workers: int = int(_env("PIPELINE_CHUNK_WORKERS", str(os.cpu_count() or 1)))
+    # Documents sent to a worker per task.
+    task_size: int = int(_env("PIPELINE_CHUNK_TASK_SIZE", "4"))
+
+
+@dataclass(frozen=True)
+class ChunkingSettings:
+    # Sizes are in embedding-model tokens (cl100k_base).
+    target_tokens: int = int(_env("CHUNK_TARGET_TOKENS", "300"))
+    overlap_tokens: int = int(_env("CHUNK_OVERLAP_TOKENS", "40"))
+    # Sections smaller than this are merged with their neighbours.
+    min_tokens: int = int(_env("CHUNK_MIN_TOKENS", "40"))
+
+
+@dataclass(frozen=True)
+class DedupSettings:
+    enabled: bool = _env("DEDUP_ENABLED", "true").lower() in {"1", "true", "yes"}
+    # A line is boilerplate when it is this long and shared by this many / this share of pages.
+    min_chars: int = int(_env("DEDUP_MIN_LINE_CHARS", "40"))
+    min_docs: int = int(_env("DEDUP_MIN_DOCS", "3"))
+    min_fraction: float = float(_env("DEDUP_MIN_FRACTION", "0.8"))
+    near_dup_threshold: float = float(_env("DEDUP_NEAR_DUP_THRESHOLD", "0.9"))
+    # Cross-page near-duplicates shorter than this are kept (shared facts, different schemes).
+    cross_doc_min_tokens: int = int(_env("DEDUP_CROSS_DOC_MIN_TOKENS", "60"))
+    bands: int = 16
+    rows: int = 4
+
+
+@dataclass(frozen=True)
+class SnapshotSettings:
+    root: Path = Path(_env("SNAPSHOT_DIR", "./data-pipeline/output/snapshots")).resolve()
+    # "zstd", "gzip" or "auto" (zstd when the zstandard package is installed).
+    codec: str = _env("SNAPSHOT_CODEC", "auto")
+
+
+@dataclass(frozen=True)
+class CrawlSettings:
+    # Link hops followed from the registry's scheme pages; 0 fetches only the seed pages.
+    max_depth: int = int(_env("CRAWL_MAX_DEPTH", "0"))
+    # Upper bound on pages admitted to the frontier, seeds included.
+    max_pages: int = int(_env("CRAWL_MAX_PAGES", "500"))
+    workers: int = int(_env("CRAWL_WORKERS", "8"))
+    # Requests per second per host; a slower robots.txt Crawl-delay wins.
+    host_rps: float = float(_env("CRAWL_HOST_RPS", "2"))
+    respect_robots: bool = _env("CRAWL_RESPECT_ROBOTS", "true").lower() in {"1", "true", "yes"}
+    # Comma-separated regexes; a discovered URL is followed when its path matches one.
+    allow_patterns: str = _env(
+        "CRAWL_ALLOW_PATTERNS", r"^/mutual-funds/[\w-]+$,^/blog/[\w-]+$,^/help(/[\w-]+)*$"
+    )
+    state_path: Path = Path(
+        _env("CRAWL_STATE_PATH", "./data-pipeline/output/crawl_state.sqlite3")
+    ).resolve()
+
+
+@dataclass(frozen=True)
+class QuestionBankSettings:
+    # Likely questions with precomputed answers per chunk, matched by the backend before RAG.
+    enabled: bool = _env("QUESTION_BANK_ENABLED", "true").lower() in {"1", "true", "yes"}
+    # "template" (local, from the facts a chunk states) or "openai" (chat model, cached).
+    generator: str = _env("QUESTION_BANK_GENERATOR", "template")
+    per_chunk: int = int(_env("QUESTION_BANK_PER_CHUNK", "3"))
+    model: str = _env("QUESTION_BANK_MODEL", "gpt-4o-mini")
+    workers: int = int(_env("QUESTION_BANK_WORKERS", "4"))
+
+
+_DEFAULT_REGISTRY = Path(__file__).resolve().parents[1] / "registry" / "schemes.json"
+
+
+@dataclass(frozen=True)
+class RegistrySettings:
+    # JSON scheme registry: seed pages, AMCs, category aliases and extraction rules.
+    path: Path = Path(_env("SCHEME_REGISTRY_PATH", str(_DEFAULT_REGISTRY)))
 
 
 @dataclass(frozen=True)
@@ -54,7 +184,17 @@ class PipelineConfig:
     mongo: MongoSettings = MongoSettings()
     pinecone: PineconeSettings = PineconeSettings()
     openai: OpenAISettings = OpenAISettings()
+    embedding: EmbeddingSettings = EmbeddingSettings()
     paths: PipelinePaths = PipelinePaths()
+    versioning: VersioningSettings = VersioningSettings()
+    streaming: StreamingSettings = StreamingSettings()
+    processing: ProcessingSettings = ProcessingSettings()
+    chunking: ChunkingSettings = ChunkingSettings()
+    dedup: DedupSettings = DedupSettings()
+    snapshots: SnapshotSettings = SnapshotSettings()
+    crawl: CrawlSettings = CrawlSettings()
+    registry: RegistrySettings = RegistrySettings()
+    question_bank: QuestionBankSettings = QuestionBankSettings()
 
 
 CONFIG = PipelineConfig()
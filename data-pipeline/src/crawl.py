@@ -0,0 +1,408 @@
+"""Bounded, resumable crawl frontier that expands from the seed scheme pages."""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from .config import CONFIG
+from .models import SchemePage, ScrapedDocument
+from .scraper import _headers, _scheme_entries, build_document, fetch_html
+from .snapshot import read_object
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    crawl_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS frontier (
+    crawl_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    scheme TEXT,
+    category TEXT,
+    content_hash TEXT,
+    PRIMARY KEY (crawl_id, url)
+);
+"""
+
+# Category for pages found by following links, by leading path segment.
+_PATH_CATEGORIES = {
+    "mutual-funds": "Mutual Fund",
+    "blog": "Blog",
+    "help": "Help Center",
+}
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form used for deduplication, or ``None`` for non-HTTP links.
+
+    Scheme and host are lower-cased, duplicate and trailing slashes removed, and the query
+    string and fragment dropped; Groww uses them only for tabs and tracking.
+    """
+
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+@dataclass
+class FrontierEntry:
+    url: str
+    depth: int
+    scheme: Optional[str] = None
+    category: Optional[str] = None
+
+
+class FrontierState:
+    """SQLite record of every URL admitted to a crawl and what happened to it.
+
+    Rows start ``queued`` and end ``done`` (with the snapshot content hash), ``failed`` or
+    ``blocked`` (robots.txt). A crawl without ``finished_at`` is resumed by the next run.
+    :meth:`mark` does not commit; :meth:`admit` commits the links it inserts together with
+    the marks made since the last commit, so the crawler writes one transaction per round
+    of completed fetches.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent without an fsync per commit; a crash loses at most the last
+        # rounds, whose pages are fetched again on resume.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def open_crawl(self, crawl_id: str) -> Tuple[str, bool]:
+        """Return the unfinished crawl to resume, or register ``crawl_id`` as a new one."""
+
+        row = self._conn.execute(
+            "SELECT crawl_id FROM crawls WHERE finished_at IS NULL ORDER BY started_at DESC"
+        ).fetchone()
+        if row:
+            return row[0], True
+        self._conn.execute(
+            "INSERT INTO crawls (crawl_id, started_at) VALUES (?, ?)",
+            (crawl_id, datetime.now(timezone.utc).isoformat()),
+        )
+        self._conn.commit()
+        return crawl_id, False
+
+    def admit(self, crawl_id: str, entries: Sequence[FrontierEntry]) -> None:
+        """Queue ``entries`` (already known URLs are ignored) and commit pending marks."""
+
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO frontier (crawl_id, url, depth, status, scheme, category) "
+            "VALUES (?, ?, ?, 'queued', ?, ?)",
+            [(crawl_id, e.url, e.depth, e.scheme, e.category) for e in entries],
+        )
+        self._conn.commit()
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def urls(self, crawl_id: str) -> Set[str]:
+        """Every URL admitted to ``crawl_id``, whatever its status."""
+
+        rows = self._conn.execute("SELECT url FROM frontier WHERE crawl_id = ?", (crawl_id,))
+        return {url for (url,) in rows}
+
+    def entries(self, crawl_id: str, status: str) -> List[Tuple[FrontierEntry, Optional[str]]]:
+        rows = self._conn.execute(
+            "SELECT url, depth, scheme, category, content_hash FROM frontier "
+            "WHERE crawl_id = ? AND status = ? ORDER BY depth, rowid",
+            (crawl_id, status),
+        )
+        return [
+            (FrontierEntry(url, depth, scheme, category), digest)
+            for url, depth, scheme, category, digest in rows
+        ]
+
+    def mark(
+        self,
+        crawl_id: str,
+        url: str,
+        status: str,
+        *,
+        content_hash: Optional[str] = None,
+        scheme: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> None:
+        self._conn.execute(
+            "UPDATE frontier SET status = ?, content_hash = ?, "
+            "scheme = COALESCE(?, scheme), category = COALESCE(?, category) "
+            "WHERE crawl_id = ? AND url = ?",
+            (status, content_hash, scheme, category, crawl_id, url),
+        )
+
+    def finish(self, crawl_id: str) -> None:
+        """Close the crawl and forget older ones; only the last frontier is kept."""
+
+        self._conn.execute(
+            "UPDATE crawls SET finished_at = ? WHERE crawl_id = ?",
+            (datetime.now(timezone.utc).isoformat(), crawl_id),
+        )
+        self._conn.execute("DELETE FROM frontier WHERE crawl_id != ?", (crawl_id,))
+        self._conn.execute("DELETE FROM crawls WHERE crawl_id != ?", (crawl_id,))
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class HostThrottle:
+    """Spaces requests to the same host at least ``1 / rps`` seconds apart."""
+
+    def __init__(self, rps: float) -> None:
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str, min_interval: float = 0.0) -> None:
+        interval = max(self._interval, min_interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Crawler:
+    """Fetches the seed pages and, up to ``max_depth`` hops, the allowlisted pages they link.
+
+    URLs are deduplicated after :func:`normalize_url`, only followed on the seeds' hosts
+    and when their path matches an allow pattern, and admitted until ``max_pages`` is
+    reached. Fetches run on ``workers`` threads, rate-limited per host and checked against
+    robots.txt. Documents are yielded as they arrive, so ordering follows completion.
+    """
+
+    def __init__(
+        self,
+        seeds: Optional[Sequence[SchemePage]] = None,
+        *,
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        workers: Optional[int] = None,
+        host_rps: Optional[float] = None,
+        allow_patterns: Optional[Iterable[str]] = None,
+        respect_robots: Optional[bool] = None,
+        state_path: Optional[Path] = None,
+        snapshot_root: Optional[Path] = None,
+        fetch: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        settings = CONFIG.crawl
+        self._seeds = list(seeds) if seeds is not None else list(_scheme_entries())
+        self._max_depth = settings.max_depth if max_depth is None else max_depth
+        self._max_pages = max_pages or settings.max_pages
+        self._workers = max(1, workers or settings.workers)
+        self._throttle = HostThrottle(settings.host_rps if host_rps is None else host_rps)
+        if allow_patterns is None:
+            allow_patterns = [p for p in settings.allow_patterns.split(",") if p.strip()]
+        self._allow = [re.compile(pattern.strip()) for pattern in allow_patterns]
+        self._respect_robots = (
+            settings.respect_robots if respect_robots is None else respect_robots
+        )
+        self._state_path = state_path or settings.state_path
+        self._snapshot_root = snapshot_root
+        self._fetch = fetch or (lambda url: fetch_html(url, retries=2))
+        self._robots: Dict[str, RobotFileParser] = {}
+        self._robots_lock = threading.Lock()
+        self._agent = _headers()["User-Agent"]
+        self._hosts = {urlsplit(seed.url).netloc.lower() for seed in self._seeds}
+        # URLs admitted to the current crawl, loaded once from the frontier state.
+        self._admitted: Set[str] = set()
+        self.fetched = 0
+        self.failed = 0
+        self.blocked = 0
+
+    def allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return parts.netloc in self._hosts and any(p.search(parts.path) for p in self._allow)
+
+    def _robots_for(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._robots_lock:
+            parser = self._robots.get(origin)
+            if parser is not None:
+                return parser
+            parser = RobotFileParser(origin + "/robots.txt")
+            try:
+                resp = requests.get(origin + "/robots.txt", headers=_headers(), timeout=10)
+                if resp.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif resp.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse(resp.text.splitlines())
+            except requests.RequestException as exc:
+                LOGGER.warning("robots.txt unavailable for %s, allowing all: %s", origin, exc)
+                parser.allow_all = True
+            self._robots[origin] = parser
+            return parser
+
+    def _fetch_page(self, url: str) -> Optional[str]:
+        """Fetch ``url`` on a worker thread; ``None`` means robots.txt disallows it."""
+
+        delay = 0.0
+        if self._respect_robots:
+            robots = self._robots_for(url)
+            if not robots.can_fetch(self._agent, url):
+                return None
+            delay = float(robots.crawl_delay(self._agent) or 0.0)
+        self._throttle.wait(urlsplit(url).netloc, delay)
+        return self._fetch(url)
+
+    @staticmethod
+    def _document(entry: FrontierEntry, html: str) -> ScrapedDocument:
+        segment = urlsplit(entry.url).path.strip("/").split("/")[0]
+        slug = urlsplit(entry.url).path.rstrip("/").rsplit("/", 1)[-1]
+        page = SchemePage(
+            scheme=entry.scheme or slug.replace("-", " ").title(),
+            category=entry.category or _PATH_CATEGORIES.get(segment, "Groww"),
+            url=entry.url,
+        )
+        doc = build_document(page, html)
+        if not entry.scheme:
+            # Discovered pages are named after their main heading when they have one.
+            title = next((s.title for s in doc.sections if s.level == 1 and s.title), "")
+            doc.scheme = title or doc.scheme
+        return doc
+
+    def _new_links(self, doc: ScrapedDocument, depth: int) -> List[FrontierEntry]:
+        """Links of ``doc`` to admit: allowed, not seen before and within the page budget."""
+
+        admitted: List[FrontierEntry] = []
+        if depth >= self._max_depth:
+            return admitted
+        for link in doc.extra_links:
+            url = normalize_url(link)
+            if not url or url in self._admitted or not self.allowed(url):
+                continue
+            if self._respect_robots and not self._robots_for(url).can_fetch(self._agent, url):
+                self.blocked += 1
+                continue
+            if len(self._admitted) >= self._max_pages:
+                break
+            self._admitted.add(url)
+            admitted.append(FrontierEntry(url, depth + 1))
+        return admitted
+
+    def crawl(self, crawl_id: str) -> Iterator[ScrapedDocument]:
+        """Yield documents for the whole frontier, resuming an unfinished crawl if any."""
+
+        state = FrontierState(self._state_path)
+        try:
+            crawl_id, resumed = state.open_crawl(crawl_id)
+            self._admitted = state.urls(crawl_id)
+            if resumed:
+                LOGGER.info("Resuming crawl %s", crawl_id)
+                yield from self._replay(state, crawl_id)
+            else:
+                seeds = []
+                for seed in self._seeds:
+                    url = normalize_url(seed.url) or seed.url
+                    if url not in self._admitted:
+                        self._admitted.add(url)
+                        seeds.append(FrontierEntry(url, 0, seed.scheme, seed.category))
+                state.admit(crawl_id, seeds)
+            yield from self._run(state, crawl_id)
+            state.finish(crawl_id)
+            LOGGER.info(
+                "Crawl %s finished: %s fetched, %s failed, %s blocked by robots.txt",
+                crawl_id,
+                self.fetched,
+                self.failed,
+                self.blocked,
+            )
+        finally:
+            state.close()
+
+    def _replay(self, state: FrontierState, crawl_id: str) -> Iterator[ScrapedDocument]:
+        """Re-emit pages an interrupted crawl already fetched, from the snapshot store."""
+
+        for entry, digest in state.entries(crawl_id, "done"):
+            html = read_object(digest, root=self._snapshot_root) if digest else None
+            if html is None:
+                state.mark(crawl_id, entry.url, "queued")
+                continue
+            doc = self._document(entry, html)
+            # Links of replayed pages may not have been admitted before the interruption.
+            state.admit(crawl_id, self._new_links(doc, entry.depth))
+            yield doc
+        state.commit()
+
+    def _run(self, state: FrontierState, crawl_id: str) -> Iterator[ScrapedDocument]:
+        pending: Deque[FrontierEntry] = deque(
+            entry for entry, _ in state.entries(crawl_id, "queued")
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="crawl") as pool:
+            in_flight: Dict[Future, FrontierEntry] = {}
+            while pending or in_flight:
+                while pending and len(in_flight) < self._workers * 2:
+                    entry = pending.popleft()
+                    in_flight[pool.submit(self._fetch_page, entry.url)] = entry
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                docs: List[ScrapedDocument] = []
+                links: List[FrontierEntry] = []
+                for future in done:
+                    entry = in_flight.pop(future)
+                    try:
+                        html = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        LOGGER.warning("Skipping %s: %s", entry.url, exc)
+                        state.mark(crawl_id, entry.url, "failed")
+                        self.failed += 1
+                        continue
+                    if html is None:
+                        state.mark(crawl_id, entry.url, "blocked")
+                        self.blocked += 1
+                        continue
+                    doc = self._document(entry, html)
+                    state.mark(
+                        crawl_id,
+                        entry.url,
+                        "done",
+                        content_hash=doc.content_hash,
+                        scheme=doc.scheme,
+                        category=doc.category,
+                    )
+                    self.fetched += 1
+                    links.extend(self._new_links(doc, entry.depth))
+                    docs.append(doc)
+                # One transaction for the round's marks and newly found links.
+                state.admit(crawl_id, links)
+                pending.extend(links)
+                yield from docs
+        elapsed = time.perf_counter() - started
+        if self.fetched:
+            LOGGER.info(
+                "Fetched %s pages in %.1fs (%.1f pages/s)",
+                self.fetched,
+                elapsed,
+                self.fetched / elapsed if elapsed else 0.0,
+            )
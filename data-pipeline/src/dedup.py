@@ -0,0 +1,280 @@
+"""Boilerplate-line stripping and near-duplicate chunk elimination at ingest."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .config import CONFIG
+from .models import Chunk, ScrapedDocument
+from .tokens import get_tokenizer
+
+LOGGER = logging.getLogger(__name__)
+
+_MERSENNE = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+# A percentage, an amount or a duration: a line stating one is a fund fact, however many
+# schemes share it ("Exit load of 1% if redeemed within 1 year"). Bare numbers are not
+# enough, since the shared footer carries registration numbers and a postcode.
+_FIGURE = re.compile(
+    r"\d(?:[\d,.]*\d)?\s*%|(?:₹|\brs\.?|\binr)\s*\d|\d+\s*(?:years?|yrs?|months?|days?)\b",
+    re.IGNORECASE,
+)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _normalize_line(line: str) -> str:
+    return " ".join(line.lower().split())
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, stable across processes and runs.
+
+    Shingles are hashed to 32 bits with CRC32 and permuted modulo the Mersenne prime
+    2^31 - 1, so every product fits in uint64 and all permutations run as one NumPy op.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1) -> None:
+        self._shingle_size = shingle_size
+        params = hashlib.blake2b(f"minhash-{seed}".encode(), digest_size=64).digest()
+        coefficients = []
+        for idx in range(num_perm):
+            block = hashlib.blake2b(params + idx.to_bytes(4, "big"), digest_size=8).digest()
+            a = int.from_bytes(block[:4], "big") % _MERSENNE or 1
+            b = int.from_bytes(block[4:], "big") % _MERSENNE
+            coefficients.append((a, b))
+        self._a = np.array([a for a, _ in coefficients], dtype=np.uint64)[:, None]
+        self._b = np.array([b for _, b in coefficients], dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        words = _WORD.findall(text.lower())
+        size = self._shingle_size
+        shingles = {
+            " ".join(words[idx : idx + size]) for idx in range(max(1, len(words) - size + 1))
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (self._a * hashes[None, :] + self._b) % np.uint64(_MERSENNE)
+        return tuple(permuted.min(axis=1).tolist())
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+class LshIndex:
+    """Banded LSH over MinHash signatures; returns candidate keys sharing any band."""
+
+    def __init__(self, bands: int, rows: int) -> None:
+        self._bands = bands
+        self._rows = rows
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+
+    def candidates(self, signature: Tuple[int, ...]) -> Set[int]:
+        found: Set[int] = set()
+        for band in range(self._bands):
+            key = (band, signature[band * self._rows : (band + 1) * self._rows])
+            found.update(self._buckets.get(key, ()))
+        return found
+
+    def add(self, key: int, signature: Tuple[int, ...]) -> None:
+        for band in range(self._bands):
+            band_key = (band, signature[band * self._rows : (band + 1) * self._rows])
+            self._buckets[band_key].append(key)
+
+
+@dataclass
+class DedupStats:
+    documents: int = 0
+    chunks_in: int = 0
+    chunks_out: int = 0
+    boilerplate_lines_removed: int = 0
+    dropped_boilerplate: int = 0
+    dropped_near_duplicate: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    @property
+    def vectors_saved(self) -> int:
+        return self.chunks_in - self.chunks_out
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+class ChunkDeduplicator:
+    """Streaming filter over ``(doc, chunks)`` pairs from the chunk stage.
+
+    * A line is boilerplate once it is at least ``min_chars`` long and appears in at least
+      ``min_docs`` documents and ``min_fraction`` of the documents seen so far (or was
+      boilerplate in a previous run). Short lines such as headings and bare values are never
+      stripped, nor are lines stating a percentage, amount or duration, which are facts
+      even when every scheme repeats them. The first ``min_docs`` documents are held back
+      so their counts are known.
+    * A chunk left with nothing but its leading context line and a heading is dropped.
+    * A chunk whose MinHash similarity to an earlier kept chunk reaches ``threshold`` is
+      dropped if both come from the same page, or if its body is at least
+      ``cross_doc_min_tokens`` long. Short cross-page duplicates are kept, since identical
+      one-line facts ("Exit load 1% within 1 year") still belong to different schemes.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_docs: Optional[int] = None,
+        min_fraction: Optional[float] = None,
+        min_chars: Optional[int] = None,
+        threshold: Optional[float] = None,
+        cross_doc_min_tokens: Optional[int] = None,
+        known_boilerplate: Iterable[str] = (),
+    ) -> None:
+        settings = CONFIG.dedup
+        self._min_docs = max(1, min_docs or settings.min_docs)
+        self._min_fraction = settings.min_fraction if min_fraction is None else min_fraction
+        self._min_chars = settings.min_chars if min_chars is None else min_chars
+        self._threshold = threshold or settings.near_dup_threshold
+        self._cross_doc_min_tokens = (
+            settings.cross_doc_min_tokens
+            if cross_doc_min_tokens is None
+            else cross_doc_min_tokens
+        )
+        self._known = set(known_boilerplate)
+        self._line_df: Counter = Counter()
+        self._docs_seen = 0
+        self._hasher = MinHasher(num_perm=settings.bands * settings.rows)
+        self._lsh = LshIndex(settings.bands, settings.rows)
+        self._kept: List[Tuple[str, Tuple[int, ...]]] = []
+        self._tokenizer = get_tokenizer()
+        self.stats = DedupStats()
+
+    def _strippable(self, line: str) -> bool:
+        return len(line.strip()) >= self._min_chars and not _FIGURE.search(line)
+
+    def _observe(self, chunks: List[Chunk]) -> None:
+        lines = {
+            _fingerprint(_normalize_line(line))
+            for chunk in chunks
+            for line in chunk.content.splitlines()[1:]
+            if self._strippable(line)
+        }
+        self._line_df.update(lines)
+        self._docs_seen += 1
+
+    def _is_boilerplate(self, line: str) -> bool:
+        if not self._strippable(line):
+            return False
+        key = _fingerprint(_normalize_line(line))
+        if key in self._known:
+            return True
+        count = self._line_df[key]
+        return count >= self._min_docs and count >= self._min_fraction * self._docs_seen
+
+    def _filter(self, chunks: List[Chunk]) -> List[Chunk]:
+        kept_chunks: List[Chunk] = []
+        for chunk in chunks:
+            self.stats.chunks_in += 1
+            original_tokens = int(
+                chunk.metadata.get("tokens") or self._tokenizer.count(chunk.content)
+            )
+            self.stats.tokens_in += original_tokens
+            head, *body = chunk.content.splitlines()
+            clean = [line for line in body if not self._is_boilerplate(line)]
+            removed = len(body) - len(clean)
+            if removed:
+                self.stats.boilerplate_lines_removed += removed
+                # Whatever is left besides a repeat of the context line is at most a heading.
+                informative = [line for line in clean if line.strip() != head.strip()]
+                if len(informative) <= 1:
+                    self.stats.dropped_boilerplate += 1
+                    continue
+                chunk.content = "\n".join([head, *clean])
+                chunk.metadata["tokens"] = str(self._tokenizer.count(chunk.content))
+
+            body_text = "\n".join(clean)
+            signature = self._hasher.signature(body_text)
+            body_tokens = self._tokenizer.count(body_text)
+            duplicate = False
+            for candidate in self._lsh.candidates(signature):
+                url, other = self._kept[candidate]
+                if MinHasher.similarity(signature, other) < self._threshold:
+                    continue
+                if url == chunk.url or body_tokens >= self._cross_doc_min_tokens:
+                    duplicate = True
+                    break
+            if duplicate:
+                self.stats.dropped_near_duplicate += 1
+                continue
+            self._lsh.add(len(self._kept), signature)
+            self._kept.append((chunk.url, signature))
+            kept_chunks.append(chunk)
+            self.stats.chunks_out += 1
+            self.stats.tokens_out += int(chunk.metadata.get("tokens") or original_tokens)
+        return kept_chunks
+
+    def process(
+        self, items: Iterable[Tuple[ScrapedDocument, List[Chunk]]]
+    ) -> Iterator[Tuple[ScrapedDocument, List[Chunk]]]:
+        warmup: List[Tuple[ScrapedDocument, List[Chunk]]] = []
+        for doc, chunks in items:
+            self.stats.documents += 1
+            self._observe(chunks)
+            if len(warmup) < self._min_docs - 1:
+                warmup.append((doc, chunks))
+                continue
+            for held_doc, held_chunks in warmup:
+                yield held_doc, self._filter(held_chunks)
+            warmup = []
+            yield doc, self._filter(chunks)
+        for held_doc, held_chunks in warmup:
+            yield held_doc, self._filter(held_chunks)
+        self.log_stats()
+
+    def boilerplate_fingerprints(self) -> Set[str]:
+        """Line fingerprints that met the boilerplate thresholds over the whole run."""
+
+        return {
+            key
+            for key, count in self._line_df.items()
+            if count >= self._min_docs and count >= self._min_fraction * self._docs_seen
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        LOGGER.info(
+            "Dedup: %s -> %s chunks (%s boilerplate-only, %s near-duplicate, %s lines stripped); "
+            "saved %s embeddings/vectors and %s embedding tokens",
+            stats.chunks_in,
+            stats.chunks_out,
+            stats.dropped_boilerplate,
+            stats.dropped_near_duplicate,
+            stats.boilerplate_lines_removed,
+            stats.vectors_saved,
+            stats.tokens_saved,
+        )
+
+
+def load_boilerplate(path: Path) -> Set[str]:
+    if not path.exists():
+        return set()
+    return set(json.loads(path.read_text(encoding="utf-8")))
+
+
+def save_boilerplate(path: Path, fingerprints: Iterable[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(sorted(fingerprints)), encoding="utf-8")
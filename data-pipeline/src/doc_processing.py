@@ -3,51 +3,98 @@
 from __future__ import annotations
 
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from bs4 import BeautifulSoup
+from .config import CONFIG
+from .html_extract import parse_page
+from .models import Chunk, ScrapedDocument, Section
+from .tokens import Tokenizer, get_tokenizer
 
-try:  # Best-effort Docling import
-    from docling.pipeline.standard import StandardPipeline
-    from docling_common.utils import docling_logger
+LOGGER = logging.getLogger(__name__)
 
-    docling_logger.setLevel(logging.WARNING)
-    _DOC_PIPELINE = StandardPipeline()
-except Exception:  # noqa: BLE001
-    _DOC_PIPELINE = None
+# Docling is heavy to import and construct, so it is built on first use in each process.
+_DOC_PIPELINE: Any = None
+_DOC_PIPELINE_LOADED = False
 
-from .models import Chunk, ScrapedDocument
 
-LOGGER = logging.getLogger(__name__)
+def _doc_pipeline() -> Any:
+    global _DOC_PIPELINE, _DOC_PIPELINE_LOADED  # noqa: PLW0603
+    if _DOC_PIPELINE_LOADED:
+        return _DOC_PIPELINE
+    _DOC_PIPELINE_LOADED = True
+    try:  # Best-effort Docling import
+        from docling.pipeline.standard import StandardPipeline
+        from docling_common.utils import docling_logger
+
+        docling_logger.setLevel(logging.WARNING)
+        _DOC_PIPELINE = StandardPipeline()
+    except Exception:  # noqa: BLE001
+        _DOC_PIPELINE = None
+    return _DOC_PIPELINE
+
+
+def _docling_available() -> bool:
+    """Whether Docling imports and builds its pipeline here.
+
+    An installed but incompatible Docling leaves every worker on the fallback parser, so
+    only a built pipeline is worth shipping pages to worker processes for.
+    """
+
+    return _doc_pipeline() is not None
 
 
 def _fallback_clean_text(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    return "\n".join(
-        [line.strip() for line in soup.get_text(separator="\n").splitlines() if line.strip()]
-    )
+    return parse_page(html).text
 
 
-def normalize_text(html: str) -> str:
-    if _DOC_PIPELINE is None:
-        return _fallback_clean_text(html)
+def _docling_sections(html: str) -> Optional[List[Section]]:
+    """Docling's section split of ``html``, or ``None`` when Docling is unavailable/fails."""
+
+    doc_pipeline = _doc_pipeline()
+    if doc_pipeline is None:
+        return None
     try:
-        artifact = _DOC_PIPELINE.run(html, mime_type="text/html")
-        text_blocks = []
+        artifact = doc_pipeline.run(html, mime_type="text/html")
+        sections = []
         for section in artifact.sections:
-            section_title = section.title or ""
-            section_text = section.export_text()
-            text_blocks.append(f"{section_title}\n{section_text}".strip())
-        return "\n\n".join([block for block in text_blocks if block])
+            title = (section.title or "").strip()
+            lines = [line.strip() for line in section.export_text().splitlines() if line.strip()]
+            if title or lines:
+                level = getattr(section, "level", 1) or 1
+                sections.append(Section(title=title, level=level, lines=lines))
+        return sections
     except Exception as exc:  # noqa: BLE001
         LOGGER.warning("Docling pipeline failed, falling back: %s", exc)
+        return None
+
+
+def normalize_text(html: str) -> str:
+    sections = _docling_sections(html)
+    if sections is None:
         return _fallback_clean_text(html)
+    blocks = ["\n".join([section.title, *section.lines]).strip() for section in sections]
+    return "\n\n".join([block for block in blocks if block])
+
+
+def normalize_sections(doc: ScrapedDocument) -> List[Section]:
+    """Heading-delimited sections for ``doc``: Docling if available, else the scrape-time parse."""
+
+    sections = _docling_sections(doc.html) if doc.html else None
+    if sections is None:
+        sections = doc.sections or (parse_page(doc.html).sections if doc.html else [])
+    if not sections and doc.text.strip():
+        sections = [Section(title="", level=0, lines=doc.text.splitlines())]
+    return sections
 
 
 def chunk_text(text: str, *, chunk_size: int = 700, overlap: int = 100) -> List[str]:
+    """Legacy fixed word-window splitter (kept for comparisons in ``src.benchmarks``)."""
+
     tokens = text.split()
     chunks: List[str] = []
     start = 0
@@ -60,29 +107,209 @@ def chunk_text(text: str, *, chunk_size: int = 700, overlap: int = 100) -> List[
     return chunks
 
 
-def build_chunks(doc: ScrapedDocument, *, chunk_size: int = 700) -> List[Chunk]:
-    normalized_text = normalize_text(doc.html)
-    if not normalized_text.strip():
-        normalized_text = doc.text
-    segments = chunk_text(normalized_text, chunk_size=chunk_size)
+@dataclass(slots=True)
+class SectionChunk:
+    section: str
+    content: str
+    tokens: int
+
+
+def _token_windows(
+    lines: List[str], budget: int, overlap: int, tokenizer: Tokenizer
+) -> List[Tuple[List[str], int]]:
+    """Pack lines into windows of at most ``budget`` tokens, repeating ~``overlap`` tokens."""
+
+    items: List[Tuple[str, int]] = []
+    for line in lines:
+        count = tokenizer.count(line)
+        if count <= budget:
+            items.append((line, count))
+        else:
+            items.extend(
+                (piece, tokenizer.count(piece)) for piece in tokenizer.split(line, budget)
+            )
+
+    windows: List[Tuple[List[str], int]] = []
+    current: List[Tuple[str, int]] = []
+    current_tokens = 0
+    fresh = 0  # tokens added since the last window was emitted
+    for line, count in items:
+        if current and current_tokens + count > budget:
+            windows.append(([text for text, _ in current], current_tokens))
+            kept: List[Tuple[str, int]] = []
+            kept_tokens = 0
+            for text, text_tokens in reversed(current):
+                if kept_tokens + text_tokens > overlap:
+                    break
+                kept.insert(0, (text, text_tokens))
+                kept_tokens += text_tokens
+            current, current_tokens, fresh = kept, kept_tokens, 0
+        current.append((line, count))
+        current_tokens += count
+        fresh += count
+    if current and fresh:
+        windows.append(([text for text, _ in current], current_tokens))
+    return windows
+
+
+def chunk_sections(
+    sections: Sequence[Section],
+    *,
+    target_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    min_tokens: Optional[int] = None,
+    tokenizer: Optional[Tokenizer] = None,
+    context: str = "",
+) -> List[SectionChunk]:
+    """Split on headings first, then size chunks in model tokens.
+
+    Every chunk starts with ``context`` (e.g. the scheme name, so chunks from sibling pages
+    with identical headings stay distinguishable) and its heading line(s), and is labelled
+    with the real heading. Sections under ``min_tokens`` are merged forward with their
+    neighbours (label ``"A / B"``) while the combined chunk fits ``target_tokens``; longer
+    sections are cut into line-aligned windows that overlap by about ``overlap_tokens``.
+    Headings with no text under them are kept only as part of a merged chunk.
+    """
+
+    settings = CONFIG.chunking
+    target = target_tokens or settings.target_tokens
+    overlap = settings.overlap_tokens if overlap_tokens is None else overlap_tokens
+    minimum = settings.min_tokens if min_tokens is None else min_tokens
+    tokenizer = tokenizer or get_tokenizer()
+    prefix = [context] if context else []
+    prefix_tokens = sum(tokenizer.count(line) for line in prefix)
+    target = max(1, target - prefix_tokens)
+
+    chunks: List[SectionChunk] = []
+    pending_titles: List[str] = []
+    pending_lines: List[str] = []
+    pending_tokens = 0
+    pending_body = False
+
+    def _flush_pending() -> None:
+        nonlocal pending_titles, pending_lines, pending_tokens, pending_body
+        # Headings with no text under them would make a chunk that says nothing.
+        if pending_body:
+            label = " / ".join(title for title in pending_titles if title) or "Overview"
+            content = "\n".join(prefix + pending_lines)
+            chunks.append(SectionChunk(label, content, prefix_tokens + pending_tokens))
+        pending_titles, pending_lines, pending_tokens, pending_body = [], [], 0, False
+
+    for section in sections:
+        body = [line for line in section.lines if line.strip()]
+        if not body and not section.title:
+            continue
+        heading = [section.title] if section.title else []
+        heading_tokens = sum(tokenizer.count(line) for line in heading)
+        body_tokens = sum(tokenizer.count(line) for line in body)
+        total = heading_tokens + body_tokens
+
+        if total <= target and (total < minimum or pending_lines):
+            if pending_tokens + total > target:
+                _flush_pending()
+            pending_titles.append(section.title)
+            pending_lines.extend(heading + body)
+            pending_tokens += total
+            pending_body = pending_body or bool(body)
+            if pending_tokens >= minimum:
+                _flush_pending()
+            continue
+
+        _flush_pending()
+        label = section.title or "Overview"
+        budget = max(1, target - heading_tokens)
+        for window, window_tokens in _token_windows(body, budget, overlap, tokenizer):
+            content = "\n".join(prefix + heading + window)
+            chunks.append(
+                SectionChunk(label, content, prefix_tokens + heading_tokens + window_tokens)
+            )
+    _flush_pending()
+    return chunks
+
+
+def build_chunks(doc: ScrapedDocument, *, target_tokens: Optional[int] = None) -> List[Chunk]:
+    pieces = chunk_sections(
+        normalize_sections(doc), target_tokens=target_tokens, context=doc.scheme
+    )
     chunks: List[Chunk] = []
-    for idx, segment in enumerate(segments, start=1):
+    for idx, piece in enumerate(pieces, start=1):
         chunk_id = f"{doc.url}#section-{idx}"
         chunks.append(
             Chunk(
                 scheme=doc.scheme,
                 category=doc.category,
                 url=doc.url,
-                section=f"Section {idx}",
-                content=segment.strip(),
+                section=piece.section,
+                content=piece.content.strip(),
                 last_verified=doc.last_verified,
-                metadata={"position": str(idx)},
+                metadata={"position": str(idx), "tokens": str(piece.tokens)},
                 chunk_id=chunk_id,
             )
         )
     return chunks
 
 
+def _build_chunks_batch(docs: List[ScrapedDocument]) -> List[List[Chunk]]:
+    return [build_chunks(doc) for doc in docs]
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for chunking workers.
+
+    The pool is created on a streaming-stage thread while other stages hold locks
+    (logging, pymongo, tiktoken), and a plain ``fork`` would copy those locks held into the
+    children. ``forkserver`` forks from a clean single-threaded server instead; ``spawn``
+    is the fallback where it is unavailable. Tasks and results are pickled either way.
+    """
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def iter_document_chunks(
+    docs: Iterable[ScrapedDocument],
+    *,
+    workers: Optional[int] = None,
+    task_size: Optional[int] = None,
+) -> Iterator[Tuple[ScrapedDocument, List[Chunk]]]:
+    """Yield ``(doc, chunks)`` in input order, normalizing in a process pool.
+
+    Documents are submitted ``task_size`` at a time with at most two tasks queued per
+    worker, so the input iterator is never fully materialised. ``workers <= 1`` runs
+    serially in-process with identical output, as does a Docling that is missing or fails
+    to build: the fallback path reuses scrape-time sections and is cheaper than shipping
+    pages to workers.
+    """
+
+    workers = CONFIG.processing.workers if workers is None else workers
+    task_size = max(1, task_size or CONFIG.processing.task_size)
+    if workers <= 1 or not _docling_available():
+        for doc in docs:
+            yield doc, build_chunks(doc)
+        return
+
+    pending: Deque[Tuple[List[ScrapedDocument], Future]] = deque()
+
+    def _emit_oldest() -> Iterator[Tuple[ScrapedDocument, List[Chunk]]]:
+        batch, future = pending.popleft()
+        yield from zip(batch, future.result())
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        batch: List[ScrapedDocument] = []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) < task_size:
+                continue
+            pending.append((batch, pool.submit(_build_chunks_batch, batch)))
+            batch = []
+            if len(pending) >= workers * 2:
+                yield from _emit_oldest()
+        if batch:
+            pending.append((batch, pool.submit(_build_chunks_batch, batch)))
+        while pending:
+            yield from _emit_oldest()
+
+
 def export_sources(documents: Iterable[ScrapedDocument], output_csv: Path) -> None:
     import csv
 
@@ -1,17 +1,30 @@
-"""Embedding helpers using OpenAI embeddings API."""
+"""Embedding helpers for the configured embedding provider."""
 
 from __future__ import annotations
 
 import logging
-from typing import Iterable, List
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from openai import OpenAI
 
 from .config import CONFIG
+from .embedding_cache import EmbeddingCache, content_hash
+from .embedding_providers import EmbeddingProvider, OpenAIEmbeddingProvider, create_provider
 from .models import Chunk, EmbeddingRecord
+from .rate_limit import RateLimiter, retry_delay
+from .tokens import get_tokenizer
 
 LOGGER = logging.getLogger(__name__)
 
+# (batch of (chunk, content hash, tokens), cached vectors, digests sent, pending request)
+_Job = Tuple[
+    List[Tuple[Chunk, str, int]], Dict[str, List[float]], List[str], Optional[Future]
+]
+
 _openai_client: OpenAI | None = None
 
 
@@ -21,33 +34,165 @@ def _client() -> OpenAI:
         return _openai_client
     if not CONFIG.openai.api_key:
         raise ValueError("OPENAI_API_KEY is required for embeddings")
-    _openai_client = OpenAI(api_key=CONFIG.openai.api_key)
+    # Retries are handled per batch by iter_embeddings, which also honours rate limits.
+    _openai_client = OpenAI(api_key=CONFIG.openai.api_key, max_retries=0)
     return _openai_client
 
 
-def embed_chunks(chunks: Iterable[Chunk], *, batch_size: int = 32) -> List[EmbeddingRecord]:
-    client = _client()
-    model_name = CONFIG.openai.embed_model
-    embedding_records: List[EmbeddingRecord] = []
-    batch: List[Chunk] = []
-
-    def _flush_batch() -> None:
-        nonlocal batch
-        if not batch:
-            return
-        texts = [chunk.content for chunk in batch]
-        response = client.embeddings.create(model=model_name, input=texts)
-        for chunk, datum in zip(batch, response.data):
-            embedding_records.append(EmbeddingRecord(chunk=chunk, vector=datum.embedding))
-        batch = []
-
-    for chunk in chunks:
-        if not chunk.content.strip():
-            continue
-        batch.append(chunk)
-        if len(batch) >= batch_size:
-            _flush_batch()
-
-    _flush_batch()
-    LOGGER.info("Generated %s embeddings via OpenAI", len(embedding_records))
-    return embedding_records
+@lru_cache(maxsize=None)
+def get_embedding_provider() -> EmbeddingProvider:
+    """The provider selected by ``EMBED_PROVIDER``; the backend reads the same setting."""
+
+    return create_provider(
+        CONFIG.embedding.provider,
+        openai_client_factory=_client,
+        openai_model=CONFIG.openai.embed_model,
+        openai_dimensions=CONFIG.openai.embed_dimensions,
+        local_dimensions=CONFIG.embedding.local_dimensions,
+    )
+
+
+def open_embedding_cache(provider: Optional[EmbeddingProvider] = None) -> EmbeddingCache:
+    provider = provider or get_embedding_provider()
+    return EmbeddingCache(
+        CONFIG.paths.embedding_cache, model=provider.name, dimensions=provider.dimensions
+    )
+
+
+class _Progress:
+    """Logs embedding progress and throughput at most every ``interval`` seconds."""
+
+    def __init__(self, name: str, interval: float = 10.0) -> None:
+        self.name = name
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.logged = self.started
+        self.produced = 0
+        self.requests = 0
+        self.tokens = 0
+        self.retries = 0
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"{self.produced} embeddings, {self.requests} {self.name} requests "
+            f"({self.retries} retries), {self.produced / elapsed:.1f} chunks/s, "
+            f"{self.tokens * 60 / elapsed:.0f} tokens/min"
+        )
+
+    def tick(self) -> None:
+        now = time.perf_counter()
+        if now - self.logged >= self.interval:
+            self.logged = now
+            LOGGER.info("Embedding progress: %s", self.summary())
+
+
+def iter_embeddings(
+    chunks: Iterable[Chunk],
+    *,
+    batch_size: Optional[int] = None,
+    cache: Optional[EmbeddingCache] = None,
+    provider: Optional[EmbeddingProvider] = None,
+    workers: Optional[int] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> Iterator[EmbeddingRecord]:
+    """Embed chunks lazily in token-sized batches sent concurrently, yielding in input order.
+
+    Batches hold up to ``EMBED_BATCH_TOKENS`` estimated tokens and ``batch_size`` inputs.
+    Cache lookups and writes stay on the consuming thread, which owns the cache (it is
+    opened on first use); only cache misses go to the provider, from ``workers`` threads.
+    OpenAI requests pass through a shared RPM/TPM :class:`RateLimiter` and are retried per
+    batch on rate limits and transient errors, pausing the whole pool as the server asks.
+    ``provider`` defaults to :func:`get_embedding_provider`.
+    """
+
+    settings = CONFIG.embedding
+    provider = provider or get_embedding_provider()
+    batch_size = max(1, batch_size or settings.batch_size)
+    workers = max(1, workers or settings.workers)
+    if limiter is None and isinstance(provider, OpenAIEmbeddingProvider):
+        limiter = RateLimiter(settings.requests_per_minute, settings.tokens_per_minute)
+    tokenizer = get_tokenizer()
+    owns_cache = cache is None
+    cache = cache or open_embedding_cache(provider)
+    progress = _Progress(provider.name)
+
+    def _request(texts: List[str], tokens: int) -> List[List[float]]:
+        attempt = 0
+        while True:
+            attempt += 1
+            if limiter is not None:
+                limiter.acquire(tokens)
+            try:
+                return provider.embed(texts)
+            except Exception as exc:  # noqa: BLE001
+                delay = retry_delay(exc, attempt)
+                if delay is None or attempt > settings.max_retries:
+                    raise
+                progress.retries += 1
+                LOGGER.warning(
+                    "Embedding %s inputs failed (attempt %s), retrying in %.1fs: %s",
+                    len(texts),
+                    attempt,
+                    delay,
+                    exc,
+                )
+                if limiter is not None:
+                    limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+
+    def _submit(pool: ThreadPoolExecutor, batch: List[Tuple[Chunk, str, int]]) -> _Job:
+        cached = cache.get_many([digest for _, digest, _ in batch])
+        pending: Dict[str, Tuple[str, int]] = {}
+        for chunk, digest, tokens in batch:
+            if digest not in cached:
+                pending.setdefault(digest, (chunk.content, tokens))
+        future = None
+        if pending:
+            texts = [text for text, _ in pending.values()]
+            future = pool.submit(_request, texts, sum(n for _, n in pending.values()))
+        return batch, cached, list(pending), future
+
+    def _collect(job: _Job) -> List[EmbeddingRecord]:
+        batch, cached, digests, future = job
+        if future is not None:
+            fresh = dict(zip(digests, future.result()))
+            cache.put_many(fresh.items())
+            cached.update(fresh)
+            progress.requests += 1
+            progress.tokens += sum(tokens for _, digest, tokens in batch if digest in fresh)
+        progress.produced += len(batch)
+        progress.tick()
+        return [EmbeddingRecord(chunk=chunk, vector=cached[digest]) for chunk, digest, _ in batch]
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+    # Results are collected from the head, so output order matches input order.
+    jobs: Deque[_Job] = deque()
+    batch: List[Tuple[Chunk, str, int]] = []
+    batch_tokens = 0
+    try:
+        for chunk in chunks:
+            if not chunk.content.strip():
+                continue
+            tokens = tokenizer.count(chunk.content)
+            if batch and (
+                len(batch) >= batch_size or batch_tokens + tokens > settings.batch_tokens
+            ):
+                jobs.append(_submit(pool, batch))
+                batch, batch_tokens = [], 0
+                while len(jobs) > workers * 2:
+                    yield from _collect(jobs.popleft())
+            batch.append((chunk, content_hash(chunk.content), tokens))
+            batch_tokens += tokens
+        if batch:
+            jobs.append(_submit(pool, batch))
+        while jobs:
+            yield from _collect(jobs.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        cache.log_stats(LOGGER)
+        if owns_cache:
+            cache.close()
+        waited = f", {limiter.waited:.1f}s rate-limit wait" if limiter is not None else ""
+        LOGGER.info("Generated %s%s", progress.summary(), waited)
@@ -0,0 +1,109 @@
+"""Persistent, content-addressed cache for chunk embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, dimensions, content_hash)
+)
+"""
+
+
+def content_hash(text: str) -> str:
+    """Return the sha256 hex digest used to address chunk content."""
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class EmbeddingCache:
+    """SQLite store of float32 vectors keyed by (model, dimensions, sha256(content))."""
+
+    def __init__(self, path: Path, *, model: str, dimensions: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._model = model
+        self._dimensions = dimensions
+        self.stats = CacheStats()
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(unique), 500):
+            window = unique[start : start + 500]
+            placeholders = ",".join("?" for _ in window)
+            rows = self._conn.execute(
+                "SELECT content_hash, vector FROM embeddings "
+                f"WHERE model = ? AND dimensions = ? AND content_hash IN ({placeholders})",
+                (self._model, self._dimensions, *window),
+            )
+            for digest, blob in rows:
+                found[digest] = _from_blob(blob)
+        self.stats.hits += len(found)
+        self.stats.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        rows = [
+            (self._model, self._dimensions, digest, _to_blob(vector)) for digest, vector in items
+        ]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, dimensions, content_hash, vector) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        self.stats.writes += len(rows)
+
+    def log_stats(self, logger: Optional[logging.Logger] = None) -> None:
+        (logger or LOGGER).info(
+            "Embedding cache: %s hits, %s misses, %s writes (hit rate %.1f%%)",
+            self.stats.hits,
+            self.stats.misses,
+            self.stats.writes,
+            self.stats.hit_rate * 100,
+        )
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,98 @@
+"""Single-pass HTML extraction shared by the scraper and the chunker."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import lxml.html
+from lxml import etree
+
+from .models import Section
+
+_SKIP_TAGS = {"script", "style", "noscript"}
+_HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_LINK_PREFIX = "https://groww.in/"
+
+
+@dataclass(slots=True)
+class ParsedPage:
+    """Visible text, Groww links and heading-delimited sections of one page."""
+
+    text: str
+    links: List[str]
+    sections: List[Section]
+
+
+def parse_page(html: str, *, base_url: Optional[str] = None) -> ParsedPage:
+    """Parse ``html`` once with lxml and collect everything downstream stages need.
+
+    Text lines match the old ``BeautifulSoup.get_text("\\n")`` cleanup: script/style/noscript
+    bodies and comments are ignored, and lines are stripped with blanks dropped. Each
+    heading (h1-h6) opens a new :class:`Section`; lines before the first heading go into an
+    untitled level-0 section.
+
+    Links are absolute Groww URLs; with ``base_url``, relative links are resolved against
+    it and any link on the same host as ``base_url`` is kept.
+    """
+
+    if not html.strip():
+        return ParsedPage(text="", links=[], sections=[])
+    root = lxml.html.fromstring(html)
+    lines: List[str] = []
+    links: List[str] = []
+    seen_links = set()
+    link_prefix = _LINK_PREFIX
+    if base_url:
+        parts = urlsplit(base_url)
+        link_prefix = f"{parts.scheme}://{parts.netloc}/"
+    sections: List[Section] = [Section(title="", level=0)]
+    heading_depth = 0
+    heading_lines: List[str] = []
+
+    def _emit(raw: Optional[str]) -> None:
+        if not raw:
+            return
+        target = heading_lines if heading_depth else sections[-1].lines
+        for line in raw.splitlines():
+            line = line.strip()
+            if line:
+                lines.append(line)
+                target.append(line)
+
+    walker = etree.iterwalk(root, events=("start", "end", "comment", "pi"))
+    for event, element in walker:
+        if event in ("comment", "pi"):
+            _emit(element.tail)
+            continue
+        tag = element.tag
+        if event == "start":
+            if tag in _SKIP_TAGS:
+                walker.skip_subtree()
+                continue
+            if tag == "a":
+                href = element.get("href")
+                if href and base_url:
+                    href = urljoin(base_url, href.strip())
+                if href and href.startswith(link_prefix) and href not in seen_links:
+                    seen_links.add(href)
+                    links.append(href)
+            elif tag in _HEADING_LEVELS:
+                heading_depth += 1
+                if heading_depth == 1:
+                    heading_lines = []
+            _emit(element.text)
+            continue
+
+        # "end": the tail text belongs to the parent's context, i.e. after the heading closes.
+        if tag in _HEADING_LEVELS:
+            heading_depth -= 1
+            if heading_depth == 0:
+                title = " ".join(heading_lines)
+                sections.append(Section(title=title, level=_HEADING_LEVELS[tag]))
+        if element is not root:
+            _emit(element.tail)
+
+    sections = [section for section in sections if section.title or section.lines]
+    return ParsedPage(text="\n".join(lines), links=links, sections=sections)
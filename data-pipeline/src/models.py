@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class SchemePage:
     """Represents the seed metadata for a scheme page on Groww."""
 
@@ -16,7 +16,16 @@ class SchemePage:
     url: str
 
 
-@dataclass
+@dataclass(slots=True)
+class Section:
+    """A page heading (level 1-6, 0 for the untitled preamble) and the lines under it."""
+
+    title: str
+    level: int
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
 class ScrapedDocument:
     """Raw HTML/text pulled from Groww along with canonical metadata."""
 
@@ -27,9 +36,13 @@ class ScrapedDocument:
     text: str
     last_verified: str
     extra_links: List[str] = field(default_factory=list)
+    # Parsed at scrape time so the chunker never re-parses the HTML.
+    sections: List[Section] = field(default_factory=list)
+    # sha256 of ``html``; names the page in the snapshot store.
+    content_hash: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Chunk:
     """A Docling-processed chunk ready for storage + embedding."""
 
@@ -43,7 +56,22 @@ class Chunk:
     chunk_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
+class BankEntry:
+    """A likely user question and its precomputed answer, grounded in one chunk."""
+
+    entry_id: str
+    question: str
+    answer: str
+    chunk_id: str
+    scheme: str
+    category: str
+    url: str
+    section: str
+    last_verified: str
+
+
+@dataclass(slots=True)
 class EmbeddingRecord:
     """Chunk content plus numerical embedding vector."""
 
@@ -2,42 +2,202 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from typing import Iterable
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from pinecone import Pinecone
 
 from .config import CONFIG
-from .models import EmbeddingRecord
+from .models import Chunk, EmbeddingRecord
 
 LOGGER = logging.getLogger(__name__)
 
+# Rough JSON size of one float32 component ("-0.0123456789," etc.).
+_BYTES_PER_VALUE = 20
+
+
+@dataclass
+class UpsertStats:
+    vectors: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def vectors_per_second(self) -> float:
+        return self.vectors / self.seconds if self.seconds else 0.0
+
+
+def vector_id(chunk: Chunk) -> str:
+    return chunk.chunk_id or f"{chunk.url}#{chunk.section}"
+
+
+def _vector_payload(record: EmbeddingRecord) -> dict:
+    metadata = {
+        "scheme": record.chunk.scheme,
+        "category": record.chunk.category,
+        "url": record.chunk.url,
+        "section": record.chunk.section,
+        "last_verified": record.chunk.last_verified,
+    }
+    metadata.update(record.chunk.metadata)
+    return {
+        "id": vector_id(record.chunk),
+        "values": record.vector,
+        "metadata": metadata,
+    }
+
+
+def _estimate_bytes(vector: dict) -> int:
+    return (
+        len(vector["id"])
+        + _BYTES_PER_VALUE * len(vector["values"])
+        + len(json.dumps(vector["metadata"], ensure_ascii=False))
+    )
+
 
 class PineconeLoader:
-    def __init__(self) -> None:
-        if not CONFIG.pinecone.api_key:
-            raise ValueError("PINECONE_API_KEY is required")
-        self._pc = Pinecone(api_key=CONFIG.pinecone.api_key)
-        self._index = self._pc.Index(CONFIG.pinecone.index_name)
-
-    def upsert(self, embeddings: Iterable[EmbeddingRecord]) -> None:
-        vectors = []
+    """Streams embeddings into a Pinecone index in bounded, concurrently sent batches.
+
+    ``index`` may be any object exposing ``upsert(vectors=...)``; tests pass a local fake.
+    """
+
+    def __init__(
+        self,
+        index: Any = None,
+        *,
+        batch_size: Optional[int] = None,
+        max_batch_bytes: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        retries: int = 3,
+        backoff: float = 1.5,
+    ) -> None:
+        if index is None:
+            if not CONFIG.pinecone.api_key:
+                raise ValueError("PINECONE_API_KEY is required")
+            self._pc = Pinecone(api_key=CONFIG.pinecone.api_key)
+            index = self._pc.Index(CONFIG.pinecone.index_name)
+        self._index = index
+        self._batch_size = max(1, batch_size or CONFIG.pinecone.upsert_batch_size)
+        self._max_batch_bytes = max_batch_bytes or CONFIG.pinecone.upsert_max_bytes
+        self._max_workers = max(1, max_workers or CONFIG.pinecone.upsert_workers)
+        self._retries = retries
+        self._backoff = backoff
+
+    def _batches(
+        self,
+        embeddings: Iterable[EmbeddingRecord],
+        namespace_of: Callable[[EmbeddingRecord], Optional[str]],
+    ) -> Iterator[Tuple[Optional[str], List[dict]]]:
+        """Group vectors into per-namespace batches bounded by count and payload size."""
+
+        batches: Dict[Optional[str], List[dict]] = {}
+        sizes: Dict[Optional[str], int] = {}
         for record in embeddings:
-            metadata = {
-                "scheme": record.chunk.scheme,
-                "category": record.chunk.category,
-                "url": record.chunk.url,
-                "section": record.chunk.section,
-                "last_verified": record.chunk.last_verified,
-            }
-            metadata.update(record.chunk.metadata)
-            vectors.append(
-                {
-                    "id": record.chunk.chunk_id or f"{record.chunk.url}#{record.chunk.section}",
-                    "values": record.vector,
-                    "metadata": metadata,
-                }
+            namespace = namespace_of(record)
+            vector = _vector_payload(record)
+            size = _estimate_bytes(vector)
+            batch = batches.setdefault(namespace, [])
+            if batch and (
+                len(batch) >= self._batch_size
+                or sizes[namespace] + size > self._max_batch_bytes
+            ):
+                yield namespace, batch
+                batch = batches[namespace] = []
+                sizes[namespace] = 0
+            batch.append(vector)
+            sizes[namespace] = sizes.get(namespace, 0) + size
+        for namespace, batch in batches.items():
+            if batch:
+                yield namespace, batch
+
+    def _send(self, batch: List[dict], namespace: Optional[str] = None) -> int:
+        """Upsert one batch with retries; returns the number of retries used."""
+
+        for attempt in range(1, self._retries + 1):
+            try:
+                if namespace:
+                    self._index.upsert(vectors=batch, namespace=namespace)
+                else:
+                    self._index.upsert(vectors=batch)
+                return attempt - 1
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.warning(
+                    "Pinecone upsert of %s vectors failed (attempt %s): %s",
+                    len(batch),
+                    attempt,
+                    exc,
+                )
+                if attempt == self._retries:
+                    raise
+                time.sleep(self._backoff * 2 ** (attempt - 1))
+        return self._retries
+
+    def upsert(
+        self,
+        embeddings: Iterable[EmbeddingRecord],
+        *,
+        namespace: Optional[str] = None,
+        namespace_of: Optional[Callable[[EmbeddingRecord], Optional[str]]] = None,
+        on_batch: Optional[Callable[[List[str]], None]] = None,
+    ) -> UpsertStats:
+        """Upsert all records into ``namespace``, or per record into ``namespace_of(record)``.
+
+        ``on_batch`` receives the vector ids of each acknowledged batch.
+        """
+
+        stats = UpsertStats()
+        started = time.perf_counter()
+        # Cap queued batches so a large iterator is never fully materialised.
+        max_in_flight = self._max_workers * 2
+        in_flight: Dict[Future, List[str]] = {}
+
+        def _collect(done: Set[Future]) -> None:
+            for future in done:
+                ids = in_flight.pop(future)
+                stats.retries += future.result()
+                stats.vectors += len(ids)
+                stats.batches += 1
+                if on_batch is not None:
+                    on_batch(ids)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            batches = self._batches(embeddings, namespace_of or (lambda _: namespace))
+            for batch_namespace, batch in batches:
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    _collect(done)
+                ids = [vector["id"] for vector in batch]
+                in_flight[pool.submit(self._send, batch, batch_namespace)] = ids
+            if in_flight:
+                done, _ = wait(in_flight)
+                _collect(done)
+
+        stats.seconds = time.perf_counter() - started
+        if stats.vectors:
+            LOGGER.info(
+                "Upserted %s vectors into Pinecone in %s batches (%s retries) "
+                "in %.2fs (%.0f vectors/s)",
+                stats.vectors,
+                stats.batches,
+                stats.retries,
+                stats.seconds,
+                stats.vectors_per_second,
             )
-        if vectors:
-            LOGGER.info("Upserting %s vectors into Pinecone", len(vectors))
-            self._index.upsert(vectors=vectors)
+        return stats
+
+    def delete_namespace(self, namespace: str) -> None:
+        LOGGER.info("Deleting Pinecone namespace %s", namespace)
+        self._index.delete(delete_all=True, namespace=namespace)
+
+    def delete_version(self, version: str) -> None:
+        """Delete the namespace of ``version`` and all of its shard namespaces."""
+
+        namespaces = self._index.describe_index_stats()["namespaces"]
+        for namespace in namespaces:
+            if namespace == version or namespace.startswith(f"{version}."):
+                self.delete_namespace(namespace)
@@ -4,48 +4,411 @@ from __future__ import annotations
 
 import argparse
 import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+from .checkpoint import STAGES, RunCheckpoint
 from .config import CONFIG
-from .doc_processing import build_chunks, export_sources
-from .embedding import embed_chunks
-from .pinecone_loader import PineconeLoader
-from .scraper import save_raw_documents, scrape_all
+from .crawl import Crawler
+from .dedup import ChunkDeduplicator, load_boilerplate, save_boilerplate
+from .doc_processing import export_sources, iter_document_chunks
+from .embedding import get_embedding_provider, iter_embeddings
+from .embedding_providers import EmbeddingProvider
+from .models import BankEntry, Chunk, EmbeddingRecord, ScrapedDocument
+from .pinecone_loader import PineconeLoader, vector_id
+from .question_bank import get_question_generator, iter_bank_entries
+from .snapshot import SnapshotWriter, iter_snapshot_documents, resolve_manifest
 from .storage import MongoStore
+from .streaming import StageStats, StreamingPipeline, Transform, peak_rss_mb
+from .registry import get_registry
+from .versioning import garbage_collect, new_version_id, shard_namespace
 
 logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
 
+# Embedded chunk ids are checkpointed in groups of this many records.
+_EMBED_CHECKPOINT_BATCH = 256
 
-def run_pipeline(output_dir: Path) -> None:
+
+def _release_markup(doc: ScrapedDocument) -> None:
+    """Drop the parsed page once it is chunked; the snapshot store keeps the HTML."""
+
+    doc.html = ""
+    doc.sections = []
+
+
+def _release_payload(doc: ScrapedDocument) -> None:
+    """Drop the page text once it is persisted; only metadata is needed afterwards."""
+
+    _release_markup(doc)
+    doc.text = ""
+
+
+@dataclass
+class PipelineRun:
+    """Outcome of one :func:`run_pipeline` call."""
+
+    version: str
+    documents: int
+    seconds: float
+    stages: List[StageStats] = field(default_factory=list)
+    activated: bool = True
+
+
+def _open_checkpoint(
+    output_dir: Path,
+    provider: EmbeddingProvider,
+    *,
+    resume: Optional[str],
+    only_stage: Optional[str],
+    from_snapshot: Optional[str],
+    snapshot_root: Optional[Path],
+) -> RunCheckpoint:
+    """Load the run to resume, or register a new version with its checkpoint directory."""
+
+    if resume or (only_stage and only_stage != "scrape"):
+        checkpoint = RunCheckpoint.load(output_dir, resume or "latest")
+        manifest = checkpoint.manifest
+        recorded = (manifest["embedding_model"], manifest["embedding_dimensions"])
+        if recorded != (provider.name, provider.dimensions):
+            raise ValueError(
+                f"Run {checkpoint.version} was embedded with {recorded[0]} ({recorded[1]} dims), "
+                f"not {provider.name} ({provider.dimensions} dims)"
+            )
+        LOGGER.info("Resuming corpus version %s", checkpoint.version)
+        return checkpoint
+
+    version = new_version_id()
+    snapshot_id = version
+    if from_snapshot:
+        # Resolve up front so a bad reference fails before anything is written. The
+        # reference may be a manifest path or a directory outside the default root, so the
+        # root it was found under (the parent of its runs/ directory) is recorded too.
+        manifest = resolve_manifest(from_snapshot, root=snapshot_root)
+        snapshot_id = manifest.name.split(".jsonl")[0]
+        snapshot_root = manifest.resolve().parent.parent
+    checkpoint = RunCheckpoint.create(
+        output_dir,
+        version,
+        snapshot_id=snapshot_id,
+        snapshot_root=str(snapshot_root) if snapshot_root else None,
+        embedding_model=provider.name,
+        embedding_dimensions=provider.dimensions,
+    )
+    if from_snapshot:
+        checkpoint.finish("scrape", reused_snapshot=True)
+    return checkpoint
+
+
+def _snapshot_complete(snapshot_id: str, root: Optional[Path]) -> bool:
+    try:
+        resolve_manifest(snapshot_id, root=root)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def run_pipeline(
+    output_dir: Path,
+    *,
+    from_snapshot: Optional[str] = None,
+    resume: Optional[str] = None,
+    only_stage: Optional[str] = None,
+    store: Optional[MongoStore] = None,
+    loader: Optional[PineconeLoader] = None,
+    crawler: Optional[Crawler] = None,
+    provider: Optional[EmbeddingProvider] = None,
+    embedder: Optional[Transform] = None,
+    snapshot_root: Optional[Path] = None,
+    sources_csv: Path = Path("docs/sources.csv"),
+) -> PipelineRun:
+    """Build a new corpus version and make it live.
+
+    Stages run concurrently on separate documents, connected by bounded queues:
+    scrape -> chunk -> store -> embed -> upsert. The scrape stage crawls outward from the
+    registry's scheme pages (see :class:`Crawler`), resuming an interrupted crawl, and saves
+    fetched pages to the snapshot store under the version id; with ``from_snapshot``
+    ("latest" or a snapshot id) the pages are read back from that snapshot instead of being
+    fetched. Chunks are tagged with their registry shard and vectors are upserted into one
+    namespace per shard (see :func:`shard_namespace`). Once the chunk set is final, the
+    questions stage writes the version's question bank from it (see :mod:`.question_bank`).
+
+    Progress is checkpointed under ``output_dir/runs/<version>`` (see
+    :class:`RunCheckpoint`). ``resume`` ("latest" or a version id) continues a failed run:
+    finished stages are skipped, chunks come back from the checkpoint and already upserted
+    vectors are not sent again. ``only_stage`` runs one stage of that run (or of a new run
+    for "scrape"); the version is activated once every stage has completed.
+
+    ``store``, ``loader``, ``crawler``, ``provider`` and ``embedder`` default to the
+    production components; the benchmark harness swaps in recorded pages and in-memory
+    stand-ins. The embedding provider's model and dimensions are recorded on the version.
+    """
+
+    started = time.perf_counter()
     output_dir.mkdir(parents=True, exist_ok=True)
+    provider = provider or get_embedding_provider()
+    checkpoint = _open_checkpoint(
+        output_dir,
+        provider,
+        resume=resume,
+        only_stage=only_stage,
+        from_snapshot=from_snapshot,
+        snapshot_root=snapshot_root,
+    )
+    version = checkpoint.version
+    snapshot_id = checkpoint.manifest["snapshot_id"]
+    if checkpoint.manifest.get("snapshot_root"):
+        snapshot_root = Path(checkpoint.manifest["snapshot_root"])
+    if not checkpoint.done("scrape") and _snapshot_complete(snapshot_id, snapshot_root):
+        # The crawl finished but the run stopped before recording it.
+        checkpoint.finish("scrape")
+
+    if only_stage:
+        for stage in STAGES[: STAGES.index(only_stage)]:
+            if not checkpoint.done(stage):
+                raise ValueError(f"Stage '{stage}' of run {version} has not completed yet")
+        pending = [only_stage]
+    else:
+        pending = [stage for stage in STAGES if not checkpoint.done(stage)]
+
+    mongo_store = store or MongoStore()
+    mongo_store.ensure_indexes()
+    mongo_store.begin_version(
+        version, embedding_model=provider.name, embedding_dimensions=provider.dimensions
+    )
+    loader = loader or PineconeLoader()
+    scraped: List[ScrapedDocument] = []
+    boilerplate_path = output_dir / "boilerplate_lines.json"
+    deduper = ChunkDeduplicator(known_boilerplate=load_boilerplate(boilerplate_path))
+    upserted = checkpoint.upserted_ids()
+    registry = get_registry()
+
+    def _scrape(_: Iterator) -> Iterator[ScrapedDocument]:
+        if checkpoint.done("scrape"):
+            LOGGER.info("Reprocessing snapshot %s offline", snapshot_id)
+            yield from iter_snapshot_documents(snapshot_id, root=snapshot_root)
+            return
+        with SnapshotWriter(snapshot_id, root=snapshot_root) as writer:
+            for doc in (crawler or Crawler()).crawl(version):
+                writer.write(doc)
+                yield doc
+        checkpoint.finish("scrape", documents=writer.pages)
 
-    # Step 1: Scrape
-    LOGGER.info("Scraping Groww scheme pages")
-    documents = scrape_all()
-    save_raw_documents(documents, output_dir / "raw_documents.json")
-    export_sources(documents, Path("docs/sources.csv"))
+    def _chunk(docs: Iterator[ScrapedDocument]) -> Iterator[Tuple[ScrapedDocument, List[Chunk]]]:
+        for doc, chunks in iter_document_chunks(docs):
+            _release_markup(doc)
+            yield doc, chunks
 
-    # Step 2: Process + chunk
-    LOGGER.info("Building chunks with Docling")
-    all_chunks = []
-    for doc in documents:
-        chunks = build_chunks(doc)
-        all_chunks.extend(chunks)
+    def _store(items: Iterator[Tuple[ScrapedDocument, List[Chunk]]]) -> Iterator[Chunk]:
+        """Write documents and chunks to Mongo in small groups and pass the chunks on.
 
-    # Step 3: Store in Mongo
-    mongo_store = MongoStore()
-    mongo_store.upsert_documents(documents)
-    mongo_store.upsert_chunks(all_chunks)
+        Groups close on ``PIPELINE_STORE_FLUSH_CHUNKS`` chunks or
+        ``PIPELINE_STORE_FLUSH_SECONDS``, independently of the Mongo write batch size, so
+        the embed and upsert stages overlap with scraping even on small corpora.
+        """
 
-    # Step 4: Embeddings + Pinecone
-    LOGGER.info("Embedding %s chunks", len(all_chunks))
-    embeddings = embed_chunks(all_chunks)
-    loader = PineconeLoader()
-    loader.upsert(embeddings)
-    mongo_store.close()
+        pending_docs: List[ScrapedDocument] = []
+        pending_chunks: List[Chunk] = []
+        shards: Set[str] = set()
+        stored = 0
+        oldest = 0.0
 
-    LOGGER.info("Pipeline completed successfully")
+        def _flush() -> List[Chunk]:
+            nonlocal pending_docs, pending_chunks, stored
+            mongo_store.upsert_documents(pending_docs, snapshot=snapshot_id)
+            mongo_store.upsert_chunks(pending_chunks, version=version)
+            checkpoint.append_chunks(pending_chunks)
+            stored += len(pending_chunks)
+            for stored_doc in pending_docs:
+                _release_payload(stored_doc)
+            flushed = pending_chunks
+            pending_docs, pending_chunks = [], []
+            return flushed
+
+        checkpoint.reset_chunks()
+        for doc, chunks in items:
+            amc = registry.amc_for(doc.scheme, doc.url)
+            shard = registry.shard_for(doc.scheme, doc.category, doc.url)
+            shards.add(shard)
+            for chunk in chunks:
+                chunk.metadata.update(amc=amc, shard=shard)
+            scraped.append(doc)
+            if not pending_docs:
+                oldest = time.monotonic()
+            pending_docs.append(doc)
+            pending_chunks.extend(chunks)
+            if (
+                len(pending_chunks) >= CONFIG.streaming.store_flush_chunks
+                or time.monotonic() - oldest >= CONFIG.streaming.store_flush_seconds
+            ):
+                yield from _flush()
+        if pending_docs:
+            yield from _flush()
+        # Dedup has drained by now, so its learned boilerplate is final.
+        if CONFIG.dedup.enabled:
+            save_boilerplate(boilerplate_path, deduper.boilerplate_fingerprints())
+        export_sources(scraped, sources_csv)
+        checkpoint.finish("chunk", documents=len(scraped), chunks=stored, shards=sorted(shards))
+
+    def _stored_chunks(_: Iterator) -> Iterator[Chunk]:
+        yield from checkpoint.iter_chunks()
+
+    def _not_upserted(chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+        skipped = 0
+        for chunk in chunks:
+            if vector_id(chunk) in upserted:
+                skipped += 1
+                continue
+            yield chunk
+        if skipped:
+            LOGGER.info("Skipped %s chunks already upserted by an earlier attempt", skipped)
+
+    base_embed = embedder or (lambda chunks: iter_embeddings(chunks, provider=provider))
+
+    def _embed(chunks: Iterator[Chunk]) -> Iterator[EmbeddingRecord]:
+        batch: List[str] = []
+        embedded = 0
+        for record in base_embed(_not_upserted(chunks)):
+            batch.append(vector_id(record.chunk))
+            if len(batch) >= _EMBED_CHECKPOINT_BATCH:
+                checkpoint.record_embedded(batch)
+                embedded += len(batch)
+                batch = []
+            yield record
+        if batch:
+            checkpoint.record_embedded(batch)
+            embedded += len(batch)
+        if "embed" in pending:
+            checkpoint.finish("embed", embedded=embedded)
+
+    def _questions(_: Iterator) -> Iterator[BankEntry]:
+        if not CONFIG.question_bank.enabled:
+            checkpoint.finish("questions", skipped=True)
+            return
+        generator = get_question_generator()
+        # Entries wait here while their questions are embedded; records come back in order.
+        waiting: Deque[BankEntry] = deque()
+
+        def _as_chunks(entries: Iterable[BankEntry]) -> Iterator[Chunk]:
+            for entry in entries:
+                waiting.append(entry)
+                yield Chunk(
+                    scheme=entry.scheme,
+                    category=entry.category,
+                    url=entry.url,
+                    section=entry.section,
+                    content=entry.question,
+                    last_verified=entry.last_verified,
+                    chunk_id=entry.entry_id,
+                )
+
+        def _flush(batch: Sequence[Tuple[BankEntry, List[float]]]) -> Iterator[BankEntry]:
+            mongo_store.upsert_questions(batch, version=version)
+            return (entry for entry, _ in batch)
+
+        entries = iter_bank_entries(checkpoint.iter_chunks(), generator)
+        batch: List[Tuple[BankEntry, List[float]]] = []
+        stored = 0
+        try:
+            for record in base_embed(_as_chunks(entries)):
+                batch.append((waiting.popleft(), record.vector))
+                if len(batch) >= CONFIG.mongo.write_batch_size:
+                    yield from _flush(batch)
+                    stored += len(batch)
+                    batch = []
+            if batch:
+                yield from _flush(batch)
+                stored += len(batch)
+        finally:
+            generator.close()
+        checkpoint.finish("questions", entries=stored, generator=generator.name)
+
+    def _upsert(records: Iterator[EmbeddingRecord]) -> Iterator[None]:
+        stats = loader.upsert(
+            records,
+            namespace_of=lambda record: shard_namespace(version, record.chunk.metadata["shard"]),
+            on_batch=checkpoint.record_upserted,
+        )
+        checkpoint.finish("upsert", vectors=stats.vectors + len(upserted))
+        return iter(())
+
+    LOGGER.info("Streaming corpus version %s (stages: %s)", version, ", ".join(pending))
+    streaming = StreamingPipeline(queue_size=CONFIG.streaming.queue_size)
+    if "chunk" in pending or pending == ["scrape"]:
+        streaming.add_stage("scrape", _scrape)
+    if "chunk" in pending:
+        streaming.add_stage("chunk", _chunk)
+        if CONFIG.dedup.enabled:
+            streaming.add_stage("dedup", deduper.process)
+        streaming.add_stage("store", _store)
+    elif "embed" in pending or "upsert" in pending:
+        streaming.add_stage("chunks", _stored_chunks)
+    if "embed" in pending or "upsert" in pending:
+        streaming.add_stage("embed", _embed)
+    if "upsert" in pending:
+        streaming.add_stage("upsert", _upsert)
+    bank = StreamingPipeline(queue_size=CONFIG.streaming.queue_size)
+    if "questions" in pending:
+        bank.add_stage("questions", _questions)
+
+    for stage in pending:
+        checkpoint.start(stage)
+    try:
+        stages = streaming.run() if pending else []
+        # Built after the streaming stages, which finalise the checkpointed chunk set.
+        stages += bank.run()
+        activated = all(checkpoint.done(stage) for stage in STAGES)
+        if activated:
+            catalog = registry.catalog(checkpoint.manifest["stages"]["chunk"].get("shards", []))
+            for entry in catalog:
+                entry["namespace"] = shard_namespace(version, entry["shard"])
+            mongo_store.set_shards(version, catalog)
+            # Flip the active pointer, then drop versions nobody reads anymore
+            previous = mongo_store.activate_version(version)
+            LOGGER.info("Activated corpus version %s (was %s)", version, previous)
+            dropped = garbage_collect(
+                mongo_store, loader, keep=CONFIG.versioning.keep_versions, runs_dir=output_dir
+            )
+            for old in dropped:
+                RunCheckpoint.remove(output_dir, old)
+            checkpoint.complete()
+        else:
+            LOGGER.info("Run %s paused after %s; continue with --resume", version, pending)
+    except BaseException as exc:
+        checkpoint.fail(exc)
+        LOGGER.error("Run %s failed; retry with --resume %s", version, version)
+        raise
+    finally:
+        mongo_store.close()
+
+    LOGGER.info(
+        "Pipeline %s (peak RSS %.1f MiB)",
+        "completed successfully" if activated else "paused",
+        peak_rss_mb(),
+    )
+    return PipelineRun(
+        version=version,
+        documents=len(scraped),
+        seconds=time.perf_counter() - started,
+        stages=stages,
+        activated=activated,
+    )
+
+
+def run_scheduled(output_dir: Path, interval_minutes: float) -> None:
+    """Refresh the corpus every ``interval_minutes``; failed runs leave the live version intact."""
+
+    while True:
+        started = time.monotonic()
+        try:
+            run_pipeline(output_dir)
+        except Exception:  # noqa: BLE001
+            LOGGER.exception("Scheduled pipeline run failed; keeping current corpus version")
+        elapsed = time.monotonic() - started
+        time.sleep(max(0.0, interval_minutes * 60 - elapsed))
 
 
 def parse_args() -> argparse.Namespace:
@@ -54,14 +417,56 @@ def parse_args() -> argparse.Namespace:
         "--output",
         default=CONFIG.paths.output_dir,
         type=Path,
-        help="Directory to store raw scrape outputs",
+        help="Directory for run artifacts such as learned boilerplate lines",
+    )
+    parser.add_argument(
+        "--from-snapshot",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="SNAPSHOT",
+        help="Rebuild from a stored page snapshot (default: latest) instead of scraping",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="VERSION",
+        help="Continue a failed run (default: the newest unfinished one) from its checkpoints",
+    )
+    parser.add_argument(
+        "--only-stage",
+        choices=STAGES,
+        default=None,
+        help="Run a single stage of the resumed (or, for scrape, a new) run and stop",
+    )
+    parser.add_argument(
+        "--schedule-minutes",
+        default=CONFIG.versioning.refresh_interval_minutes,
+        type=float,
+        help="Re-run the pipeline on this interval (0 runs once)",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.from_snapshot and args.schedule_minutes > 0:
+        parser.error(
+            "--from-snapshot rebuilds one version and cannot be scheduled; "
+            "pass --schedule-minutes 0 (or unset PIPELINE_REFRESH_MINUTES)"
+        )
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    run_pipeline(Path(args.output))
+    if args.schedule_minutes > 0 and not (args.resume or args.only_stage):
+        run_scheduled(Path(args.output), args.schedule_minutes)
+    else:
+        run_pipeline(
+            Path(args.output),
+            from_snapshot=args.from_snapshot,
+            resume=args.resume,
+            only_stage=args.only_stage,
+        )
 
 
 if __name__ == "__main__":
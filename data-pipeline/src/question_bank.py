@@ -0,0 +1,331 @@
+"""Likely user questions and precomputed answers per chunk, built at ingest time.
+
+The backend embeds each incoming question anyway; when it lands close enough to a bank
+question, the stored answer is returned without retrieval or a chat completion. Answers
+are at most three sentences and come from the chunk alone, so they carry its URL and
+``last_verified`` date like any generated answer.
+
+Two generators are available (``QUESTION_BANK_GENERATOR``): ``template`` recognises the
+facts a chunk states (exit load, expense ratio, ...) and answers with the sentences that
+state them, without network access; ``openai`` asks the chat model, caching the result
+per chunk content so unchanged chunks are not sent again on the next run.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openai import OpenAI
+
+from .config import CONFIG
+from .embedding_cache import content_hash
+from .models import BankEntry, Chunk
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_ANSWER_SENTENCES = 3
+# Sentences longer than this are page prose rather than a stated fact.
+_MAX_SENTENCE_WORDS = 60
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_PLAN_SUFFIX = re.compile(r"(\s+(direct|regular|plan|growth|idcw|option))+$", re.IGNORECASE)
+
+# (attribute, pattern that finds it in a chunk, question templates)
+ATTRIBUTES: Sequence[Tuple[str, re.Pattern, Tuple[str, ...]]] = (
+    (
+        "exit load",
+        re.compile(r"\bexit load\b", re.IGNORECASE),
+        ("What is the exit load of {scheme}?", "Is there an exit load on {scheme}?"),
+    ),
+    (
+        "expense ratio",
+        re.compile(r"\bexpense ratio\b|\bTER\b", re.IGNORECASE),
+        ("What is the expense ratio of {scheme}?", "How much does {scheme} charge per year?"),
+    ),
+    (
+        "minimum investment",
+        re.compile(r"\bmin(imum)?\.?\s+(sip|lump\s?sum|investment|amount)\b", re.IGNORECASE),
+        (
+            "What is the minimum investment for {scheme}?",
+            "What is the minimum SIP amount for {scheme}?",
+        ),
+    ),
+    (
+        "lock-in",
+        re.compile(r"\block[\s-]?in\b", re.IGNORECASE),
+        ("What is the lock-in period of {scheme}?", "Can I withdraw from {scheme} anytime?"),
+    ),
+    (
+        "fund manager",
+        re.compile(
+            r"\bfund manage(r|ment)\b|\bmanag(es|ed|ing) (the|this) (fund|scheme)\b",
+            re.IGNORECASE,
+        ),
+        ("Who is the fund manager of {scheme}?", "Who manages {scheme}?"),
+    ),
+    (
+        "benchmark",
+        re.compile(r"\bbenchmark\b", re.IGNORECASE),
+        ("What is the benchmark of {scheme}?", "Which index does {scheme} track against?"),
+    ),
+    (
+        "risk",
+        re.compile(
+            r"\briskometer\b|\b(very high|moderately high|low to moderate) risk\b", re.IGNORECASE
+        ),
+        ("What is the risk level of {scheme}?", "How risky is {scheme}?"),
+    ),
+    (
+        "fund size",
+        re.compile(r"\b(fund size|AUM)\b", re.IGNORECASE),
+        ("What is the fund size of {scheme}?", "What is the AUM of {scheme}?"),
+    ),
+)
+
+
+def short_scheme_name(scheme: str) -> str:
+    """``HDFC Small Cap Fund Direct Growth`` -> ``HDFC Small Cap Fund``."""
+
+    return _PLAN_SUFFIX.sub("", scheme).strip() or scheme
+
+
+def _sentences(text: str) -> List[str]:
+    return [part.strip() for line in text.splitlines() for part in _SENTENCE.split(line)]
+
+
+def _limit_sentences(text: str) -> str:
+    return " ".join(_SENTENCE.split(text.strip())[:MAX_ANSWER_SENTENCES])
+
+
+def _entry(chunk: Chunk, position: int, question: str, answer: str) -> BankEntry:
+    chunk_id = chunk.chunk_id or f"{chunk.url}#{chunk.section}"
+    return BankEntry(
+        entry_id=f"{chunk_id}#q{position}",
+        question=question,
+        answer=answer,
+        chunk_id=chunk_id,
+        scheme=chunk.scheme,
+        category=chunk.category,
+        url=chunk.url,
+        section=chunk.section,
+        last_verified=chunk.last_verified,
+    )
+
+
+class TemplateQuestionGenerator:
+    """Questions from fixed templates for each fact a chunk states; answers quote the chunk."""
+
+    name = "template"
+
+    def __init__(self, per_chunk: int) -> None:
+        self.per_chunk = per_chunk
+
+    def _facts(self, chunk: Chunk) -> List[Tuple[Tuple[str, ...], str]]:
+        titles = {title.strip().lower() for title in chunk.section.split(" / ")}
+        skip = titles | {chunk.scheme.strip().lower()}
+        body = [
+            sentence
+            for sentence in _sentences(chunk.content)
+            if sentence
+            and sentence.lower() not in skip
+            and len(sentence.split()) <= _MAX_SENTENCE_WORDS
+        ]
+        facts = []
+        for _, pattern, templates in ATTRIBUTES:
+            stated = [sentence for sentence in body if pattern.search(sentence)]
+            if not stated and pattern.search(chunk.section):
+                # The heading names the fact and the lines under it state it.
+                stated = body
+            if stated:
+                lines = stated[:MAX_ANSWER_SENTENCES]
+                answer = " ".join(line if line[-1] in ".!?" else f"{line}." for line in lines)
+                facts.append((templates, answer))
+        return facts
+
+    def generate(self, chunk: Chunk) -> List[BankEntry]:
+        facts = self._facts(chunk)
+        scheme = short_scheme_name(chunk.scheme)
+        entries: List[BankEntry] = []
+        # One phrasing per fact first, then alternates, so small banks cover more facts.
+        for variant in range(max((len(templates) for templates, _ in facts), default=0)):
+            for templates, answer in facts:
+                if len(entries) >= self.per_chunk:
+                    return entries
+                if variant < len(templates):
+                    question = templates[variant].format(scheme=scheme)
+                    entries.append(_entry(chunk, len(entries) + 1, question, answer))
+        return entries
+
+    def close(self) -> None:
+        return None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    model TEXT NOT NULL,
+    per_chunk INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    items TEXT NOT NULL,
+    PRIMARY KEY (model, per_chunk, content_hash)
+)
+"""
+
+_PROMPT = (
+    "You write an FAQ for a mutual fund chatbot. Using ONLY the facts in the passage, write "
+    "up to {count} questions an investor is likely to ask about {scheme} that the passage "
+    "answers, each with a factual answer of at most three sentences. No advice, opinions or "
+    "performance predictions. Reply with JSON: "
+    '{{"items": [{{"question": "...", "answer": "..."}}]}}. Return no items when the '
+    "passage states no facts."
+)
+
+
+class QuestionCache:
+    """SQLite store of generated (question, answer) pairs keyed by model and chunk content."""
+
+    def __init__(self, path: Path, *, model: str, per_chunk: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Generation runs on worker threads; the lock serialises access to the connection.
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._key = (model, per_chunk)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[List[dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items FROM questions "
+                "WHERE model = ? AND per_chunk = ? AND content_hash = ?",
+                (*self._key, digest),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, digest: str, items: List[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO questions (model, per_chunk, content_hash, items) "
+                "VALUES (?, ?, ?, ?)",
+                (*self._key, digest, json.dumps(items, ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class OpenAIQuestionGenerator:
+    """Questions and answers written by the chat model, cached per chunk content."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        per_chunk: int,
+        *,
+        model: Optional[str] = None,
+        client: Optional[OpenAI] = None,
+        cache: Optional[QuestionCache] = None,
+    ) -> None:
+        if client is None and not CONFIG.openai.api_key:
+            raise ValueError("OPENAI_API_KEY is required for QUESTION_BANK_GENERATOR=openai")
+        self.per_chunk = per_chunk
+        self.model = model or CONFIG.question_bank.model
+        self._client = client or OpenAI(api_key=CONFIG.openai.api_key)
+        self._cache = cache or QuestionCache(
+            CONFIG.paths.question_cache, model=self.model, per_chunk=per_chunk
+        )
+
+    def _ask(self, chunk: Chunk) -> List[dict]:
+        completion = self._client.chat.completions.create(
+            model=self.model,
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=[
+                {
+                    "role": "system",
+                    "content": _PROMPT.format(
+                        count=self.per_chunk, scheme=short_scheme_name(chunk.scheme)
+                    ),
+                },
+                {"role": "user", "content": chunk.content},
+            ],
+        )
+        try:
+            items = json.loads(completion.choices[0].message.content or "{}").get("items", [])
+        except (json.JSONDecodeError, AttributeError):
+            LOGGER.warning("Discarding malformed question bank reply for %s", chunk.chunk_id)
+            return []
+        pairs = [
+            {
+                "question": str(item.get("question", "")).strip(),
+                "answer": str(item.get("answer", "")).strip(),
+            }
+            for item in items
+            if isinstance(item, dict)
+        ]
+        return [pair for pair in pairs if pair["question"] and pair["answer"]]
+
+    def generate(self, chunk: Chunk) -> List[BankEntry]:
+        digest = content_hash(chunk.content)
+        items = self._cache.get(digest)
+        if items is None:
+            items = self._ask(chunk)
+            self._cache.put(digest, items)
+        return [
+            _entry(chunk, position, item["question"], _limit_sentences(item["answer"]))
+            for position, item in enumerate(items[: self.per_chunk], start=1)
+        ]
+
+    def close(self) -> None:
+        LOGGER.info("Question cache: %s hits, %s misses", self._cache.hits, self._cache.misses)
+        self._cache.close()
+
+
+def get_question_generator(name: Optional[str] = None, per_chunk: Optional[int] = None):
+    """The generator selected by ``QUESTION_BANK_GENERATOR``."""
+
+    name = name or CONFIG.question_bank.generator
+    per_chunk = per_chunk or CONFIG.question_bank.per_chunk
+    if name == "template":
+        return TemplateQuestionGenerator(per_chunk)
+    if name == "openai":
+        return OpenAIQuestionGenerator(per_chunk)
+    raise ValueError(f"Unknown question bank generator '{name}' (expected template or openai)")
+
+
+def iter_bank_entries(
+    chunks: Iterable[Chunk], generator, *, workers: Optional[int] = None
+) -> Iterator[BankEntry]:
+    """Generate entries for ``chunks`` on ``workers`` threads, yielding in chunk order."""
+
+    workers = max(1, workers or CONFIG.question_bank.workers)
+    if workers == 1 or isinstance(generator, TemplateQuestionGenerator):
+        for chunk in chunks:
+            yield from generator.generate(chunk)
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="questions") as pool:
+        # ``map`` submits eagerly, so feed it windows to keep memory bounded.
+        window: List[Chunk] = []
+        for chunk in chunks:
+            window.append(chunk)
+            if len(window) >= workers * 4:
+                for entries in pool.map(generator.generate, window):
+                    yield from entries
+                window = []
+        for entries in pool.map(generator.generate, window):
+            yield from entries
@@ -0,0 +1,131 @@
+"""Request and token rate limiting for calls to rate-limited APIs."""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from typing import Mapping, Optional
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class _Bucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = max(1.0, float(per_minute))
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until ``amount`` is available; amounts above capacity wait for a full bucket."""
+
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+
+class RateLimiter:
+    """Blocks callers so requests stay under both a requests- and a tokens-per-minute limit.
+
+    Shared by all worker threads. ``pause`` stops every caller until a deadline, which is how
+    a rate-limit response from the server slows the whole pool down, not just one worker.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, rpm: float, tpm: float) -> None:
+        self._requests = _Bucket(rpm) if rpm > 0 else None
+        self._tokens = _Bucket(tpm) if tpm > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self, tokens: int = 0) -> None:
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if delay <= 0:
+                    for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                        if bucket is not None:
+                            bucket.refill(now)
+                            delay = max(delay, bucket.wait_for(amount))
+                if delay <= 0:
+                    if self._requests is not None:
+                        self._requests.level -= 1
+                    if self._tokens is not None:
+                        self._tokens.level -= tokens
+                    self.waited += now - started
+                    return
+            time.sleep(min(delay, 1.0))
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds``, then ramp up from empty buckets, not a burst."""
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.level = min(bucket.level, 0.0)
+                    bucket.updated = self._paused_until
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse ``1.5``, ``20ms``, ``6m0s`` style durations into seconds."""
+
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _UNIT_SECONDS[unit] for number, unit in parts)
+
+
+def retry_delay(exc: BaseException, attempt: int, *, base: float = 1.0) -> Optional[float]:
+    """Seconds to wait before retrying after ``exc``, or ``None`` if it is not retryable.
+
+    Rate-limit responses are honoured through ``retry-after(-ms)`` and the
+    ``x-ratelimit-reset-*`` headers; otherwise the delay backs off exponentially with jitter.
+    """
+
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        # Connection errors and timeouts carry no status code.
+        if type(exc).__name__ not in {"APIConnectionError", "APITimeoutError"}:
+            return None
+    elif status not in _RETRYABLE_STATUS:
+        return None
+
+    response = getattr(exc, "response", None)
+    headers: Mapping[str, str] = getattr(response, "headers", None) or {}
+    delay = _header_delay(headers)
+    if delay is None:
+        delay = base * 2 ** (attempt - 1)
+    return min(60.0, delay) * random.uniform(1.0, 1.25)
+
+
+def _header_delay(headers: Mapping[str, str]) -> Optional[float]:
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    if headers.get("retry-after"):
+        return _parse_duration(headers["retry-after"])
+    # Otherwise wait for whichever exhausted limit resets.
+    resets = [
+        _parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+        for kind in ("requests", "tokens")
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
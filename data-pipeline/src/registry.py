@@ -0,0 +1,166 @@
+"""Scheme registry: the corpus definition, loaded from a JSON data file.
+
+The registry (``SCHEME_REGISTRY_PATH``, default ``data-pipeline/registry/schemes.json``)
+lists the seed pages with their AMC and category, aliases used to route questions, and
+named extraction rules that a scheme opts into. A scheme's free-form ``note`` records
+quirks such as a URL slug that does not follow the scheme name. Onboarding a scheme or an
+AMC is a data change, not a code change.
+
+Every chunk is assigned a shard, ``<amc>.<category>``. Vectors go to one Pinecone namespace
+per shard within a corpus version, and the version record carries a catalog of the
+shards so the backend can query only the ones a question is about.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+from .config import CONFIG
+from .models import SchemePage
+
+_SLUG = re.compile(r"[^a-z0-9]+")
+# AMC for pages that are not in the registry and do not name an AMC (blog, help pages).
+DEFAULT_AMC = "groww"
+
+
+def slugify(value: str) -> str:
+    return _SLUG.sub("-", value.lower().replace("&", "and")).strip("-")
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+
+@dataclass(frozen=True)
+class ExtractionRule:
+    """Appends a section found in the raw HTML when the rendered text lacks it."""
+
+    name: str
+    section: str
+    pattern: Pattern[str]
+    skip_if_text_contains: str = ""
+
+
+@dataclass(frozen=True)
+class SchemeEntry:
+    scheme: str
+    amc: str
+    category: str
+    url: str
+    aliases: Tuple[str, ...] = ()
+    rules: Tuple[str, ...] = ()
+
+    @property
+    def page(self) -> SchemePage:
+        return SchemePage(self.scheme, self.category, self.url)
+
+
+@dataclass
+class SchemeRegistry:
+    amcs: Dict[str, dict]
+    categories: Dict[str, List[str]]
+    rules: Dict[str, ExtractionRule]
+    schemes: List[SchemeEntry]
+    _by_url: Dict[str, SchemeEntry] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        for entry in self.schemes:
+            if entry.amc not in self.amcs:
+                raise ValueError(f"Scheme '{entry.scheme}' uses unknown AMC '{entry.amc}'")
+            missing = [name for name in entry.rules if name not in self.rules]
+            if missing:
+                raise ValueError(f"Scheme '{entry.scheme}' uses unknown rules {missing}")
+            self._by_url[_url_key(entry.url)] = entry
+
+    @classmethod
+    def load(cls, path: Path) -> "SchemeRegistry":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        rules = {
+            name: ExtractionRule(
+                name=name,
+                section=rule["section"],
+                pattern=re.compile(rule["pattern"], re.IGNORECASE | re.DOTALL),
+                skip_if_text_contains=rule.get("skip_if_text_contains", ""),
+            )
+            for name, rule in data.get("extraction_rules", {}).items()
+        }
+        schemes = [
+            SchemeEntry(
+                scheme=item["scheme"],
+                amc=item["amc"],
+                category=item["category"],
+                url=item["url"],
+                aliases=tuple(item.get("aliases", ())),
+                rules=tuple(item.get("rules", ())),
+            )
+            for item in data["schemes"]
+        ]
+        return cls(data["amcs"], data.get("categories", {}), rules, schemes)
+
+    def pages(self) -> List[SchemePage]:
+        return [entry.page for entry in self.schemes]
+
+    def entry_for(self, url: str) -> Optional[SchemeEntry]:
+        return self._by_url.get(_url_key(url))
+
+    def rules_for(self, url: str) -> List[ExtractionRule]:
+        entry = self.entry_for(url)
+        return [self.rules[name] for name in entry.rules] if entry else []
+
+    def amc_for(self, scheme: str, url: str = "") -> str:
+        """The registered AMC of ``url``, else the AMC whose alias starts the scheme name."""
+
+        entry = self.entry_for(url) if url else None
+        if entry:
+            return entry.amc
+        name = f" {' '.join(_SLUG.sub(' ', scheme.lower()).split())} "
+        for key, amc in self.amcs.items():
+            if any(name.startswith(f" {alias} ") for alias in amc.get("aliases", [key])):
+                return key
+        return DEFAULT_AMC
+
+    def shard_for(self, scheme: str, category: str, url: str = "") -> str:
+        entry = self.entry_for(url) if url else None
+        if entry:
+            return f"{entry.amc}.{slugify(entry.category)}"
+        return f"{self.amc_for(scheme, url)}.{slugify(category)}"
+
+    def catalog(self, shards: Iterable[str]) -> List[dict]:
+        """Routing terms for each shard, stored on the version record for the backend."""
+
+        catalog = []
+        for shard in sorted(set(shards)):
+            amc, _, category_slug = shard.partition(".")
+            category = next(
+                (name for name in self.categories if slugify(name) == category_slug),
+                category_slug.replace("-", " "),
+            )
+            terms = {
+                term.lower()
+                for entry in self.schemes
+                if entry.amc == amc and slugify(entry.category) == category_slug
+                for term in (entry.scheme, *entry.aliases)
+            }
+            catalog.append(
+                {
+                    "shard": shard,
+                    "amc": amc,
+                    "category": category,
+                    "amc_terms": self.amcs.get(amc, {}).get("aliases", [amc]),
+                    "category_terms": [category.lower(), *self.categories.get(category, [])],
+                    "scheme_terms": sorted(terms),
+                }
+            )
+        return catalog
+
+
+@lru_cache(maxsize=None)
+def get_registry(path: Optional[Path] = None) -> SchemeRegistry:
+    return SchemeRegistry.load(path or CONFIG.registry.path)
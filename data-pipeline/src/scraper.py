@@ -2,20 +2,20 @@
 
 from __future__ import annotations
 
-import json
+import html as html_lib
 import logging
 import time
-from dataclasses import asdict
-from pathlib import Path
 from typing import Iterable, List, Tuple
 import re
 
 import requests
-from bs4 import BeautifulSoup
 
 from .config import CONFIG
-from .constants import LAST_VERIFIED, SCHEME_URLS
-from .models import SchemePage, ScrapedDocument
+from .constants import LAST_VERIFIED
+from .embedding_cache import content_hash
+from .html_extract import parse_page
+from .models import SchemePage, ScrapedDocument, Section
+from .registry import get_registry
 
 LOGGER = logging.getLogger(__name__)
 
@@ -29,8 +29,7 @@ def _headers() -> dict:
 
 
 def _scheme_entries() -> Iterable[SchemePage]:
-    for entry in SCHEME_URLS:
-        yield SchemePage(**entry)
+    yield from get_registry().pages()
 
 
 def fetch_html(url: str, *, retries: int = 3, backoff: float = 1.5) -> str:
@@ -53,25 +52,16 @@ def fetch_html(url: str, *, retries: int = 3, backoff: float = 1.5) -> str:
 def extract_text_and_links(html: str) -> Tuple[str, List[str]]:
     """Extract visible text and Groww hyperlinks from HTML."""
 
-    soup = BeautifulSoup(html, "html.parser")
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    text = "\n".join(
-        [line.strip() for line in soup.get_text(separator="\n").splitlines() if line.strip()]
-    )
-
-    links: List[str] = []
-    for a_tag in soup.find_all("a", href=True):
-        href = a_tag["href"]
-        if href.startswith("https://groww.in/") and href not in links:
-            links.append(href)
-    return text, links
+    parsed = parse_page(html)
+    return parsed.text, parsed.links
 
 
-def scrape_scheme(page: SchemePage) -> ScrapedDocument:
-    html = fetch_html(page.url)
-    text, links = extract_text_and_links(html)
-    text = _augment_with_dynamic_sections(page, html, text)
+def build_document(page: SchemePage, html: str) -> ScrapedDocument:
+    parsed = parse_page(html, base_url=page.url)
+    text = parsed.text
+    for title, snippet in _dynamic_sections(page, html, text):
+        text = f"{text}\n\n{snippet}"
+        parsed.sections.append(Section(title=title, level=2, lines=[snippet]))
     return ScrapedDocument(
         scheme=page.scheme,
         category=page.category,
@@ -79,40 +69,32 @@ def scrape_scheme(page: SchemePage) -> ScrapedDocument:
         html=html,
         text=text,
         last_verified=LAST_VERIFIED,
-        extra_links=links,
+        extra_links=parsed.links,
+        sections=parsed.sections,
+        content_hash=content_hash(html),
     )
 
 
-def scrape_all() -> List[ScrapedDocument]:
-    documents: List[ScrapedDocument] = []
-    for entry in _scheme_entries():
-        LOGGER.info("Scraping %s", entry.scheme)
-        documents.append(scrape_scheme(entry))
-    return documents
-
+def scrape_scheme(page: SchemePage) -> ScrapedDocument:
+    return build_document(page, fetch_html(page.url))
 
-def _augment_with_dynamic_sections(page: SchemePage, html: str, base_text: str) -> str:
-    if page.scheme != "HDFC Flexi Cap Fund Direct Plan Growth":
-        return base_text
-    snippet = _extract_fund_management_section(html)
-    if not snippet:
-        return base_text
-    if "Fund management" in base_text:
-        return base_text
-    return base_text + "\n\n" + snippet
 
+_TAG_PATTERN = re.compile(r"<[^>]+>")
 
-def _extract_fund_management_section(html: str) -> str:
-    pattern = re.compile(r"Fund management.*?(?:Fund house|Investment objective)", re.IGNORECASE | re.DOTALL)
-    match = pattern.search(html)
-    if not match:
-        return ""
-    soup = BeautifulSoup(match.group(0), "html.parser")
-    text = " ".join(soup.get_text(separator=" ").split())
-    return text
 
+def _dynamic_sections(page: SchemePage, html: str, base_text: str) -> List[Tuple[str, str]]:
+    """Sections recovered by the page's registry extraction rules, as (title, text)."""
 
-def save_raw_documents(docs: Iterable[ScrapedDocument], output_path: Path) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as fp:
-        json.dump([asdict(doc) for doc in docs], fp, ensure_ascii=False, indent=2)
+    sections = []
+    for rule in get_registry().rules_for(page.url):
+        # Only fall back to scanning the raw HTML when the rendered text lacks the section.
+        if rule.skip_if_text_contains and rule.skip_if_text_contains in base_text:
+            continue
+        match = rule.pattern.search(html)
+        if not match:
+            continue
+        # The match is a small fragment; strip tags instead of parsing it again.
+        text = " ".join(html_lib.unescape(_TAG_PATTERN.sub(" ", match.group(0))).split())
+        if text:
+            sections.append((rule.section, text))
+    return sections
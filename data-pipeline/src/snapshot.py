@@ -0,0 +1,225 @@
+"""Content-addressed, compressed snapshots of fetched pages for offline reprocessing.
+
+Layout under ``CONFIG.snapshots.root``::
+
+    objects/ab/ab12...ef.html.zst   page HTML, named by the sha256 of the raw HTML
+    runs/<snapshot_id>.jsonl.zst    one metadata line per page, appended as pages arrive
+    LATEST                          id of the last complete snapshot
+
+A page that did not change between runs is stored once. ``.gz`` files are written when
+``zstandard`` is not installed; readers pick the codec from the file extension.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Iterator, List, Optional
+
+from .config import CONFIG
+from .embedding_cache import content_hash
+from .models import SchemePage, ScrapedDocument
+from .scraper import build_document
+
+try:  # Best-effort zstandard import
+    import zstandard
+except Exception:  # noqa: BLE001
+    zstandard = None
+
+LOGGER = logging.getLogger(__name__)
+
+_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+_MANIFEST_FIELDS = ("scheme", "category", "url", "last_verified")
+
+
+def _resolve_codec(codec: Optional[str] = None) -> str:
+    codec = (codec or CONFIG.snapshots.codec).lower()
+    if codec == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if codec not in _EXTENSIONS:
+        raise ValueError(f"Unknown snapshot codec '{codec}'")
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("SNAPSHOT_CODEC=zstd requires the zstandard package")
+    return codec
+
+
+def _codec_for(path: Path) -> str:
+    return "zstd" if path.suffix == ".zst" else "gzip"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    codec = _codec_for(path)
+    if codec == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    raw = path.open(mode + "b")
+    if mode == "w":
+        stream = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+    else:
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+class SnapshotWriter:
+    """Stores page HTML as content-addressed objects and appends a manifest line per page.
+
+    The manifest is written under a ``.partial`` name and is only renamed (and made
+    ``LATEST``) when the writer closes without an error, so readers never see a
+    half-written snapshot.
+    """
+
+    def __init__(
+        self, snapshot_id: str, *, root: Optional[Path] = None, codec: Optional[str] = None
+    ) -> None:
+        self.snapshot_id = snapshot_id
+        self._root = root or CONFIG.snapshots.root
+        self._codec = _resolve_codec(codec)
+        self._ext = _EXTENSIONS[self._codec]
+        runs = self._root / "runs"
+        runs.mkdir(parents=True, exist_ok=True)
+        self.path = runs / f"{snapshot_id}.jsonl{self._ext}"
+        self._partial = runs / f"{snapshot_id}.partial.jsonl{self._ext}"
+        self._fp = _open_text(self._partial, "w")
+        self.pages = 0
+        self.new_objects = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _object_path(self, digest: str) -> Path:
+        return self._root / "objects" / digest[:2] / f"{digest}.html{self._ext}"
+
+    def write(self, doc: ScrapedDocument) -> str:
+        """Persist one page and return the sha256 of its HTML."""
+
+        data = doc.html.encode("utf-8")
+        digest = doc.content_hash or content_hash(doc.html)
+        target = self._object_path(digest)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            blob = _compress(data, self._codec)
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(blob)
+            tmp.replace(target)
+            self.new_objects += 1
+            self.stored_bytes += len(blob)
+        record = {name: getattr(doc, name) for name in _MANIFEST_FIELDS}
+        record["content_hash"] = digest
+        record["fetched_at"] = datetime.now(timezone.utc).isoformat()
+        self._fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fp.flush()
+        self.pages += 1
+        self.raw_bytes += len(data)
+        return digest
+
+    def close(self, *, complete: bool = True) -> None:
+        self._fp.close()
+        if not complete:
+            self._partial.unlink(missing_ok=True)
+            return
+        self._partial.replace(self.path)
+        (self._root / "LATEST").write_text(self.snapshot_id, encoding="utf-8")
+        LOGGER.info(
+            "Snapshot %s: %s pages, %s new objects, %.1f MiB HTML stored as %.1f MiB (%s)",
+            self.snapshot_id,
+            self.pages,
+            self.new_objects,
+            self.raw_bytes / 2**20,
+            self.stored_bytes / 2**20,
+            self._codec,
+        )
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:  # noqa: ANN001, ANN002
+        self.close(complete=exc_type is None)
+
+
+def _read_object(objects: Path, digest: str) -> Optional[str]:
+    for ext in _EXTENSIONS.values():
+        path = objects / digest[:2] / f"{digest}.html{ext}"
+        if path.exists():
+            return _decompress(path.read_bytes(), _codec_for(path)).decode("utf-8")
+    return None
+
+
+def read_object(digest: str, *, root: Optional[Path] = None) -> Optional[str]:
+    """Return the stored HTML with sha256 ``digest``, or ``None`` if it was never stored."""
+
+    return _read_object((root or CONFIG.snapshots.root) / "objects", digest)
+
+
+def resolve_manifest(ref: str = "latest", *, root: Optional[Path] = None) -> Path:
+    """Map ``latest``, a snapshot id or a manifest path to the manifest file."""
+
+    root = root or CONFIG.snapshots.root
+    candidate = Path(ref)
+    if candidate.is_file():
+        return candidate
+    if candidate.is_dir():
+        root, ref = candidate, "latest"
+    if ref == "latest":
+        pointer = root / "LATEST"
+        if not pointer.exists():
+            raise FileNotFoundError(f"No complete snapshot under {root}")
+        ref = pointer.read_text(encoding="utf-8").strip()
+    for ext in _EXTENSIONS.values():
+        path = root / "runs" / f"{ref}.jsonl{ext}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"Snapshot '{ref}' not found under {root}")
+
+
+def iter_snapshot_records(ref: str = "latest", *, root: Optional[Path] = None) -> Iterator[dict]:
+    """Stream manifest records with their HTML attached, one page at a time."""
+
+    manifest = resolve_manifest(ref, root=root)
+    # Objects live next to the runs/ directory that holds the manifest.
+    objects = manifest.parent.parent / "objects"
+    with _open_text(manifest, "r") as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            html = _read_object(objects, record["content_hash"])
+            if html is None:
+                raise FileNotFoundError(
+                    f"Snapshot object {record['content_hash']} for {record['url']} is missing"
+                )
+            record["html"] = html
+            yield record
+
+
+def iter_snapshot_documents(
+    ref: str = "latest", *, root: Optional[Path] = None
+) -> Iterator[ScrapedDocument]:
+    """Rebuild documents from a stored snapshot without touching the network."""
+
+    for record in iter_snapshot_records(ref, root=root):
+        page = SchemePage(record["scheme"], record["category"], record["url"])
+        doc = build_document(page, record["html"])
+        doc.last_verified = record["last_verified"]
+        yield doc
+
+
+def load_raw_pages(path: Path) -> List[dict]:
+    """Load pages from a snapshot (directory or manifest) or a legacy raw_documents.json."""
+
+    if path.is_dir() or ".jsonl" in path.name:
+        return list(iter_snapshot_records(str(path)))
+    return json.loads(path.read_text(encoding="utf-8"))
@@ -3,71 +3,319 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable, List
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from pymongo import MongoClient
+from bson import Binary
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
 
 from .config import CONFIG
-from .models import Chunk, ScrapedDocument
+from .models import BankEntry, Chunk, ScrapedDocument
 
 LOGGER = logging.getLogger(__name__)
 
+# Document in the versions collection that holds the live corpus version; the backend
+# reads the same id, so flipping it is a single atomic write.
+ACTIVE_POINTER_ID = "active"
+
+
+@dataclass
+class WriteStats:
+    """Aggregate counters for one bulk upsert call."""
+
+    operations: int = 0
+    batches: int = 0
+    upserted: int = 0
+    modified: int = 0
+    seconds: float = 0.0
+    upserted_ids: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+
+def _batched(operations: Iterable[UpdateOne], size: int) -> Iterator[List[UpdateOne]]:
+    batch: List[UpdateOne] = []
+    for op in operations:
+        batch.append(op)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
 class MongoStore:
     """Thin wrapper around MongoDB collections used by the pipeline."""
 
-    def __init__(self) -> None:
+    def __init__(self, *, batch_size: Optional[int] = None) -> None:
         self._client = MongoClient(CONFIG.mongo.uri)
         self._db = self._client[CONFIG.mongo.db_name]
         self._documents = self._db[CONFIG.mongo.documents_collection]
         self._chunks = self._db[CONFIG.mongo.chunks_collection]
+        self._versions = self._db[CONFIG.mongo.versions_collection]
+        self._questions = self._db[CONFIG.mongo.questions_collection]
+        self._batch_size = max(1, batch_size or CONFIG.mongo.write_batch_size)
+        self.last_stats: Optional[WriteStats] = None
+
+    def ensure_indexes(self) -> None:
+        """Create the lookup indexes used by the pipeline upserts and backend reads.
+
+        Safe to call on every run: ``create_index`` is a no-op for an identical existing
+        index, and a non-unique ``url_1`` left by older deployments is migrated by
+        :meth:`_ensure_unique_url_index`.
+        """
 
-    def upsert_documents(self, documents: Iterable[ScrapedDocument]) -> None:
-        for doc in documents:
-            LOGGER.info("Upserting raw document for %s", doc.scheme)
-            self._documents.update_one(
+        self._ensure_unique_url_index()
+        self._chunks.create_index([("chunk_id", ASCENDING)], name="chunk_id_1")
+        self._chunks.create_index(
+            [("url", ASCENDING), ("section", ASCENDING)], name="url_1_section_1"
+        )
+        self._chunks.create_index(
+            [("corpus_version", ASCENDING), ("chunk_id", ASCENDING)],
+            name="corpus_version_1_chunk_id_1",
+        )
+        self._questions.create_index(
+            [("corpus_version", ASCENDING), ("entry_id", ASCENDING)],
+            name="corpus_version_1_entry_id_1",
+            unique=True,
+        )
+
+    def _ensure_unique_url_index(self) -> None:
+        """Make ``documents.url`` unique, removing duplicate pages and old indexes first.
+
+        For each duplicated URL the most recently verified document is kept. Any other
+        index on ``url`` alone that is not unique (such as a plain ``url_1``) is dropped,
+        since MongoDB refuses to create a second index with the same key or name.
+        """
+
+        existing = self._documents.index_information()
+        url_indexes = {
+            name: info for name, info in existing.items() if info.get("key") == [("url", 1)]
+        }
+        if any(info.get("unique") for info in url_indexes.values()):
+            return
+        removed = self._dedupe_documents_by_url()
+        for name in url_indexes:
+            LOGGER.warning("Replacing non-unique index %s on documents.url", name)
+            self._documents.drop_index(name)
+        try:
+            self._documents.create_index([("url", ASCENDING)], name="url_1", unique=True)
+        except OperationFailure as exc:
+            # A writer inserted a duplicate between the cleanup and the index build.
+            raise RuntimeError(
+                "Could not create the unique url_1 index on "
+                f"{CONFIG.mongo.documents_collection}: {exc}. Remove duplicate URLs and "
+                "run the pipeline again."
+            ) from exc
+        if removed:
+            LOGGER.info("Removed %s duplicate documents before indexing url", removed)
+
+    def _dedupe_documents_by_url(self) -> int:
+        duplicates = self._documents.aggregate(
+            [
+                {"$sort": {"last_verified": -1, "_id": -1}},
+                {"$group": {"_id": "$url", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+            ],
+            allowDiskUse=True,
+        )
+        stale = [doc_id for group in duplicates for doc_id in group["ids"][1:]]
+        if not stale:
+            return 0
+        return self._documents.delete_many({"_id": {"$in": stale}}).deleted_count
+
+    def _bulk_upsert(
+        self, collection: Collection, operations: Iterable[UpdateOne], label: str
+    ) -> WriteStats:
+        stats = WriteStats()
+        started = time.perf_counter()
+        for batch in _batched(operations, self._batch_size):
+            result = collection.bulk_write(batch, ordered=False)
+            for offset, upserted_id in result.upserted_ids.items():
+                stats.upserted_ids[stats.operations + offset] = str(upserted_id)
+            stats.operations += len(batch)
+            stats.batches += 1
+            stats.upserted += result.upserted_count
+            stats.modified += result.modified_count
+        stats.seconds = time.perf_counter() - started
+        LOGGER.info(
+            "Upserted %s %s in %s batches (%s new, %s modified) in %.2fs (%.0f ops/s)",
+            stats.operations,
+            label,
+            stats.batches,
+            stats.upserted,
+            stats.modified,
+            stats.seconds,
+            stats.ops_per_second,
+        )
+        self.last_stats = stats
+        return stats
+
+    def upsert_documents(
+        self, documents: Iterable[ScrapedDocument], *, snapshot: Optional[str] = None
+    ) -> WriteStats:
+        # Raw HTML lives in the snapshot store; Mongo keeps only its content hash.
+        operations = (
+            UpdateOne(
                 {"url": doc.url},
                 {
                     "$set": {
                         "scheme": doc.scheme,
                         "category": doc.category,
                         "url": doc.url,
-                        "html": doc.html,
                         "text": doc.text,
+                        "content_hash": doc.content_hash,
+                        "snapshot": snapshot,
                         "last_verified": doc.last_verified,
                         "extra_links": doc.extra_links,
-                    }
+                    },
+                    "$unset": {"html": ""},
                 },
                 upsert=True,
             )
+            for doc in documents
+        )
+        return self._bulk_upsert(self._documents, operations, "documents")
+
+    def upsert_chunks(
+        self, chunks: Iterable[Chunk], *, version: Optional[str] = None
+    ) -> List[str]:
+        chunk_ids: List[Optional[str]] = []
 
-    def upsert_chunks(self, chunks: Iterable[Chunk]) -> List[str]:
+        def _operations() -> Iterator[UpdateOne]:
+            for chunk in chunks:
+                payload = {
+                    "chunk_id": chunk.chunk_id,
+                    "scheme": chunk.scheme,
+                    "category": chunk.category,
+                    "url": chunk.url,
+                    "section": chunk.section,
+                    "content": chunk.content,
+                    "last_verified": chunk.last_verified,
+                    "metadata": chunk.metadata,
+                }
+                filter_query = {"chunk_id": chunk.chunk_id} if chunk.chunk_id else {
+                    "url": chunk.url,
+                    "section": chunk.section,
+                }
+                if version:
+                    payload["corpus_version"] = version
+                    filter_query["corpus_version"] = version
+                chunk_ids.append(chunk.chunk_id)
+                yield UpdateOne(filter_query, {"$set": payload}, upsert=True)
+
+        stats = self._bulk_upsert(self._chunks, _operations(), "chunks")
         inserted_ids: List[str] = []
-        for chunk in chunks:
-            payload = {
-                "chunk_id": chunk.chunk_id,
-                "scheme": chunk.scheme,
-                "category": chunk.category,
-                "url": chunk.url,
-                "section": chunk.section,
-                "content": chunk.content,
-                "last_verified": chunk.last_verified,
-                "metadata": chunk.metadata,
-            }
-            filter_query = {"chunk_id": chunk.chunk_id} if chunk.chunk_id else {
-                "url": chunk.url,
-                "section": chunk.section,
-            }
-            result = self._chunks.update_one(
-                filter_query,
-                {"$set": payload},
-                upsert=True,
-            )
-            if chunk.chunk_id:
-                inserted_ids.append(chunk.chunk_id)
-            elif result.upserted_id:
-                inserted_ids.append(str(result.upserted_id))
+        for position, chunk_id in enumerate(chunk_ids):
+            if chunk_id:
+                inserted_ids.append(chunk_id)
+            elif position in stats.upserted_ids:
+                inserted_ids.append(stats.upserted_ids[position])
         return inserted_ids
 
+    def upsert_questions(
+        self, entries: Iterable[Tuple[BankEntry, Sequence[float]]], *, version: str
+    ) -> WriteStats:
+        """Store question bank entries of ``version`` with their question embeddings.
+
+        Vectors are packed as float32 bytes; the backend loads a version's bank into one
+        matrix when it switches to that version.
+        """
+
+        def _operations() -> Iterator[UpdateOne]:
+            for entry, vector in entries:
+                payload = {
+                    "entry_id": entry.entry_id,
+                    "question": entry.question,
+                    "answer": entry.answer,
+                    "chunk_id": entry.chunk_id,
+                    "scheme": entry.scheme,
+                    "category": entry.category,
+                    "url": entry.url,
+                    "section": entry.section,
+                    "last_verified": entry.last_verified,
+                    "corpus_version": version,
+                    "embedding": Binary(array("f", vector).tobytes()),
+                }
+                yield UpdateOne(
+                    {"corpus_version": version, "entry_id": entry.entry_id},
+                    {"$set": payload},
+                    upsert=True,
+                )
+
+        return self._bulk_upsert(self._questions, _operations(), "question bank entries")
+
+    def begin_version(
+        self,
+        version: str,
+        *,
+        embedding_model: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+    ) -> None:
+        """Register a version being built; the embedding fields let readers check they
+        embed queries with the same model.
+
+        A resumed build keeps its original ``created_at``, which orders versions for
+        garbage collection.
+        """
+
+        self._versions.update_one(
+            {"_id": version},
+            {
+                "$set": {
+                    "status": "building",
+                    "embedding_model": embedding_model,
+                    "embedding_dimensions": embedding_dimensions,
+                },
+                "$setOnInsert": {"created_at": datetime.now(timezone.utc).isoformat()},
+            },
+            upsert=True,
+        )
+
+    def active_version(self) -> Optional[str]:
+        pointer = self._versions.find_one({"_id": ACTIVE_POINTER_ID})
+        return pointer.get("version") if pointer else None
+
+    def set_shards(self, version: str, shards: List[dict]) -> None:
+        """Record the shard catalog (namespace and routing terms) readers route queries with."""
+
+        self._versions.update_one({"_id": version}, {"$set": {"shards": shards}})
+
+    def activate_version(self, version: str) -> Optional[str]:
+        """Point readers at ``version`` and return the version it replaced."""
+
+        now = datetime.now(timezone.utc).isoformat()
+        previous = self._versions.find_one_and_update(
+            {"_id": ACTIVE_POINTER_ID},
+            {"$set": {"version": version, "activated_at": now}},
+            upsert=True,
+        )
+        previous_version = previous.get("version") if previous else None
+        self._versions.update_one(
+            {"_id": version}, {"$set": {"status": "active", "activated_at": now}}
+        )
+        if previous_version and previous_version != version:
+            self._versions.update_one({"_id": previous_version}, {"$set": {"status": "retired"}})
+        return previous_version
+
+    def list_versions(self) -> List[dict]:
+        """Return version records, newest first (the active pointer is excluded)."""
+
+        cursor = self._versions.find({"_id": {"$ne": ACTIVE_POINTER_ID}}).sort("created_at", -1)
+        return list(cursor)
+
+    def drop_version(self, version: str) -> int:
+        result = self._chunks.delete_many({"corpus_version": version})
+        self._questions.delete_many({"corpus_version": version})
+        self._versions.delete_one({"_id": version})
+        return result.deleted_count
+
     def close(self) -> None:
         self._client.close()
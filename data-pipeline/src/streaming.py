@@ -0,0 +1,151 @@
+"""Thread-per-stage streaming runner connected by bounded queues."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+_DONE = object()
+
+Transform = Callable[[Iterator[Any]], Iterable[Any]]
+
+
+@dataclass(slots=True)
+class StageStats:
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    seconds: float = 0.0
+    # Time blocked on an empty inbox or a full outbox.
+    waited: float = 0.0
+
+    @property
+    def busy_seconds(self) -> float:
+        return max(0.0, self.seconds - self.waited)
+
+    @property
+    def throughput(self) -> float:
+        items = self.items_out or self.items_in
+        return items / self.seconds if self.seconds else 0.0
+
+
+class _Aborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StreamingPipeline:
+    """Runs generator transforms concurrently, each stage on its own thread.
+
+    Stage ``n`` receives an iterator over the items produced by stage ``n - 1`` (the first
+    stage receives an empty iterator). Queues between stages are bounded, so a fast producer
+    blocks instead of buffering the whole corpus.
+    """
+
+    def __init__(self, *, queue_size: int = 8) -> None:
+        self._queue_size = queue_size
+        self._stages: List[Tuple[str, Transform]] = []
+        self._abort = threading.Event()
+
+    def add_stage(self, name: str, transform: Transform) -> "StreamingPipeline":
+        self._stages.append((name, transform))
+        return self
+
+    def _put(self, outbox: "queue.Queue[Any]", item: Any, stats: StageStats) -> None:
+        started = time.perf_counter()
+        try:
+            while True:
+                if self._abort.is_set():
+                    raise _Aborted
+                try:
+                    outbox.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            stats.waited += time.perf_counter() - started
+
+    def _drain(self, inbox: Optional["queue.Queue[Any]"], stats: StageStats) -> Iterator[Any]:
+        if inbox is None:
+            return
+        while True:
+            started = time.perf_counter()
+            try:
+                item = inbox.get(timeout=0.1)
+            except queue.Empty:
+                if self._abort.is_set():
+                    raise _Aborted from None
+                continue
+            finally:
+                stats.waited += time.perf_counter() - started
+            if item is _DONE:
+                return
+            stats.items_in += 1
+            yield item
+
+    def run(self) -> List[StageStats]:
+        self._abort.clear()
+        queues: List["queue.Queue[Any]"] = [
+            queue.Queue(maxsize=self._queue_size) for _ in self._stages[1:]
+        ]
+        stats = [StageStats(name=name) for name, _ in self._stages]
+        errors: List[BaseException] = []
+
+        def _worker(index: int) -> None:
+            _, transform = self._stages[index]
+            stage_stats = stats[index]
+            inbox = queues[index - 1] if index > 0 else None
+            outbox = queues[index] if index < len(queues) else None
+            started = time.perf_counter()
+            try:
+                for item in transform(self._drain(inbox, stage_stats)):
+                    stage_stats.items_out += 1
+                    if outbox is not None:
+                        self._put(outbox, item, stage_stats)
+                if outbox is not None:
+                    self._put(outbox, _DONE, stage_stats)
+            except _Aborted:
+                pass
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+                self._abort.set()
+            finally:
+                stage_stats.seconds = time.perf_counter() - started
+
+        threads = [
+            threading.Thread(target=_worker, args=(idx,), name=f"stage-{name}", daemon=True)
+            for idx, (name, _) in enumerate(self._stages)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for stage_stats in stats:
+            LOGGER.info(
+                "Stage %-8s %6s in / %6s out in %7.2fs, %7.2fs busy (%.1f items/s)",
+                stage_stats.name,
+                stage_stats.items_in,
+                stage_stats.items_out,
+                stage_stats.seconds,
+                stage_stats.busy_seconds,
+                stage_stats.throughput,
+            )
+        if errors:
+            raise errors[0]
+        return stats
@@ -0,0 +1,62 @@
+"""Model-token counting for chunk sizing and embedding budgets."""
+
+from __future__ import annotations
+
+import logging
+import re
+from functools import lru_cache
+from typing import List
+
+try:  # Best-effort tiktoken import
+    import tiktoken
+except Exception:  # noqa: BLE001
+    tiktoken = None
+
+LOGGER = logging.getLogger(__name__)
+
+# Word pieces and individual punctuation marks; within ~10-15% of cl100k counts on
+# English prose, which is close enough for sizing when tiktoken is unavailable.
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+class Tokenizer:
+    """Counts and splits text in embedding-model tokens (``cl100k_base`` by default)."""
+
+    def __init__(self, encoding_name: str = "cl100k_base") -> None:
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.warning("tiktoken encoding unavailable, approximating tokens: %s", exc)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(_APPROX_TOKEN.findall(text))
+
+    def split(self, text: str, size: int) -> List[str]:
+        """Split ``text`` into consecutive pieces of at most ``size`` tokens."""
+
+        size = max(1, size)
+        if self._encoding is not None:
+            ids = self._encoding.encode(text, disallowed_special=())
+            return [
+                self._encoding.decode(ids[start : start + size]).strip()
+                for start in range(0, len(ids), size)
+            ]
+        spans = [match.span() for match in _APPROX_TOKEN.finditer(text)]
+        pieces = []
+        for start in range(0, len(spans), size):
+            window = spans[start : start + size]
+            pieces.append(text[window[0][0] : window[-1][1]])
+        return pieces
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding_name: str = "cl100k_base") -> Tokenizer:
+    return Tokenizer(encoding_name)
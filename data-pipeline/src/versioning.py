@@ -0,0 +1,86 @@
+"""Blue/green corpus versions: each run writes a fresh version, then flips the pointer."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from .checkpoint import RunCheckpoint
+from .config import CONFIG
+from .pinecone_loader import PineconeLoader
+from .storage import MongoStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+def new_version_id() -> str:
+    """Return a sortable version id that is also a valid Pinecone namespace."""
+
+    return datetime.now(timezone.utc).strftime("v%Y%m%dT%H%M%S%fZ")
+
+
+def shard_namespace(version: str, shard: Optional[str]) -> str:
+    """Pinecone namespace holding ``shard`` (see :mod:`.registry`) of a corpus version."""
+
+    return f"{version}.{shard}" if shard else version
+
+
+def _age_hours(record: dict, now: datetime) -> float:
+    try:
+        created = datetime.fromisoformat(record["created_at"])
+    except (KeyError, TypeError, ValueError):
+        # Without a creation time the version cannot be shown to be abandoned.
+        return 0.0
+    return (now - created).total_seconds() / 3600
+
+
+def _unfinished_build_kept(record: dict, runs_dir: Optional[Path], now: datetime) -> bool:
+    """Whether a ``building`` version may still be in progress or resumed."""
+
+    manifest = RunCheckpoint.peek(runs_dir, record["_id"]) if runs_dir else None
+    resumable = manifest is not None and manifest.get("status") != "complete"
+    limit = (
+        CONFIG.versioning.resumable_build_hours
+        if resumable
+        else CONFIG.versioning.stale_build_hours
+    )
+    return _age_hours(record, now) < limit
+
+
+def garbage_collect(
+    store: MongoStore,
+    loader: PineconeLoader,
+    *,
+    keep: int,
+    runs_dir: Optional[Path] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Drop all but the ``keep`` newest finished versions, never touching the active one.
+
+    Unfinished versions do not count towards ``keep`` and are only dropped once abandoned:
+    older than ``CORPUS_STALE_BUILD_HOURS``, or ``CORPUS_RESUMABLE_BUILD_HOURS`` when
+    ``runs_dir`` holds a failed or interrupted checkpoint of the run.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    active = store.active_version()
+    survivors = 1 if active else 0
+    dropped: List[str] = []
+    for record in store.list_versions():
+        version = record["_id"]
+        if version == active:
+            continue
+        if record.get("status") == "building":
+            if _unfinished_build_kept(record, runs_dir, now):
+                LOGGER.info("Keeping unfinished corpus version %s", version)
+                continue
+        elif survivors < keep:
+            survivors += 1
+            continue
+        loader.delete_version(version)
+        removed = store.drop_version(version)
+        LOGGER.info("Garbage-collected corpus version %s (%s chunks)", version, removed)
+        dropped.append(version)
+    return dropped
@@ -0,0 +1,10 @@
+"""Make the pipeline's ``src`` package importable when pytest runs from the repo root."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+PIPELINE_ROOT = Path(__file__).resolve().parents[1]
+if str(PIPELINE_ROOT) not in sys.path:
+    sys.path.insert(0, str(PIPELINE_ROOT))
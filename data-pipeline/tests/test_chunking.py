@@ -0,0 +1,87 @@
+"""Tests for heading-aware, token-sized chunking."""
+
+from __future__ import annotations
+
+from src.doc_processing import build_chunks, chunk_sections
+from src.models import ScrapedDocument, Section
+from src.tokens import get_tokenizer
+
+SCHEME = "HDFC Small Cap Fund Direct Growth"
+
+
+def _lines(count: int) -> list:
+    return [f"Holding {n}: the fund held stock {n} in sector {n % 7}." for n in range(count)]
+
+
+def test_long_section_is_cut_into_overlapping_windows_within_the_token_budget():
+    tokenizer = get_tokenizer()
+    lines = _lines(30)
+    chunks = chunk_sections(
+        [Section(title="Holdings", level=2, lines=lines)],
+        target_tokens=80,
+        overlap_tokens=20,
+        min_tokens=10,
+        tokenizer=tokenizer,
+        context=SCHEME,
+    )
+
+    assert len(chunks) > 2
+    windows = []
+    for chunk in chunks:
+        context, heading, *body = chunk.content.splitlines()
+        assert (context, heading, chunk.section) == (SCHEME, "Holdings", "Holdings")
+        assert chunk.tokens == sum(tokenizer.count(line) for line in chunk.content.splitlines())
+        assert chunk.tokens <= 80
+        windows.append(body)
+    for previous, current in zip(windows, windows[1:]):
+        repeated = [line for line in current if line in previous]
+        # Consecutive windows share a tail of lines no longer than the overlap.
+        assert repeated and repeated == previous[-len(repeated) :] == current[: len(repeated)]
+        assert sum(tokenizer.count(line) for line in repeated) <= 20
+    assert [line for line in lines if not any(line in body for body in windows)] == []
+
+
+def test_heading_only_section_merges_forward_and_never_stands_alone():
+    sections = [
+        Section(title="Fund house", level=2, lines=[]),
+        Section(title="Fund manager", level=2, lines=["Chirag Setalvad since Jun 2014."]),
+        Section(title="Riskometer", level=2, lines=[]),
+    ]
+    chunks = chunk_sections(sections, target_tokens=200, min_tokens=40, context=SCHEME)
+
+    assert [chunk.section for chunk in chunks] == ["Fund house / Fund manager / Riskometer"]
+    assert chunks[0].content.splitlines() == [
+        SCHEME,
+        "Fund house",
+        "Fund manager",
+        "Chirag Setalvad since Jun 2014.",
+        "Riskometer",
+    ]
+    assert chunk_sections(sections[2:], target_tokens=200, min_tokens=40, context=SCHEME) == []
+
+
+def test_build_chunks_prefixes_the_scheme_and_numbers_ids_by_section():
+    html = (
+        f"<html><body><h1>{SCHEME}</h1>"
+        "<h2>Exit load</h2><p>Exit load of 1% if redeemed within 1 year.</p>"
+        f"<h2>Holdings</h2>{''.join(f'<p>{line}</p>' for line in _lines(40))}"
+        "</body></html>"
+    )
+    doc = ScrapedDocument(
+        scheme=SCHEME,
+        category="Small Cap",
+        url="https://groww.in/mutual-funds/hdfc-small-cap-fund-direct-growth",
+        html=html,
+        text="",
+        last_verified="2024-01-01",
+    )
+    chunks = build_chunks(doc, target_tokens=120)
+
+    assert len(chunks) > 2
+    assert all(chunk.content.splitlines()[0] == SCHEME for chunk in chunks)
+    assert [chunk.chunk_id for chunk in chunks] == [
+        f"{doc.url}#section-{n}" for n in range(1, len(chunks) + 1)
+    ]
+    assert [chunk.metadata["position"] for chunk in chunks] == [
+        str(n) for n in range(1, len(chunks) + 1)
+    ]
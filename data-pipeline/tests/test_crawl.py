@@ -0,0 +1,131 @@
+"""Tests for the crawler against a local HTTP server."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.crawl import Crawler, FrontierState
+from src.models import SchemePage
+from src.snapshot import SnapshotWriter
+
+# path -> linked paths; /mutual-funds/private is disallowed by robots.txt.
+SITE = {
+    "/mutual-funds/seed-fund": ["/mutual-funds/a", "/mutual-funds/b", "/mutual-funds/private"],
+    "/mutual-funds/a": ["/mutual-funds/c", "/mutual-funds/seed-fund", "/stocks/ignored"],
+    "/mutual-funds/b": ["/mutual-funds/d"],
+    "/mutual-funds/c": ["/mutual-funds/e"],
+    "/mutual-funds/d": [],
+    "/mutual-funds/e": [],
+    "/mutual-funds/private": [],
+}
+ROBOTS = "User-agent: *\nDisallow: /mutual-funds/private\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits: Counter = Counter()
+
+    def do_GET(self) -> None:  # noqa: N802
+        type(self).hits[self.path] += 1
+        if self.path == "/robots.txt":
+            body = ROBOTS
+        elif self.path in SITE:
+            links = "".join(f'<a href="{link}">{link}</a>' for link in SITE[self.path])
+            body = f"<html><body><h1>{self.path}</h1><p>Exit load 1%.</p>{links}</body></html>"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:  # noqa: ANN002
+        return None
+
+
+@pytest.fixture
+def site():  # noqa: ANN201
+    _Handler.hits = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", _Handler.hits
+    server.shutdown()
+    server.server_close()
+
+
+def _crawler(base, tmp_path, **overrides):  # noqa: ANN001, ANN003, ANN202
+    options = dict(
+        max_depth=3,
+        max_pages=50,
+        workers=2,
+        host_rps=0,
+        allow_patterns=[r"^/mutual-funds/[\w-]+$"],
+        respect_robots=True,
+        state_path=tmp_path / "crawl_state.sqlite3",
+        snapshot_root=tmp_path / "snapshots",
+    )
+    options.update(overrides)
+    seeds = [SchemePage("Seed Fund", "Equity", f"{base}/mutual-funds/seed-fund")]
+    return Crawler(seeds, **options)
+
+
+def _paths(docs, base):  # noqa: ANN001, ANN202
+    return sorted(doc.url[len(base):] for doc in docs)
+
+
+def test_crawl_follows_allowed_links_and_respects_robots(site, tmp_path):
+    base, hits = site
+    crawler = _crawler(base, tmp_path)
+    docs = list(crawler.crawl("c1"))
+
+    assert _paths(docs, base) == sorted(set(SITE) - {"/mutual-funds/private"})
+    assert hits["/mutual-funds/private"] == 0 and hits["/stocks/ignored"] == 0
+    assert hits["/robots.txt"] == 1
+    assert crawler.blocked == 1
+    assert all(count == 1 for path, count in hits.items() if path in SITE)
+
+
+def test_crawl_stops_at_max_depth_and_max_pages(site, tmp_path):
+    base, _ = site
+    shallow = list(_crawler(base, tmp_path / "depth", max_depth=1).crawl("c1"))
+    assert _paths(shallow, base) == [
+        "/mutual-funds/a",
+        "/mutual-funds/b",
+        "/mutual-funds/seed-fund",
+    ]
+
+    capped = list(_crawler(base, tmp_path / "pages", max_pages=2).crawl("c1"))
+    assert len(capped) == 2
+
+
+def test_interrupted_crawl_resumes_without_refetching(site, tmp_path):
+    base, hits = site
+    crawl = _crawler(base, tmp_path, workers=1).crawl("c1")
+    first = []
+    with SnapshotWriter("c1", root=tmp_path / "snapshots") as writer:
+        for doc in crawl:
+            writer.write(doc)
+            first.append(doc)
+            if len(first) == 3:
+                break
+    crawl.close()
+    fetched_before = sum(hits[path] for path in SITE)
+
+    resumed = list(_crawler(base, tmp_path, workers=1).crawl("c2"))
+
+    assert _paths(resumed, base) == sorted(set(SITE) - {"/mutual-funds/private"})
+    # Pages stored before the interruption come back from the snapshot store.
+    assert all(hits[doc.url[len(base):]] == 1 for doc in first)
+    assert sum(hits[path] for path in SITE) - fetched_before == len(resumed) - len(first)
+    state = FrontierState(tmp_path / "crawl_state.sqlite3")
+    try:
+        assert not state.entries("c1", "queued")
+    finally:
+        state.close()
@@ -0,0 +1,118 @@
+"""Tests for boilerplate stripping and near-duplicate chunk elimination."""
+
+from __future__ import annotations
+
+import random
+
+from src.dedup import ChunkDeduplicator
+from src.models import Chunk, ScrapedDocument
+
+NAV = "Home Stocks Mutual Funds F&O Upcoming IPOs Groww Digest Calculators Login/Register"
+EXIT_LOAD = "Exit load of 1% if redeemed within 1 year of the date of allotment."
+
+
+def _words(seed: int, count: int) -> str:
+    rnd = random.Random(seed)
+    return " ".join(f"term{rnd.randint(0, 5000)}" for _ in range(count))
+
+
+def _chunk(url: str, content: str, number: int = 1) -> Chunk:
+    return Chunk(
+        scheme="Example Fund",
+        category="Equity",
+        url=url,
+        section="Overview",
+        content=content,
+        last_verified="2024-01-01",
+        chunk_id=f"{url}#section-{number}",
+    )
+
+
+def _doc(url: str) -> ScrapedDocument:
+    return ScrapedDocument(
+        scheme="Example Fund",
+        category="Equity",
+        url=url,
+        html="",
+        text="",
+        last_verified="2024-01-01",
+    )
+
+
+def _contents(results) -> list:  # noqa: ANN001
+    return [[chunk.content for chunk in chunks] for _, chunks in results]
+
+
+def test_exact_duplicate_is_dropped():
+    body = _words(1, 120)
+    deduper = ChunkDeduplicator(min_docs=3)
+    chunks = [_chunk("https://a", f"Fund A\n{body}", 1), _chunk("https://a", f"Fund A\n{body}", 2)]
+    results = list(deduper.process([(_doc("https://a"), chunks)]))
+
+    assert _contents(results) == [[f"Fund A\n{body}"]]
+    assert deduper.stats.dropped_near_duplicate == 1
+
+
+def test_near_duplicate_is_dropped_across_pages_and_distinct_text_kept():
+    body = _words(2, 240).split()
+    edited = " ".join(body[:-1] + ["changed"])
+    other = _words(3, 240)
+    deduper = ChunkDeduplicator(min_docs=3)
+    results = list(
+        deduper.process(
+            [
+                (_doc("https://a"), [_chunk("https://a", "Fund A\n" + " ".join(body))]),
+                (_doc("https://b"), [_chunk("https://b", f"Fund B\n{edited}")]),
+                (_doc("https://c"), [_chunk("https://c", f"Fund C\n{other}")]),
+            ]
+        )
+    )
+
+    assert [len(chunks) for _, chunks in results] == [1, 0, 1]
+    assert deduper.stats.dropped_near_duplicate == 1
+
+
+def test_short_cross_page_duplicate_is_kept():
+    deduper = ChunkDeduplicator(min_docs=3)
+    results = list(
+        deduper.process(
+            [
+                (_doc(url), [_chunk(url, f"{url}\nExit load\n{EXIT_LOAD}")])
+                for url in ("https://a", "https://b")
+            ]
+        )
+    )
+    assert [len(chunks) for _, chunks in results] == [1, 1]
+
+
+def test_warmup_documents_are_held_back_then_emitted_in_order():
+    pulled = []
+
+    def _items():  # noqa: ANN202
+        for url in ("https://a", "https://b"):
+            pulled.append(url)
+            yield _doc(url), [_chunk(url, f"{url}\n{_words(len(pulled), 20)}")]
+
+    results = ChunkDeduplicator(min_docs=3).process(_items())
+    first = next(results)
+    # Nothing comes out until the input is drained, then the held documents are flushed.
+    assert pulled == ["https://a", "https://b"]
+    assert [first[0].url] + [doc.url for doc, _ in results] == ["https://a", "https://b"]
+
+
+def test_shared_nav_line_is_stripped_but_a_shared_fact_line_survives():
+    urls = [f"https://fund/{n}" for n in range(4)]
+    deduper = ChunkDeduplicator(min_docs=3, min_fraction=0.8)
+    results = list(
+        deduper.process(
+            [
+                (_doc(url), [_chunk(url, f"Fund {n}\n{NAV}\nExit load\n{EXIT_LOAD}\n{url} only")])
+                for n, url in enumerate(urls)
+            ]
+        )
+    )
+
+    for n, (_, chunks) in enumerate(results):
+        assert chunks[0].content == f"Fund {n}\nExit load\n{EXIT_LOAD}\n{urls[n]} only"
+    assert deduper.stats.boilerplate_lines_removed == 4
+    assert len(deduper.boilerplate_fingerprints()) == 1
@@ -0,0 +1,64 @@
+"""Tests for chunking documents in the worker process pool."""
+
+from __future__ import annotations
+
+import threading
+
+from src import doc_processing
+from src.doc_processing import build_chunks, iter_document_chunks
+from src.models import ScrapedDocument
+
+HTML = """<html><body><h1>{scheme}</h1>
+<h2>Exit load</h2><p>Exit load of 1% if redeemed within 1 year.</p>
+<h2>Expense ratio</h2><p>The expense ratio is 0.{n}% for the direct plan.</p>
+</body></html>"""
+
+
+def _docs(count: int):  # noqa: ANN202
+    docs = []
+    for n in range(count):
+        scheme = f"Example Fund {n}"
+        html = HTML.format(scheme=scheme, n=n)
+        docs.append(
+            ScrapedDocument(
+                scheme=scheme,
+                category="Equity",
+                url=f"https://example.test/{n}",
+                html=html,
+                text=html,
+                last_verified="2024-01-01",
+            )
+        )
+    return docs
+
+
+def test_pool_does_not_fork_the_threaded_parent():
+    assert doc_processing._pool_context().get_start_method() in {"forkserver", "spawn"}
+
+
+def test_pool_output_matches_serial_output_from_a_stage_thread(monkeypatch):
+    # Take the process-pool path even without Docling; workers fall back to lxml sections.
+    monkeypatch.setattr(doc_processing, "_docling_available", lambda: True)
+    docs = _docs(5)
+    expected = [build_chunks(doc) for doc in _docs(5)]
+    results = []
+
+    def _stage() -> None:
+        results.extend(iter_document_chunks(docs, workers=2, task_size=2))
+
+    stage = threading.Thread(target=_stage)
+    stage.start()
+    stage.join(60)
+
+    assert [doc.url for doc, _ in results] == [doc.url for doc in docs]
+    assert [chunks for _, chunks in results] == expected
+
+
+def test_chunks_serially_when_docling_builds_no_pipeline(monkeypatch):
+    def _no_pool(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        raise AssertionError("no process pool without a Docling pipeline")
+
+    monkeypatch.setattr(doc_processing, "_doc_pipeline", lambda: None)
+    monkeypatch.setattr(doc_processing, "ProcessPoolExecutor", _no_pool)
+    results = list(iter_document_chunks(_docs(3), workers=4, task_size=1))
+    assert [chunks for _, chunks in results] == [build_chunks(doc) for doc in _docs(3)]
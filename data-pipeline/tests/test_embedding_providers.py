@@ -0,0 +1,47 @@
+"""Tests for the embedding providers shared with the backend."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from src.embedding_providers import OpenAIEmbeddingProvider
+
+
+class RecordingEmbeddings:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def create(self, **kwargs):  # noqa: ANN003, ANN201
+        self.calls.append(kwargs)
+        data = [SimpleNamespace(embedding=[0.0, 1.0]) for _ in kwargs["input"]]
+        return SimpleNamespace(data=data)
+
+
+def _provider(model, dimensions=None):  # noqa: ANN001, ANN202
+    embeddings = RecordingEmbeddings()
+    client = SimpleNamespace(embeddings=embeddings)
+    return OpenAIEmbeddingProvider(lambda: client, model=model, dimensions=dimensions), embeddings
+
+
+def test_dimensions_are_only_sent_when_configured():
+    provider, embeddings = _provider("text-embedding-ada-002")
+    provider.embed(["exit load"])
+    assert "dimensions" not in embeddings.calls[0]
+    assert provider.dimensions == 1536
+
+    provider, embeddings = _provider("text-embedding-3-large", dimensions=256)
+    provider.embed(["exit load"])
+    assert embeddings.calls[0]["dimensions"] == 256
+    assert provider.dimensions == 256
+
+
+def test_native_size_is_used_without_configured_dimensions():
+    provider, _ = _provider("text-embedding-3-large")
+    assert provider.dimensions == 3072
+
+
+def test_with_client_keeps_the_requested_dimensions():
+    provider, _ = _provider("text-embedding-ada-002")
+    embeddings = RecordingEmbeddings()
+    provider.with_client(lambda: SimpleNamespace(embeddings=embeddings)).embed(["exit load"])
+    assert "dimensions" not in embeddings.calls[0]
@@ -0,0 +1,78 @@
+"""Parity tests for the single-pass lxml extractor against the BeautifulSoup one it replaced."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+
+import pytest
+
+from src.benchmarks.fixtures import synthetic_page
+from src.benchmarks.html_parse import _legacy_clean
+from src.html_extract import parse_page
+from src.registry import get_registry
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>HDFC Small Cap Fund</title>
+<style>.fund { color: #00d09c }</style>
+<script>window.__STATE__ = {"nav": "not text"};</script></head>
+<body>
+<nav>Home <a href="/stocks">Stocks</a>
+<a href="https://groww.in/mutual-funds">Mutual Funds</a></nav>
+<!-- tracking pixel -->
+<h1>HDFC Small Cap <span>Fund</span> Direct Growth</h1>
+<p>NAV &amp; returns as of 15 Nov 2025</p>
+<h2>Exit load</h2>Exit load of 1% if redeemed within 1 year.
+<div><p>Stamp duty 0.005%<br>on purchases</p><noscript>Enable JavaScript</noscript></div>
+<h2>Similar funds</h2>
+<ul>
+  <li><a href="hdfc-mid-cap-fund-direct-growth">HDFC Mid Cap</a> 3Y 24.1%</li>
+  <li><a href="/mutual-funds/hdfc-mid-cap-fund-direct-growth">HDFC Mid Cap again</a></li>
+  <li><a href="https://example.com/elsewhere">Elsewhere</a></li>
+</ul>
+<footer>Mutual fund investments are subject to market risks.</footer>
+<script type="application/json">{"props": "blob"}</script>
+</body></html>"""
+BASE_URL = "https://groww.in/mutual-funds/hdfc-small-cap-fund-direct-growth"
+
+
+FIXTURES = [PAGE] + [
+    synthetic_page(asdict(page), seed=n)["html"] for n, page in enumerate(get_registry().pages())
+]
+
+
+@pytest.mark.parametrize("html", FIXTURES)
+def test_text_matches_the_legacy_extractor(html):  # noqa: ANN001
+    assert parse_page(html).text == _legacy_clean(html)
+
+
+def test_script_style_noscript_and_comments_are_not_text():
+    text = parse_page(PAGE).text
+    for hidden in ("__STATE__", "color", "Enable JavaScript", "tracking pixel", "blob"):
+        assert hidden not in text
+    assert "NAV & returns as of 15 Nov 2025" in text.splitlines()
+
+
+def test_links_are_absolute_groww_links_in_page_order():
+    assert parse_page(PAGE).links == ["https://groww.in/mutual-funds"]
+    assert parse_page(PAGE, base_url=BASE_URL).links == [
+        "https://groww.in/stocks",
+        "https://groww.in/mutual-funds",
+        "https://groww.in/mutual-funds/hdfc-mid-cap-fund-direct-growth",
+    ]
+
+
+def test_headings_split_sections_and_keep_text_after_the_heading_closes():
+    sections = parse_page(PAGE).sections
+    assert [(section.title, section.level) for section in sections] == [
+        ("", 0),
+        ("HDFC Small Cap Fund Direct Growth", 1),
+        ("Exit load", 2),
+        ("Similar funds", 2),
+    ]
+    assert sections[0].lines[0] == "HDFC Small Cap Fund"  # <title>, before any heading
+    assert sections[2].lines == [
+        "Exit load of 1% if redeemed within 1 year.",
+        "Stamp duty 0.005%",
+        "on purchases",
+    ]
+    assert sections[3].lines[-1] == "Mutual fund investments are subject to market risks."
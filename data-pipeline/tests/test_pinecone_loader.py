@@ -0,0 +1,138 @@
+"""Tests for PineconeLoader against a local fake index."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.models import Chunk, EmbeddingRecord
+from src.pinecone_loader import PineconeLoader, _estimate_bytes, _vector_payload
+
+
+class FakeIndex:
+    """Records upserts; fails the first ``failures`` calls and tracks peak concurrency."""
+
+    def __init__(self, *, failures: int = 0, delay: float = 0.0) -> None:
+        self.failures = failures
+        self.delay = delay
+        self.batches = []
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, namespace=""):  # noqa: ANN001, ANN201
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            fail = self.calls <= self.failures
+        try:
+            time.sleep(self.delay)
+            if fail:
+                raise ConnectionError("upstream reset")
+            with self._lock:
+                self.batches.append((namespace, [vector["id"] for vector in vectors]))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _records(count: int, *, content: str = "text", dimensions: int = 4):  # noqa: ANN202
+    return [
+        EmbeddingRecord(
+            chunk=Chunk(
+                scheme="HDFC Small Cap Fund",
+                category="Equity",
+                url="https://example.test/fund",
+                section="Exit load",
+                content=content,
+                last_verified="2024-01-01",
+                chunk_id=f"c{number}",
+            ),
+            vector=[0.1] * dimensions,
+        )
+        for number in range(count)
+    ]
+
+
+def test_batches_are_bounded_by_count_and_payload_size():
+    records = _records(10)
+    size = _estimate_bytes(_vector_payload(records[0]))
+    index = FakeIndex()
+    # Room for three vectors by size, four by count: size wins.
+    loader = PineconeLoader(index, batch_size=4, max_batch_bytes=size * 3 + 1, max_workers=1)
+    stats = loader.upsert(records)
+
+    assert [len(ids) for _, ids in index.batches] == [3, 3, 3, 1]
+    sent = sorted(vector_id for _, ids in index.batches for vector_id in ids)
+    assert sent == sorted(f"c{n}" for n in range(10))
+    assert (stats.vectors, stats.batches, stats.retries) == (10, 4, 0)
+
+    index = FakeIndex()
+    PineconeLoader(index, batch_size=4, max_batch_bytes=10**6, max_workers=1).upsert(records)
+    assert [len(ids) for _, ids in index.batches] == [4, 4, 2]
+
+
+def test_failed_batches_are_retried_and_counted():
+    index = FakeIndex(failures=2)
+    loader = PineconeLoader(index, batch_size=5, max_workers=1, retries=3, backoff=0)
+    acknowledged = []
+    stats = loader.upsert(_records(5), namespace="v1", on_batch=acknowledged.extend)
+
+    assert index.calls == 3
+    assert index.batches == [("v1", [f"c{n}" for n in range(5)])]
+    assert acknowledged == [f"c{n}" for n in range(5)]
+    assert (stats.vectors, stats.batches, stats.retries) == (5, 1, 2)
+
+
+def test_exhausted_retries_raise():
+    loader = PineconeLoader(FakeIndex(failures=5), batch_size=5, retries=2, backoff=0)
+    with pytest.raises(ConnectionError):
+        loader.upsert(_records(5))
+
+
+def test_requests_in_flight_are_bounded_by_workers():
+    index = FakeIndex(delay=0.02)
+    loader = PineconeLoader(index, batch_size=1, max_workers=3)
+    stats = loader.upsert(_records(12))
+
+    assert 1 < index.peak <= 3
+    assert stats.batches == 12 and stats.vectors_per_second > 0
+
+
+def test_input_is_consumed_lazily_while_batches_are_in_flight():
+    release = threading.Event()
+    pulled = []
+
+    class BlockingIndex(FakeIndex):
+        def upsert(self, vectors, namespace=""):  # noqa: ANN001, ANN201
+            release.wait(5)
+            super().upsert(vectors, namespace)
+
+    def _source():  # noqa: ANN202
+        for record in _records(50):
+            pulled.append(record)
+            yield record
+
+    threading.Timer(0.1, release.set).start()
+    seen_while_blocked = []
+    threading.Timer(0.05, lambda: seen_while_blocked.append(len(pulled))).start()
+    stats = PineconeLoader(BlockingIndex(), batch_size=1, max_workers=1).upsert(_source())
+
+    # One worker allows two queued batches, plus the record that closed the last batch.
+    assert seen_while_blocked[0] <= 4
+    assert stats.vectors == 50
+
+
+def test_records_are_split_per_namespace():
+    index = FakeIndex()
+    loader = PineconeLoader(index, batch_size=10, max_workers=1)
+    even = {"c0", "c2"}
+    loader.upsert(
+        _records(4), namespace_of=lambda r: "even" if r.chunk.chunk_id in even else "odd"
+    )
+
+    assert sorted(index.batches) == [("even", ["c0", "c2"]), ("odd", ["c1", "c3"])]
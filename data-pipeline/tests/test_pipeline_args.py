@@ -0,0 +1,59 @@
+"""Tests for how the pipeline opens runs from stored snapshots."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from src import pipeline
+from src.checkpoint import RunCheckpoint
+from src.embedding_providers import LocalHashEmbeddingProvider
+from src.models import ScrapedDocument
+from src.snapshot import SnapshotWriter, iter_snapshot_documents
+
+
+def _write_snapshot(root, snapshot_id):  # noqa: ANN001, ANN202
+    html = "<html><body><h1>Example Fund</h1><p>Exit load of 1%.</p></body></html>"
+    doc = ScrapedDocument(
+        scheme="Example Fund",
+        category="Equity",
+        url="https://example.test/fund",
+        html=html,
+        text="Exit load of 1%.",
+        last_verified="2024-01-01",
+    )
+    with SnapshotWriter(snapshot_id, root=root) as writer:
+        writer.write(doc)
+    return writer.path
+
+
+@pytest.mark.parametrize("ref", ["manifest", "directory"])
+def test_snapshot_outside_the_default_root_is_read_back_from_its_root(tmp_path, ref):
+    elsewhere = tmp_path / "elsewhere"
+    manifest = _write_snapshot(elsewhere, "v-old")
+    provider = LocalHashEmbeddingProvider(16)
+
+    checkpoint = pipeline._open_checkpoint(
+        tmp_path / "output",
+        provider,
+        resume=None,
+        only_stage=None,
+        from_snapshot=str(manifest if ref == "manifest" else elsewhere),
+        snapshot_root=None,
+    )
+
+    assert checkpoint.manifest["snapshot_id"] == "v-old"
+    assert checkpoint.manifest["snapshot_root"] == str(elsewhere.resolve())
+    # A resumed run reads the same root back from its checkpoint.
+    resumed = RunCheckpoint.load(tmp_path / "output", checkpoint.version)
+    root = Path(resumed.manifest["snapshot_root"])
+    docs = list(iter_snapshot_documents(resumed.manifest["snapshot_id"], root=root))
+    assert [doc.url for doc in docs] == ["https://example.test/fund"]
+
+
+def test_from_snapshot_cannot_be_scheduled(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pipeline", "--from-snapshot", "--schedule-minutes", "30"])
+    with pytest.raises(SystemExit):
+        pipeline.parse_args()
@@ -0,0 +1,132 @@
+"""Tests for resuming a failed pipeline run from its checkpoints."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from src.benchmarks.fakes import InMemoryMongoStore
+from src.benchmarks.fixtures import synthetic_page
+from src.checkpoint import RunCheckpoint
+from src.crawl import Crawler
+from src.embedding_providers import LocalHashEmbeddingProvider
+from src.models import EmbeddingRecord
+from src.pinecone_loader import PineconeLoader, vector_id
+from src.pipeline import run_pipeline
+from src.registry import get_registry
+
+PAGES = get_registry().pages()[:4]
+HTML = {page.url: synthetic_page(asdict(page), seed=idx)["html"] for idx, page in enumerate(PAGES)}
+
+
+class RecordingIndex:
+    """Pinecone stand-in that keeps the ids it received and fails call ``fail_on_call``."""
+
+    def __init__(self, *, fail_on_call=None) -> None:  # noqa: ANN001
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+        self.ids = []
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, namespace=""):  # noqa: ANN001, ANN201
+        with self._lock:
+            self.calls += 1
+            if self.calls == self.fail_on_call:
+                raise ConnectionError("pinecone went away")
+            self.ids.extend(vector["id"] for vector in vectors)
+
+    def describe_index_stats(self):  # noqa: ANN201
+        return {"namespaces": {}}
+
+
+def _embed(chunks):  # noqa: ANN001, ANN202
+    return (EmbeddingRecord(chunk=chunk, vector=[0.5] * 8) for chunk in chunks)
+
+
+def _run(tmp_path: Path, store, index, fetches: Counter, **kwargs):  # noqa: ANN001, ANN202
+    def _fetch(url: str) -> str:
+        fetches[url] += 1
+        return HTML[url]
+
+    crawler = Crawler(
+        PAGES,
+        max_depth=0,
+        respect_robots=False,
+        host_rps=0,
+        state_path=tmp_path / "crawl_state.sqlite3",
+        snapshot_root=tmp_path / "snapshots",
+        fetch=_fetch,
+    )
+    return run_pipeline(
+        tmp_path / "output",
+        store=store,
+        loader=PineconeLoader(index, batch_size=2, max_workers=1, retries=1),
+        crawler=crawler,
+        provider=LocalHashEmbeddingProvider(8),
+        embedder=kwargs.pop("embedder", _embed),
+        snapshot_root=tmp_path / "snapshots",
+        sources_csv=tmp_path / "sources.csv",
+        **kwargs,
+    )
+
+
+def test_resume_after_failed_upsert_skips_vectors_already_acknowledged(tmp_path):
+    store, index, fetches = InMemoryMongoStore(), RecordingIndex(fail_on_call=3), Counter()
+    with pytest.raises(ConnectionError):
+        _run(tmp_path, store, index, fetches)
+
+    failed = RunCheckpoint.load(tmp_path / "output")
+    assert failed.manifest["status"] == "failed"
+    assert not failed.done("upsert")
+    acknowledged = failed.upserted_ids()
+    assert acknowledged and acknowledged <= set(index.ids)
+    created_at = store.versions[failed.version]["created_at"]
+
+    with pytest.raises(ValueError, match="has not completed"):
+        _run(tmp_path, store, index, fetches, only_stage="questions")
+
+    index.fail_on_call, index.ids = None, []
+    run = _run(tmp_path, store, index, fetches, resume="latest")
+
+    assert run.version == failed.version and run.activated
+    resumed = RunCheckpoint.load(tmp_path / "output", failed.version)
+    chunk_ids = {vector_id(chunk) for chunk in resumed.iter_chunks()}
+    assert not acknowledged & set(index.ids)
+    assert acknowledged | set(index.ids) == chunk_ids
+    assert resumed.manifest["stages"]["upsert"]["vectors"] == len(chunk_ids)
+    assert store.versions[failed.version]["created_at"] == created_at
+    # Every page was fetched by the first attempt; the resumed one read the snapshot.
+    assert fetches == Counter({page.url: 1 for page in PAGES})
+
+
+def test_only_stage_reruns_an_interrupted_stage_without_redoing_finished_ones(tmp_path):
+    store, index, fetches = InMemoryMongoStore(), RecordingIndex(), Counter()
+    calls = Counter()
+
+    def _embed_then_fail(chunks):  # noqa: ANN001, ANN202
+        calls["embed"] += 1
+        for number, record in enumerate(_embed(chunks)):
+            # The second pass embeds the question bank, which starts once every chunk is in.
+            if calls["embed"] == 2 and number == 3:
+                raise RuntimeError("killed while building the question bank")
+            yield record
+
+    with pytest.raises(RuntimeError):
+        _run(tmp_path, store, index, fetches, embedder=_embed_then_fail)
+    failed = RunCheckpoint.load(tmp_path / "output")
+    assert all(failed.done(stage) for stage in ("scrape", "chunk", "embed", "upsert"))
+    assert failed.manifest["stages"]["questions"]["status"] == "interrupted"
+    chunks, vectors, fetched = dict(store.chunks), list(index.ids), Counter(fetches)
+
+    run = _run(tmp_path, store, index, fetches, only_stage="questions", resume=failed.version)
+    assert run.activated
+    finished = RunCheckpoint.load(tmp_path / "output", failed.version)
+    assert finished.manifest["status"] == "complete"
+    assert store.questions[failed.version] > 0
+    assert dict(store.chunks) == chunks
+    assert index.ids == vectors
+    assert fetches == fetched
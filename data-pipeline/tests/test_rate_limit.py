@@ -0,0 +1,207 @@
+"""Tests for the embedding rate limiter, retry delays and concurrent batch ordering."""
+
+from __future__ import annotations
+
+import threading
+import time as real_time
+from types import SimpleNamespace
+
+import pytest
+
+from src import embedding, rate_limit
+from src.config import CONFIG
+from src.embedding_cache import EmbeddingCache
+from src.models import Chunk
+from src.rate_limit import RateLimiter, _parse_duration, retry_delay
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; ``sleep`` advances the clock instead of blocking."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):  # noqa: ANN001
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+@pytest.fixture
+def clock(monkeypatch):  # noqa: ANN201
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):  # noqa: ANN201
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: low)
+
+
+def test_request_bucket_blocks_once_the_minute_is_spent(clock):
+    limiter = RateLimiter(rpm=60, tpm=0)
+    for _ in range(60):
+        limiter.acquire()
+    assert clock.slept == []
+
+    limiter.acquire()
+    assert sum(clock.slept) == pytest.approx(1.0)
+
+
+def test_token_bucket_waits_for_enough_tokens(clock):
+    limiter = RateLimiter(rpm=0, tpm=1200)
+    limiter.acquire(1000)
+    limiter.acquire(500)
+    # 300 missing tokens at 20 tokens/s.
+    assert sum(clock.slept) == pytest.approx(15.0)
+    assert limiter.waited == pytest.approx(15.0)
+
+
+def test_pause_holds_callers_then_ramps_up_from_empty(clock):
+    limiter = RateLimiter(rpm=60, tpm=0)
+    limiter.pause(5)
+    limiter.acquire()
+    # Five paused seconds, then one second to refill a single request.
+    assert sum(clock.slept) == pytest.approx(6.0)
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [("1.5", 1.5), ("20ms", 0.02), ("6m0s", 360.0), ("1h2m3s", 3723.0), ("soon", None)],
+)
+def test_parse_duration(value, seconds):
+    assert _parse_duration(value) == seconds
+
+
+def test_retry_after_ms_header_is_honoured(no_jitter):
+    exc = APIError(429, {"retry-after-ms": "250", "retry-after": "9"})
+    assert retry_delay(exc, attempt=1) == pytest.approx(0.25)
+
+
+def test_exhausted_token_limit_waits_for_its_reset(no_jitter):
+    headers = {
+        "x-ratelimit-remaining-requests": "10",
+        "x-ratelimit-reset-requests": "2s",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "6m0s",
+    }
+    # The reset is 360s away; a single wait is capped at a minute.
+    assert retry_delay(APIError(429, headers), attempt=1) == 60.0
+    headers["x-ratelimit-reset-tokens"] = "12s"
+    assert retry_delay(APIError(429, headers), attempt=1) == 12.0
+
+
+def test_backoff_without_headers_and_non_retryable_errors(no_jitter):
+    assert retry_delay(APIError(503), attempt=3, base=1.0) == 4.0
+    assert retry_delay(type("APIConnectionError", (Exception,), {})(), attempt=1) == 1.0
+    assert retry_delay(APIError(400), attempt=1) is None
+    assert retry_delay(ValueError("bad input"), attempt=1) is None
+
+
+class FakeProvider:
+    """Embeds each text as ``[len(text)]``; ``behaviour`` may raise or delay per call."""
+
+    name = "fake"
+    dimensions = 1
+
+    def __init__(self, behaviour=None):  # noqa: ANN001
+        self.behaviour = behaviour
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def embed(self, texts):  # noqa: ANN001, ANN201
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if self.behaviour is not None:
+            self.behaviour(call, texts)
+        return [[float(len(text))] for text in texts]
+
+
+def _chunks(count: int):  # noqa: ANN202
+    return [
+        Chunk(
+            scheme="Example Fund",
+            category="Equity",
+            url="https://example.test/fund",
+            section=f"Section {n}",
+            content="x" * (n + 1),
+            last_verified="2024-01-01",
+            chunk_id=f"c{n}",
+        )
+        for n in range(count)
+    ]
+
+
+def _embed(tmp_path, provider, chunks, **options):  # noqa: ANN001, ANN003, ANN202
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", model="fake", dimensions=1)
+    try:
+        return list(embedding.iter_embeddings(chunks, cache=cache, provider=provider, **options))
+    finally:
+        cache.close()
+
+
+def test_results_keep_input_order_when_batches_finish_out_of_order(tmp_path):
+    finished = []
+
+    def _later_batches_first(call, texts):  # noqa: ANN001, ANN202
+        real_time.sleep(0.05 if len(texts[0]) <= 2 else 0.0)
+        finished.append(len(texts[0]))
+
+    records = _embed(
+        tmp_path, FakeProvider(_later_batches_first), _chunks(8), batch_size=1, workers=4
+    )
+
+    assert finished != sorted(finished)
+    assert [record.chunk.chunk_id for record in records] == [f"c{n}" for n in range(8)]
+    assert [record.vector for record in records] == [[float(n + 1)] for n in range(8)]
+
+
+def test_rate_limited_batch_is_retried(tmp_path, monkeypatch, no_jitter):
+    sleeps = []
+    monkeypatch.setattr(embedding.time, "sleep", sleeps.append)
+
+    def _limited_once(call, texts):  # noqa: ANN001, ANN202
+        if call == 1:
+            raise APIError(429, {"retry-after-ms": "1500"})
+
+    provider = FakeProvider(_limited_once)
+    records = _embed(tmp_path, provider, _chunks(2), batch_size=2, workers=1)
+
+    assert len(records) == 2 and provider.calls == 2
+    assert sleeps == [pytest.approx(1.5)]
+
+
+def test_non_retryable_error_is_raised_without_retrying(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding.time, "sleep", lambda seconds: None)
+
+    def _bad_request(call, texts):  # noqa: ANN001, ANN202
+        raise APIError(400)
+
+    provider = FakeProvider(_bad_request)
+    with pytest.raises(APIError):
+        _embed(tmp_path, provider, _chunks(2), batch_size=2, workers=1)
+    assert provider.calls == 1
+
+
+def test_retries_run_out(tmp_path, monkeypatch, no_jitter):
+    monkeypatch.setattr(embedding.time, "sleep", lambda seconds: None)
+
+    def _always_limited(call, texts):  # noqa: ANN001, ANN202
+        raise APIError(429, {"retry-after": "1"})
+
+    provider = FakeProvider(_always_limited)
+    with pytest.raises(APIError):
+        _embed(tmp_path, provider, _chunks(1), workers=1)
+    assert provider.calls == CONFIG.embedding.max_retries + 1
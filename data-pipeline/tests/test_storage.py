@@ -0,0 +1,91 @@
+"""Tests for MongoStore index management."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from src.storage import MongoStore
+
+
+class FakeDocuments:
+    """The part of a pymongo collection that ``_ensure_unique_url_index`` uses."""
+
+    def __init__(self, docs, indexes):  # noqa: ANN001
+        self.docs = list(docs)
+        self.indexes = dict(indexes)
+
+    def index_information(self):  # noqa: ANN201
+        return dict(self.indexes)
+
+    def aggregate(self, pipeline, allowDiskUse=False):  # noqa: ANN001, ANN201, N803
+        ordered = sorted(self.docs, key=lambda d: (d["last_verified"], d["_id"]), reverse=True)
+        groups = {}
+        for doc in ordered:
+            groups.setdefault(doc["url"], []).append(doc["_id"])
+        return [
+            {"_id": url, "ids": ids, "count": len(ids)}
+            for url, ids in groups.items()
+            if len(ids) > 1
+        ]
+
+    def delete_many(self, query):  # noqa: ANN001, ANN201
+        stale = set(query["_id"]["$in"])
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if doc["_id"] not in stale]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    def drop_index(self, name):  # noqa: ANN001, ANN201
+        del self.indexes[name]
+
+    def create_index(self, keys, name, unique=False):  # noqa: ANN001, ANN201
+        assert name not in self.indexes
+        self.indexes[name] = {"key": keys, "unique": unique}
+        return name
+
+
+def _store(documents: FakeDocuments) -> MongoStore:
+    store = MongoStore()
+    store._documents = documents
+    return store
+
+
+def test_non_unique_url_index_is_migrated_after_removing_duplicates():
+    documents = FakeDocuments(
+        [
+            {"_id": 1, "url": "https://a", "last_verified": "2024-01-01"},
+            {"_id": 2, "url": "https://a", "last_verified": "2024-03-01"},
+            {"_id": 3, "url": "https://b", "last_verified": "2024-01-01"},
+        ],
+        {"_id_": {"key": [("_id", 1)]}, "url_1": {"key": [("url", 1)]}},
+    )
+    _store(documents)._ensure_unique_url_index()
+
+    assert sorted(doc["_id"] for doc in documents.docs) == [2, 3]
+    assert documents.indexes["url_1"] == {"key": [("url", 1)], "unique": True}
+
+
+def test_existing_unique_url_index_is_left_alone():
+    documents = FakeDocuments([], {"url_1": {"key": [("url", 1)], "unique": True}})
+    documents.aggregate = None  # a second look at the data would fail the test
+    _store(documents)._ensure_unique_url_index()
+    assert documents.indexes == {"url_1": {"key": [("url", 1)], "unique": True}}
+
+
+class FakeVersions:
+    def __init__(self) -> None:
+        self.updates = []
+
+    def update_one(self, query, update, upsert=False):  # noqa: ANN001, ANN201
+        self.updates.append((query, update, upsert))
+
+
+def test_begin_version_sets_created_at_only_when_the_version_is_new():
+    store = MongoStore()
+    store._versions = FakeVersions()
+    store.begin_version("v1", embedding_model="local-hash", embedding_dimensions=8)
+
+    query, update, upsert = store._versions.updates[0]
+    assert query == {"_id": "v1"} and upsert
+    assert "created_at" not in update["$set"]
+    assert set(update["$setOnInsert"]) == {"created_at"}
+    assert update["$set"]["status"] == "building"
@@ -0,0 +1,102 @@
+"""Tests for error propagation, shutdown and backpressure in StreamingPipeline."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+
+from src.streaming import StreamingPipeline
+
+
+def _run(pipeline: StreamingPipeline, timeout: float = 10.0):  # noqa: ANN202
+    """``pipeline.run()`` on a helper thread, so a hang fails the test instead of the run."""
+
+    outcome = {}
+
+    def _target() -> None:
+        try:
+            outcome["stats"] = pipeline.run()
+        except BaseException as exc:  # noqa: BLE001
+            outcome["error"] = exc
+
+    runner = threading.Thread(target=_target)
+    runner.start()
+    runner.join(timeout)
+    assert not runner.is_alive(), "pipeline did not shut down"
+    return outcome
+
+
+def _stage_threads() -> list:
+    return [thread for thread in threading.enumerate() if thread.name.startswith("stage-")]
+
+
+def test_failing_middle_stage_stops_every_stage_and_is_reraised():
+    produced = itertools.count()
+    consumed = []
+
+    def _source(_):  # noqa: ANN001, ANN202
+        # Endless: only the abort can stop it once the queues are full.
+        for item in produced:
+            yield item
+
+    def _middle(items):  # noqa: ANN001, ANN202
+        for item in items:
+            if item == 5:
+                raise ValueError("bad record 5")
+            yield item
+
+    def _sink(items):  # noqa: ANN001, ANN202
+        for item in items:
+            consumed.append(item)
+        return iter(())
+
+    pipeline = StreamingPipeline(queue_size=2)
+    pipeline.add_stage("source", _source).add_stage("middle", _middle).add_stage("sink", _sink)
+    outcome = _run(pipeline)
+
+    assert isinstance(outcome.get("error"), ValueError)
+    assert str(outcome["error"]) == "bad record 5"
+    assert _stage_threads() == []
+    assert consumed == [0, 1, 2, 3, 4]
+
+
+def test_bounded_queues_hold_back_a_fast_producer():
+    queue_size = 3
+    produced = 0
+    lag = []
+
+    def _source(_):  # noqa: ANN001, ANN202
+        nonlocal produced
+        for item in range(40):
+            produced += 1
+            yield item
+
+    def _slow_sink(items):  # noqa: ANN001, ANN202
+        for consumed, _ in enumerate(items, start=1):
+            lag.append(produced - consumed)
+            time.sleep(0.005)
+        return iter(())
+
+    pipeline = StreamingPipeline(queue_size=queue_size)
+    pipeline.add_stage("source", _source).add_stage("sink", _slow_sink)
+    stats = _run(pipeline)["stats"]
+
+    assert [(stage.items_in, stage.items_out) for stage in stats] == [(0, 40), (40, 0)]
+    # Queued items plus one the producer is waiting to put.
+    assert max(lag) <= queue_size + 1
+    assert stats[0].waited > 0
+
+
+def test_failing_first_stage_releases_downstream_stages():
+    def _source(_):  # noqa: ANN001, ANN202
+        yield 1
+        raise ConnectionError("site went away")
+
+    def _sink(items):  # noqa: ANN001, ANN202
+        return (item for item in items)
+
+    pipeline = StreamingPipeline(queue_size=1)
+    pipeline.add_stage("source", _source).add_stage("sink", _sink)
+    assert isinstance(_run(pipeline).get("error"), ConnectionError)
+    assert _stage_threads() == []
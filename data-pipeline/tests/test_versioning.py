@@ -0,0 +1,80 @@
+"""Tests for corpus version garbage collection."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from src.checkpoint import RunCheckpoint
+from src.versioning import garbage_collect
+
+NOW = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+
+class FakeStore:
+    def __init__(self, active, records):  # noqa: ANN001
+        self.active = active
+        self.records = records
+        self.dropped = []
+
+    def active_version(self):  # noqa: ANN201
+        return self.active
+
+    def list_versions(self):  # noqa: ANN201
+        return sorted(self.records, key=lambda record: record["created_at"], reverse=True)
+
+    def drop_version(self, version):  # noqa: ANN001, ANN201
+        self.dropped.append(version)
+        return 0
+
+
+class FakeLoader:
+    def __init__(self) -> None:
+        self.deleted = []
+
+    def delete_version(self, version):  # noqa: ANN001, ANN201
+        self.deleted.append(version)
+
+
+def _record(version: str, status: str, hours_ago: float) -> dict:
+    created = (NOW - timedelta(hours=hours_ago)).isoformat()
+    return {"_id": version, "status": status, "created_at": created}
+
+
+def _collect(store: FakeStore, runs_dir=None):  # noqa: ANN001, ANN202
+    loader = FakeLoader()
+    dropped = garbage_collect(store, loader, keep=2, runs_dir=runs_dir, now=NOW)
+    assert loader.deleted == dropped == store.dropped
+    return dropped
+
+
+def test_failed_run_awaiting_resume_is_kept(tmp_path):
+    failed = RunCheckpoint.create(tmp_path, "v-failed")
+    failed.start("embed")
+    failed.fail(RuntimeError("rate limited"))
+    store = FakeStore(
+        "v-new",
+        [
+            _record("v-new", "active", 0),
+            _record("v-failed", "building", 30),
+            _record("v-old", "active", 48),
+            _record("v-older", "active", 72),
+        ],
+    )
+
+    assert _collect(store, tmp_path) == ["v-older"]
+    # Resumable runs still expire eventually.
+    expired = FakeStore("v-new", [_record("v-failed", "building", 200)])
+    assert _collect(expired, tmp_path) == ["v-failed"]
+
+
+def test_building_version_without_checkpoint_is_kept_until_stale(tmp_path):
+    store = FakeStore(
+        "v-new",
+        [
+            _record("v-other-host", "building", 1),
+            _record("v-abandoned", "building", 12),
+            _record("v-new", "active", 2),
+        ],
+    )
+
+    assert _collect(store, tmp_path) == ["v-abandoned"]
@@ -1,4 +1,4 @@
-import { useMemo, useState, type FormEvent } from 'react'
+import { useEffect, useMemo, useRef, useState, type FormEvent } from 'react'
 import './App.css'
 
 const examples = [
@@ -17,6 +17,13 @@ interface AnswerPayload {
 }
 
 const backendUrl = import.meta.env.VITE_BACKEND_URL ?? 'http://127.0.0.1:8001'
+// Sent as X-Request-Timeout so the backend stops working on the request when we give up.
+const requestTimeoutMs = 25000
+// Lets the backend answer follow-ups ("and its exit load?") about the scheme just discussed.
+const sessionId =
+  typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
 
 const sortCitations = (citations: string[]): string[] => {
   const priority = (url: string) => {
@@ -33,6 +40,10 @@ function App() {
   const [answer, setAnswer] = useState<AnswerPayload | null>(null)
   const [status, setStatus] = useState<'idle' | 'loading' | 'error'>('idle')
   const [error, setError] = useState<string>('')
+  const inFlight = useRef<AbortController | null>(null)
+
+  // Abort the pending request when the page goes away so the backend can cancel it.
+  useEffect(() => () => inFlight.current?.abort(), [])
 
   const isDisabled = question.trim().length < 5 || status === 'loading'
 
@@ -48,13 +59,19 @@ function App() {
     setStatus('loading')
     setError('')
     setAnswer(null)
+    inFlight.current?.abort()
+    const controller = new AbortController()
+    inFlight.current = controller
+    const timer = window.setTimeout(() => controller.abort(), requestTimeoutMs)
     try {
       const response = await fetch(`${backendUrl}/ask`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Request-Timeout': String(requestTimeoutMs / 1000),
         },
-        body: JSON.stringify({ query: question.trim() }),
+        body: JSON.stringify({ query: question.trim(), session_id: sessionId }),
+        signal: controller.signal,
       })
       if (!response.ok) {
         const data = await response.json()
@@ -63,9 +80,18 @@ function App() {
       const data: AnswerPayload = await response.json()
       setAnswer(data)
     } catch (err) {
-      setError(err instanceof Error ? err.message : 'Something went wrong')
+      if (controller !== inFlight.current) return
+      if (err instanceof DOMException && err.name === 'AbortError') {
+        setError('The request took too long. Please try again.')
+      } else {
+        setError(err instanceof Error ? err.message : 'Something went wrong')
+      }
     } finally {
-      setStatus('idle')
+      window.clearTimeout(timer)
+      if (controller === inFlight.current) {
+        inFlight.current = null
+        setStatus('idle')
+      }
     }
   }
 